@@ -1,8 +1,10 @@
+import os
+
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 
-from .config import Config
+from .config import config
 
 # -------------------------------------------------------------
 # Extensions
@@ -12,28 +14,98 @@ login_manager = LoginManager()
 login_manager.login_view = "auth.login"  # where @login_required redirects
 
 
-def create_app():
-    """Application factory."""
+def create_app(config_name=None):
+    """
+    Application factory.
+
+    config_name: "development", "testing" or "production"
+    (defaults to the FLASK_CONFIG environment variable), or a
+    Config subclass (used by benchmarks with their own database).
+    """
     app = Flask(__name__)
-    app.config.from_object(Config)
+    config_name = config_name or os.environ.get("FLASK_CONFIG", "default")
+    if isinstance(config_name, str):
+        app.config.from_object(config[config_name])
+    else:
+        app.config.from_object(config_name)
+
+    # connection pool settings for the configured database
+    from .database import engine_options, init_database
+
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
 
     # init extensions
     db.init_app(app)
     login_manager.init_app(app)
 
-    # import models so User exists
-    from .models import User
+    # SQLite PRAGMA profile on every connection (WAL, busy timeout, ...)
+    init_database(app, db)
+
+    # password hashing policy + verification pool
+    from .passwords import init_passwords
+
+    init_passwords(app)
+
+    # import models so the tables are registered
+    from . import models  # noqa: F401
+
+    # course progress is recomputed on writes (session hook)
+    from . import progress  # noqa: F401
+
+    # notes full-text index, created along with the tables
+    from . import search  # noqa: F401
+
+    # background jobs: completion badges
+    from . import badges  # noqa: F401
+    from .jobs import init_jobs
+
+    init_jobs(app)
+
+    # per-user dashboard + identity caches (invalidated on commit, see changes.py)
+    from .cache import init_cache, load_user_cached
+
+    init_cache(app)
 
     # user loader for Flask-Login
+    # (served from the identity cache: one data_version lookup per request)
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return load_user_cached(int(user_id))
+
+    # fingerprinted static files + responsive images (asset_url, picture)
+    from .assets import init_assets
+
+    init_assets(app)
+
+    # gzip/brotli responses + precompressed static files
+    from .compression import init_compression
+
+    init_compression(app)
+
+    # template bytecode cache + {% cache %} fragments
+    from .templating import init_templating
+
+    init_templating(app)
+
+    # request timing + SQL counters (opt-in: INSTRUMENTATION_ENABLED)
+    from .instrumentation import init_instrumentation
+
+    init_instrumentation(app, db)
 
     # register blueprints
+    from .admin.routes import admin_bp
+    from .api.routes import api_bp
     from .auth.routes import auth_bp
     from .main.routes import main_bp
 
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(main_bp)
+    app.register_blueprint(admin_bp, url_prefix="/admin")
+    app.register_blueprint(api_bp, url_prefix="/api")
+
+    # flask CLI commands (upgrade-db, ...)
+    from .cli import register_commands
+
+    register_commands(app)
 
     return app
@@ -0,0 +1,41 @@
+# -------------------------------------------------------------
+# Admin Routes (monitoring)
+# -------------------------------------------------------------
+
+from flask import Blueprint, current_app, jsonify
+
+from app import db
+
+from ..auth.decorators import admin_required
+from ..database import pool_stats
+
+# Blueprint for admin-only pages
+admin_bp = Blueprint("admin", __name__)
+
+
+# -------------------------------------------------------------
+# METRICS (JSON)
+# -------------------------------------------------------------
+@admin_bp.route("/metrics")
+@admin_required
+def metrics():
+    """
+    Rolling per-endpoint latency (p50/p95/p99), query counts,
+    cache hit rates, background job counts and connection pool
+    usage for this worker.
+    """
+    extensions = current_app.extensions
+    return jsonify(
+        instrumentation_enabled=bool(current_app.config.get("INSTRUMENTATION_ENABLED")),
+        endpoints=extensions["endpoint_metrics"].summary(),
+        caches={
+            "dashboard": extensions["dashboard_cache"].stats(),
+            "identity": extensions["identity_cache"].stats(),
+            "fragments": extensions["fragment_cache"].stats(),
+        },
+        jobs=extensions["job_queue"].stats(),
+        pools={
+            str(bind or "default"): pool_stats(engine)
+            for bind, engine in db.engines.items()
+        },
+    )
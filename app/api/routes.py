@@ -0,0 +1,221 @@
+# -------------------------------------------------------------
+# API Routes (sync / reporting jobs)
+# -------------------------------------------------------------
+
+import io
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request, stream_with_context
+from flask_login import current_user
+
+from app import db
+
+from ..auth.decorators import api_login_required, token_or_admin_required
+from ..export import DATASETS, MIMETYPES, export_chunks
+from ..ingest import FORMATS, ingest_progress, read_records
+from ..models import Course, ModuleProgress, User
+from ..search import search_notes
+
+# Blueprint for machine-to-machine endpoints (mounted at /api)
+api_bp = Blueprint("api", __name__)
+
+
+def request_format():
+    """?format=csv|ndjson, else guessed from the Content-Type."""
+    fmt = request.args.get("format")
+    if fmt is None:
+        fmt = "csv" if request.mimetype == "text/csv" else "ndjson"
+    if fmt not in FORMATS:
+        abort(400, description=f"format must be one of {', '.join(FORMATS)}")
+    return fmt
+
+
+# -------------------------------------------------------------
+# PROGRESS INGEST
+# -------------------------------------------------------------
+@api_bp.route("/progress", methods=["POST"])
+@token_or_admin_required
+def ingest():
+    """
+    Upsert module progress from an NDJSON or CSV request body
+    (fields: user, course, module_name, percent).
+
+    The body is read line by line while it is written, so large
+    uploads are never held in memory.  Returns the ingest report.
+    """
+    fmt = request_format()
+    lines = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+    report = ingest_progress(
+        read_records(lines, fmt),
+        chunk_size=current_app.config.get("INGEST_CHUNK_SIZE", 5000),
+    )
+    return jsonify(report)
+
+
+# -------------------------------------------------------------
+# EXPORT (streamed)
+# -------------------------------------------------------------
+@api_bp.route("/export/<dataset>")
+@token_or_admin_required
+def export(dataset):
+    """
+    Stream every progress row or note as CSV (default) or NDJSON:
+        GET /api/export/progress?format=ndjson
+
+    Rows are sent batch by batch while the query is still running,
+    so memory use does not grow with the size of the export.
+    """
+    fmt = request.args.get("format", "csv")
+    if dataset not in DATASETS:
+        abort(404)
+    if fmt not in MIMETYPES:
+        abort(400, description=f"format must be one of {', '.join(MIMETYPES)}")
+
+    chunks = export_chunks(
+        dataset, fmt, batch_size=current_app.config.get("EXPORT_BATCH_SIZE", 1000)
+    )
+    return Response(
+        stream_with_context(chunks),
+        mimetype=MIMETYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename={dataset}.{fmt}"},
+    )
+
+
+# -------------------------------------------------------------
+# READ-ONLY PROGRESS API (conditional GET)
+# -------------------------------------------------------------
+# Every response carries an ETag built from the user's
+# data_version, which is bumped by any change to the user, their
+# courses or their progress (app/changes.py).  A client that polls
+# with If-None-Match gets "304 Not Modified" after a single primary
+# key lookup on the user table - the progress tables are not read
+# (/courses/<id> first checks that the course exists and is theirs).
+# -------------------------------------------------------------
+MAX_PAGE_SIZE = 100
+
+
+def _date(value):
+    return value.isoformat() if value else None
+
+
+def conditional_json(build):
+    """jsonify(build()) with an ETag, or 304 if the client is current."""
+    version = db.session.scalar(
+        db.select(User.data_version).where(User.id == current_user.id)
+    )
+    etag = f"u{current_user.id}-v{version}"
+
+    # weak comparison: compressed responses carry W/"..." (compression.py)
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    # may be stored, but must be revalidated (cheaply) before reuse
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def course_json(course):
+    return {
+        "id": course.id,
+        "title": course.title,
+        "status": course.status,
+        "progress_percent": course.progress_percent or 0,
+        "completed_at": _date(course.completed_at),
+        "module_count": course.module_count,
+        "completed_module_count": course.completed_module_count,
+    }
+
+
+@api_bp.route("/me")
+@api_login_required
+def me():
+    """The signed-in user's streak + reminder state."""
+
+    def build():
+        user = db.session.get(User, current_user.id)
+        return {
+            "id": user.id,
+            "username": user.username,
+            "streak_days": user.streak_days or 0,
+            "last_active_date": _date(user.last_active_date),
+            "reminder_due": user.reminder_due,
+        }
+
+    return conditional_json(build)
+
+
+@api_bp.route("/courses")
+@api_login_required
+def courses():
+    """
+    The user's courses with their progress, keyset-paginated:
+        GET /api/courses?after=<last id>&limit=50
+    """
+    after = request.args.get("after", type=int)
+    limit = max(1, min(request.args.get("limit", 50, type=int), MAX_PAGE_SIZE))
+
+    def build():
+        query = Course.query.filter(Course.user_id == current_user.id)
+        if after is not None:
+            query = query.filter(Course.id > after)
+        rows = query.order_by(Course.id).limit(limit + 1).all()
+        return {
+            "courses": [course_json(course) for course in rows[:limit]],
+            "next_after": rows[limit - 1].id if len(rows) > limit else None,
+        }
+
+    return conditional_json(build)
+
+
+@api_bp.route("/courses/<int:course_id>")
+@api_login_required
+def course(course_id):
+    """One course with its module progress rows."""
+    # resolve (and 404) before the conditional check: an unknown or
+    # foreign course must not answer 304 to a current user ETag
+    course = Course.query.filter_by(id=course_id, user_id=current_user.id).first()
+    if course is None:
+        abort(404)
+
+    def build():
+        modules = (
+            ModuleProgress.query.filter_by(course_id=course.id, user_id=current_user.id)
+            .order_by(ModuleProgress.id)
+            .all()
+        )
+        data = course_json(course)
+        data["modules"] = [
+            {"module_name": m.module_name, "percent_complete": m.percent_complete or 0}
+            for m in modules
+        ]
+        return data
+
+    return conditional_json(build)
+
+
+# -------------------------------------------------------------
+# NOTES SEARCH (full text, see app/search.py)
+# -------------------------------------------------------------
+@api_bp.route("/notes/search")
+@api_login_required
+def notes_search():
+    """
+    The user's notes containing every word of ?q, best matches first:
+        GET /api/notes/search?q=loop+review&page=2&per_page=20
+
+    "snippet" is HTML: the note text escaped, matches in <mark>.
+    """
+    found = search_notes(
+        current_user.id,
+        request.args.get("q", ""),
+        page=max(request.args.get("page", 1, type=int), 1),
+        per_page=request.args.get("per_page", 20, type=int),
+    )
+    for hit in found["results"]:
+        hit["created_at"] = _date(hit["created_at"])
+        hit["snippet"] = str(hit["snippet"])
+    response = jsonify(found)
+    # notes are not part of data_version: do not let clients reuse it
+    response.headers["Cache-Control"] = "private, no-store"
+    return response
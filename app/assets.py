@@ -0,0 +1,228 @@
+# -------------------------------------------------------------
+# assets.py
+# -------------------------------------------------------------
+# Purpose:
+#   Fingerprinted static files and responsive image variants.
+#
+#       flask --app app build-assets      (once per deploy)
+#
+#   The build step copies every file under app/static into
+#   app/static/<ASSET_DIR>/ with a content hash in its name
+#   (styles.css -> styles.3f9a0c2e71.css) and, when Pillow is
+#   installed, writes downscaled + recompressed WebP variants of
+#   each image at ASSET_IMAGE_WIDTHS.  Text files (CSS, JS, SVG)
+#   also get .br/.gz copies for compression.py.  A manifest.json
+#   maps the original paths to the built files.
+#
+#   Templates use:
+#       asset_url("styles.css")          fingerprinted URL
+#       picture("img/x.png", alt, ...)   <picture> with a WebP
+#                                        srcset (templates/_assets.html)
+#
+#   Built files never change under the same name, so they are
+#   served with "Cache-Control: public, max-age=<1 year>, immutable"
+#   and repeat visits do not even revalidate them.  Without a build
+#   (tests, fresh checkouts) both helpers fall back to the plain
+#   url_for("static", ...) files.
+# -------------------------------------------------------------
+
+import hashlib
+import io
+import json
+import logging
+import mimetypes
+import os
+import shutil
+
+from flask import current_app, request, url_for
+
+from .compression import SUFFIXES, precompress
+
+try:  # optional: image variants are skipped without Pillow
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+
+asset_log = logging.getLogger("tmj.assets")
+
+MANIFEST_NAME = "manifest.json"
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+
+# WebP output: (Pillow format / extension, mimetype, save options)
+WEBP = ("webp", "image/webp", {"quality": 80, "method": 6})
+
+
+def _digest(data, length=10):
+    return hashlib.sha256(data).hexdigest()[:length]
+
+
+def _built_name(rel_path, data, suffix="", ext=None):
+    """img/Completion Badge.png -> img/Completion-Badge.<hash><suffix>.png"""
+    folder, filename = os.path.split(rel_path)
+    stem, original_ext = os.path.splitext(filename)
+    ext = ext or original_ext.lstrip(".").lower()
+    name = f"{stem.replace(' ', '-')}.{_digest(data)}{suffix}.{ext}"
+    return f"{folder}/{name}" if folder else name
+
+
+def _image_variants(data, widths):
+    """(width, height, [(width, bytes)]) of WebP variants, or None."""
+    if Image is None:
+        return None
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except Exception:  # not an image Pillow can read
+        return None
+
+    width, height = image.size
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    variants = []
+    # every configured width below the original, plus the original width
+    for target in sorted({w for w in widths if w < width} | {width}):
+        if target == width:
+            resized = image
+        else:
+            resized = image.resize(
+                (target, max(1, round(height * target / width))), Image.LANCZOS
+            )
+        out = io.BytesIO()
+        resized.save(out, format=WEBP[0], **WEBP[2])
+        variants.append((target, out.getvalue()))
+    return width, height, variants
+
+
+def build_assets(static_dir, asset_dir="dist", widths=(160, 320, 640, 1280), log=None):
+    """
+    Rebuild `static_dir/asset_dir` from the files in `static_dir`.
+
+    Returns the manifest: {original path: {"file", "encodings"
+    (precompressed copies), and for images "width", "height",
+    "variants": {mimetype: [[width, file], ...]}}}.
+    Paths are relative to `static_dir`, with "/" separators.
+    """
+    log = log or asset_log.info
+    out_root = os.path.join(static_dir, asset_dir)
+    if os.path.isdir(out_root):
+        shutil.rmtree(out_root)
+
+    if Image is None:
+        log("Pillow is not installed: copying files without image variants.")
+
+    manifest = {}
+    written = saved = 0
+
+    def write(rel_path, data):
+        target = os.path.join(out_root, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as fh:
+            fh.write(data)
+        return f"{asset_dir}/{rel_path}"
+
+    for folder, dirnames, filenames in os.walk(static_dir):
+        if os.path.abspath(folder) == os.path.abspath(static_dir):
+            dirnames[:] = [d for d in dirnames if d != asset_dir]
+        dirnames.sort()
+        for filename in sorted(filenames):
+            source = os.path.join(folder, filename)
+            rel_path = os.path.relpath(source, static_dir).replace(os.sep, "/")
+            with open(source, "rb") as fh:
+                data = fh.read()
+
+            built = _built_name(rel_path, data)
+            entry = {"file": write(built, data)}
+            written += len(data)
+
+            copies = precompress(data, mimetypes.guess_type(filename)[0])
+            for encoding, body in copies.items():
+                write(built + SUFFIXES[encoding], body)
+            if copies:
+                entry["encodings"] = sorted(copies)
+
+            if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+                image = _image_variants(data, widths)
+                if image:
+                    width, height, variants = image
+                    entry["width"], entry["height"] = width, height
+                    entry["variants"] = {
+                        WEBP[1]: [
+                            [w, write(_built_name(rel_path, body, f"-{w}w", WEBP[0]), body)]
+                            for w, body in variants
+                        ]
+                    }
+                    saved += len(data) - len(variants[-1][1])
+
+            manifest[rel_path] = entry
+
+    with open(os.path.join(out_root, MANIFEST_NAME), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+
+    log(
+        f"Built {len(manifest)} assets ({written / 1024:,.0f} KB) into {out_root}"
+        + (f"; full-size WebP saves {saved / 1024:,.0f} KB" if saved else "")
+    )
+    return manifest
+
+
+# -------------------------------------------------------------
+# Runtime: URLs, srcsets and cache headers
+# -------------------------------------------------------------
+def load_manifest(app):
+    path = os.path.join(app.static_folder, app.config["ASSET_DIR"], MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def _manifest():
+    return current_app.extensions["assets"]
+
+
+def asset_url(path):
+    """URL of the fingerprinted copy of `path` (or the plain static file)."""
+    entry = _manifest().get(path)
+    return url_for("static", filename=entry["file"] if entry else path)
+
+
+def asset_srcset(path, mimetype="image/webp"):
+    """'<url> 320w, <url> 640w, ...' for `path`, or "" without variants."""
+    entry = _manifest().get(path)
+    variants = entry.get("variants", {}).get(mimetype) if entry else None
+    if not variants:
+        return ""
+    return ", ".join(f"{url_for('static', filename=file)} {w}w" for w, file in variants)
+
+
+def asset_info(path):
+    """Manifest entry of `path` ({} when not built): file, width, height, ..."""
+    return _manifest().get(path, {})
+
+
+def init_assets(app):
+    """Load the asset manifest and register the template helpers."""
+    app.extensions["assets"] = load_manifest(app)
+    app.jinja_env.globals.update(
+        asset_url=asset_url, asset_srcset=asset_srcset, asset_info=asset_info
+    )
+
+    prefix = app.config["ASSET_DIR"] + "/"
+    max_age = app.config["ASSET_MAX_AGE"]
+
+    @app.after_request
+    def cache_built_assets(response):
+        # fingerprinted files never change: let browsers keep them
+        if (
+            request.endpoint == "static"
+            and (request.view_args or {}).get("filename", "").startswith(prefix)
+            and not request.view_args["filename"].endswith(MANIFEST_NAME)
+            and response.status_code in (200, 206, 304)
+        ):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+            response.cache_control.immutable = True
+        return response
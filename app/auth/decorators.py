@@ -0,0 +1,63 @@
+# -------------------------------------------------------------
+# Access decorators shared by the blueprints
+# -------------------------------------------------------------
+
+import hmac
+from functools import wraps
+
+from flask import abort, current_app, request
+from flask_login import current_user, login_required
+
+
+def is_admin(user):
+    """True if `user` is listed in ADMIN_USERNAMES (config.py)."""
+    return (
+        user.is_authenticated
+        and user.username in current_app.config.get("ADMIN_USERNAMES", ())
+    )
+
+
+def admin_required(view):
+    """Like @login_required, but also 403 for non-admin users."""
+
+    @wraps(view)
+    @login_required
+    def wrapped(*args, **kwargs):
+        if not is_admin(current_user):
+            abort(403)
+        return view(*args, **kwargs)
+
+    return wrapped
+
+
+def api_login_required(view):
+    """Like @login_required, but answers 401 instead of redirecting."""
+
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not current_user.is_authenticated:
+            abort(401)
+        return view(*args, **kwargs)
+
+    return wrapped
+
+
+def has_api_token():
+    """True if the request carries "Authorization: Bearer <API_TOKEN>"."""
+    token = current_app.config.get("API_TOKEN")
+    header = request.headers.get("Authorization", "")
+    if not token or not header.startswith("Bearer "):
+        return False
+    return hmac.compare_digest(header[len("Bearer "):].encode(), token.encode())
+
+
+def token_or_admin_required(view):
+    """For the data API: a valid API token, or a logged-in admin (else 401)."""
+
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not (has_api_token() or is_admin(current_user)):
+            abort(401)
+        return view(*args, **kwargs)
+
+    return wrapped
@@ -17,12 +17,14 @@ from flask_login import (
     login_required,
 )
 
-from datetime import date
+from datetime import date, timedelta
 
 from app import db
 
+from ..changes import note_users_changed
 from ..forms import LoginForm
 from ..models import User
+from ..passwords import LoginBusyError
 
 # Blueprint for authentication routes
 auth_bp = Blueprint("auth", __name__, template_folder="templates")
@@ -45,10 +47,22 @@ def login():
         user = User.query.filter_by(username=form.username.data).first()
 
         # Invalid username or password
-        if user is None or not user.check_password(form.password.data):
+        try:
+            valid = user is not None and user.check_password(form.password.data)
+        except LoginBusyError:
+            # too many logins being checked right now: fail fast
+            flash("Too many sign-ins right now. Please try again in a moment.", "warning")
+            return render_template("auth/login.html", form=form), 503, {"Retry-After": "2"}
+
+        if not valid:
             flash("Invalid username or password.", "danger")
             return redirect(url_for("auth.login"))
 
+        # Hash made with old parameters? Upgrade it while we know the password
+        rehashed = user.password_needs_rehash()
+        if rehashed:
+            user.set_password(form.password.data)
+
         # Login user
         remember_flag = False
         if hasattr(form, "remember_me"):
@@ -56,8 +70,10 @@ def login():
 
         login_user(user, remember=remember_flag)
 
-        #Update the user's streak:
-        update_streak_for_user(user)
+        # Update the user's streak; a repeat login on the same day
+        # (and no rehash) writes nothing and commits nothing
+        if update_streak_for_user(user) or rehashed:
+            db.session.commit()
 
         # Redirect to next page or homepage
         next_page = request.args.get("next")
@@ -83,23 +99,42 @@ def logout():
 
 def update_streak_for_user(user):
     """
-    Update user's streak based on their last_active_date.
-    Call this AFTER a successful login (once real auth exists).
+    Count today's activity in the user's streak.
+
+    One conditional UPDATE that only matches if the user was not yet
+    active today, with the increment done by the database: two logins
+    racing from different devices cannot both count the day.  Returns
+    True if the row was updated; the caller commits.
     """
 
     today = date.today()
-
-    if user.last_active_date is None:
-        user.streak_days = 1
-    elif user.last_active_date == today:
-        db.session.commit()
-        return
-    else:
-        days = (today - user.last_active_date).days
-        if days == 1:
-            user.streak_days += 1
-        else:
-            user.streak_days = 1
-
-    user.last_active_date = today
-    db.session.commit()
+    if user.last_active_date == today:
+        return False  # already counted: no write, no lock
+
+    result = db.session.execute(
+        db.update(User)
+        .where(
+            User.id == user.id,
+            db.or_(User.last_active_date.is_(None), User.last_active_date < today),
+        )
+        .values(
+            streak_days=db.case(
+                (
+                    User.last_active_date == today - timedelta(days=1),
+                    db.func.coalesce(User.streak_days, 0) + 1,
+                ),
+                else_=1,
+            ),
+            last_active_date=today,
+            reminder_due=False,  # active today: nothing to remind about
+            data_version=User.data_version + 1,
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    if not result.rowcount:
+        return False
+
+    # bulk UPDATE: refresh the loaded user and tell the caches on commit
+    db.session.expire(user, ["streak_days", "last_active_date", "reminder_due", "data_version"])
+    note_users_changed(db.session, {user.id: {"user"}}, version_bumped=True)
+    return True
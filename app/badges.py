@@ -0,0 +1,52 @@
+# -------------------------------------------------------------
+# badges.py
+# -------------------------------------------------------------
+# Purpose:
+#   Award badges when courses are completed - as a background job,
+#   never inside the request that completed the course.
+#
+#   progress.py queues a "course_completed" job (after commit) for
+#   every course whose completed_at was just set, both from the ORM
+#   write path and from bulk rebuilds.  The handler below awards the
+#   missing "course-complete" badges for a whole batch of courses
+#   with one lookup and one bulk INSERT.  Re-running it is harmless.
+# -------------------------------------------------------------
+
+from datetime import date
+
+from . import db
+from .jobs import job_handler
+from .models import Badge, Course
+
+COURSE_COMPLETE = "course-complete"
+
+
+@job_handler("course_completed")
+def award_completion_badges(payloads):
+    """payloads: [{"course_id": ..., "user_id": ...}, ...]"""
+    course_ids = {payload["course_id"] for payload in payloads}
+
+    completed = db.session.execute(
+        db.select(Course.id, Course.user_id).where(
+            Course.id.in_(course_ids), Course.completed_at.is_not(None)
+        )
+    ).all()
+    awarded = set(
+        db.session.scalars(
+            db.select(Badge.course_id).where(
+                Badge.kind == COURSE_COMPLETE, Badge.course_id.in_(course_ids)
+            )
+        )
+    )
+
+    today = date.today()
+    new_badges = [
+        {"user_id": user_id, "course_id": course_id, "kind": COURSE_COMPLETE,
+         "awarded_at": today}
+        for course_id, user_id in completed
+        if course_id not in awarded
+    ]
+    if new_badges:
+        db.session.execute(db.insert(Badge.__table__), new_badges)
+        db.session.commit()
+    return len(new_badges)
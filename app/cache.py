@@ -0,0 +1,289 @@
+# -------------------------------------------------------------
+# cache.py
+# -------------------------------------------------------------
+# Purpose:
+#   Small cache layer used to skip rebuilding per-user page data.
+#
+#   Backends (DASHBOARD_CACHE_BACKEND / USER_CACHE_BACKEND in config.py):
+#     - "memory" : TTLCache, an in-process LRU with a time-to-live
+#     - "null"   : NullCache, never stores anything (cache disabled)
+#     - "package.module:factory" : any object with get/set/delete/clear,
+#       e.g. a Redis-backed cache shared by all workers
+#
+#   UserCache wraps a backend, keys entries by user id, counts
+#   hits / misses, and can store each entry with the user.data_version
+#   it was built from.  Any User/Course/ModuleProgress change bumps
+#   that version (see changes.py), so an entry read with a newer
+#   version is stale, whichever process made the change (other
+#   workers, flask ingest-progress, nightly, seed-synthetic).  Local
+#   commits also drop the entry right away.  Two are created per app:
+#     - dashboard cache : computed /feature course cards
+#     - identity cache  : the User row for Flask-Login's user_loader
+#
+#   Each request reads the user's data_version once (one primary
+#   key lookup in load_user_cached); both caches check against it.
+#
+#   A FragmentCache holds rendered template fragments ({% cache %},
+#   see templating.py).  Its keys carry a version, so it is never
+#   invalidated: old entries just age out.
+# -------------------------------------------------------------
+
+import threading
+import time
+from collections import OrderedDict
+from importlib import import_module
+
+from flask import current_app, has_app_context
+from sqlalchemy.orm import make_transient_to_detached
+
+from . import db
+from .changes import on_users_changed
+from .models import User
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize=1024, ttl=300, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None if missing / expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= self._clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class NullCache:
+    """Backend that stores nothing (turns caching off)."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+def make_cache_backend(name, maxsize=1024, ttl=300):
+    """Build a cache backend from its config name."""
+    if name == "memory":
+        return TTLCache(maxsize=maxsize, ttl=ttl)
+    if name in (None, "", "null"):
+        return NullCache()
+
+    # "package.module:factory" -> factory(maxsize=..., ttl=...)
+    module_name, _, attr = name.partition(":")
+    factory = getattr(import_module(module_name), attr)
+    return factory(maxsize=maxsize, ttl=ttl)
+
+
+class UserCache:
+    """Per-user cache entries in one namespace, with hit/miss counters."""
+
+    def __init__(self, backend, namespace="dashboard"):
+        self.backend = backend
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # shared by request threads and the job worker: counters only
+        # change (and are read together) under this lock
+        self._lock = threading.Lock()
+
+    def _key(self, user_id):
+        return f"{self.namespace}:{user_id}"
+
+    def get(self, user_id, version=None):
+        """
+        Return the cached value, or None.  An entry stored for another
+        `version` (e.g. an older user.data_version) is stale: it is
+        dropped and counts as a miss.
+        """
+        key = self._key(user_id)
+        entry = self.backend.get(key)
+        stale = entry is not None and entry[0] != version
+        if stale:
+            self.backend.delete(key)
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            if stale:
+                self.invalidations += 1
+        return None if entry is None else entry[1]
+
+    def set(self, user_id, value, version=None):
+        self.backend.set(self._key(user_id), (version, value))
+
+    def get_or_build(self, user_id, build, version=None):
+        """Return the cached value, or call build(), store and return it."""
+        value = self.get(user_id, version)
+        if value is None:
+            value = build()
+            self.set(user_id, value, version)
+        return value
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self.invalidations += 1
+        self.backend.delete(self._key(user_id))
+
+    def stats(self):
+        """Counters for monitoring."""
+        with self._lock:
+            hits, misses, invalidations = self.hits, self.misses, self.invalidations
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "invalidations": invalidations,
+            "size": len(self.backend),
+        }
+
+
+class FragmentCache(UserCache):
+    """Rendered HTML fragments by key (the key includes a version)."""
+
+    def __init__(self, backend, namespace="fragment"):
+        super().__init__(backend, namespace)
+
+
+def init_cache(app):
+    """Create the app's dashboard + identity caches from its config."""
+    app.extensions["dashboard_cache"] = UserCache(
+        make_cache_backend(
+            app.config.get("DASHBOARD_CACHE_BACKEND", "memory"),
+            maxsize=app.config.get("DASHBOARD_CACHE_SIZE", 1024),
+            ttl=app.config.get("DASHBOARD_CACHE_TTL", 300),
+        ),
+        namespace="dashboard",
+    )
+    app.extensions["identity_cache"] = UserCache(
+        make_cache_backend(
+            app.config.get("USER_CACHE_BACKEND", "memory"),
+            maxsize=app.config.get("USER_CACHE_SIZE", 4096),
+            ttl=app.config.get("USER_CACHE_TTL", 60),
+        ),
+        namespace="user",
+    )
+    app.extensions["fragment_cache"] = FragmentCache(
+        make_cache_backend(
+            app.config.get("FRAGMENT_CACHE_BACKEND", "memory"),
+            maxsize=app.config.get("FRAGMENT_CACHE_SIZE", 10000),
+            ttl=app.config.get("FRAGMENT_CACHE_TTL", 3600),
+        )
+    )
+
+
+def dashboard_cache():
+    """The current app's dashboard cache."""
+    return current_app.extensions["dashboard_cache"]
+
+
+def identity_cache():
+    """The current app's identity (user_loader) cache."""
+    return current_app.extensions["identity_cache"]
+
+
+def user_data_version(user_id):
+    """The user's current data_version (one primary key lookup), or None."""
+    return db.session.scalar(db.select(User.data_version).where(User.id == user_id))
+
+
+# -------------------------------------------------------------
+# Cached user loading
+# -------------------------------------------------------------
+# The cache holds a plain dict of the User's columns (never the
+# password hash), stored with the data_version of the row it was
+# read from.  Each request reads only the current data_version (one
+# primary key lookup); on a hit we rebuild a User from the dict and
+# attach it to the session with merge(load=False), which issues no
+# further query.  The object then behaves like a normally loaded
+# user (edits are saved, relationships and password_hash load
+# lazily when touched).
+#
+# A snapshot is always filed under its own row's version, so a
+# request that read the row just before a commit cannot store it
+# as current, and a change made by another process is seen on the
+# very next request.
+# -------------------------------------------------------------
+_UNCACHED_USER_COLUMNS = {"password_hash"}
+
+
+def _user_snapshot(user):
+    return {
+        column.key: getattr(user, column.key)
+        for column in User.__table__.columns
+        if column.key not in _UNCACHED_USER_COLUMNS
+    }
+
+
+def load_user_cached(user_id):
+    """Return the User with this id, from the identity cache when possible."""
+    cache = identity_cache()
+    version = user_data_version(user_id)
+    if version is None:
+        return None
+    snapshot = cache.get(user_id, version)
+
+    if snapshot is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            cache.set(user_id, _user_snapshot(user), user.data_version)
+        return user
+
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+@on_users_changed
+def _invalidate_user_caches(changes):
+    if not has_app_context() or "dashboard_cache" not in current_app.extensions:
+        return
+    for user_id in changes:
+        # the version check catches this too; dropping it now frees the
+        # memory (other processes' entries go on their next read)
+        dashboard_cache().invalidate(user_id)
+        identity_cache().invalidate(user_id)
@@ -0,0 +1,105 @@
+# -------------------------------------------------------------
+# changes.py
+# -------------------------------------------------------------
+# Purpose:
+#   Tell caches which users' data changed when a transaction commits.
+#
+#   During a flush we note the owner (user id) of every User, Course
+#   and ModuleProgress row that is inserted, updated or deleted.  When
+#   the transaction COMMITS, every function registered with
+#   @on_users_changed is called once with {user_id: {kinds}}, e.g.
+#
+#       {7: {"progress", "course"}, 9: {"user"}}
+#
+#   Right before the commit, every changed user's data_version is
+#   bumped in the same transaction (one UPDATE for all of them), so
+#   API clients can revalidate with a cheap ETag (see api/routes.py).
+#
+#   Rolled back transactions notify nobody.  Code that writes with
+#   bulk SQL (bypassing the ORM) calls note_users_changed() inside
+#   its transaction.
+# -------------------------------------------------------------
+
+from itertools import chain
+
+from sqlalchemy import event
+
+from . import db
+from .models import Course, ModuleProgress, User
+
+_listeners = []
+
+# model class -> (kind, attribute holding the owner's user id)
+TRACKED_MODELS = {
+    User: ("user", "id"),
+    Course: ("course", "user_id"),
+    ModuleProgress: ("progress", "user_id"),
+}
+
+
+def on_users_changed(func):
+    """Decorator: call `func(changes)` after each commit that changed users."""
+    _listeners.append(func)
+    return func
+
+
+def notify_users_changed(changes):
+    """Run the registered listeners for {user_id: {kinds}}."""
+    if not changes:
+        return
+    for listener in _listeners:
+        listener(changes)
+
+
+def note_users_changed(session, changes, version_bumped=False):
+    """
+    Notify {user_id: {kinds}} when the session's transaction commits.
+    version_bumped=True: the caller's own UPDATE already did
+    data_version + 1 for these users (saves a second UPDATE).
+    """
+    pending = session.info.setdefault("changed_users", {})
+    for user_id, kinds in changes.items():
+        pending.setdefault(user_id, set()).update(kinds)
+    if version_bumped:
+        session.info.setdefault("bumped_users", set()).update(changes)
+
+
+@event.listens_for(db.session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    pending = session.info.setdefault("changed_users", {})
+    for obj in chain(session.new, session.dirty, session.deleted):
+        tracked = TRACKED_MODELS.get(type(obj))
+        if tracked is None:
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        kind, owner_attr = tracked
+        user_id = getattr(obj, owner_attr)
+        if user_id is not None:
+            pending.setdefault(user_id, set()).add(kind)
+
+
+@event.listens_for(db.session, "before_commit")
+def _bump_data_versions(session):
+    session.flush()  # the final flush would otherwise run after this hook
+    pending = set(session.info.get("changed_users", ())) - session.info.get("bumped_users", set())
+    if not pending:
+        return
+    users = User.__table__
+    session.execute(
+        users.update()
+        .where(users.c.id.in_(pending))
+        .values(data_version=users.c.data_version + 1)
+    )
+
+
+@event.listens_for(db.session, "after_commit")
+def _notify_after_commit(session):
+    session.info.pop("bumped_users", None)
+    notify_users_changed(session.info.pop("changed_users", None))
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("bumped_users", None)
+    session.info.pop("changed_users", None)
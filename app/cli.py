@@ -0,0 +1,168 @@
+# -------------------------------------------------------------
+# cli.py
+# -------------------------------------------------------------
+# Purpose:
+#   Maintenance commands for the `flask` CLI, e.g.
+#
+#       flask --app app upgrade-db
+#       flask --app app seed-synthetic --users 100000 --reset
+#       flask --app app ingest-progress export.ndjson
+#       flask --app app export-data progress -o progress.csv
+#       flask --app app nightly                 (daily, e.g. from cron)
+#       flask --app app build-assets            (once per deploy)
+#       flask --app app compile-templates       (once per deploy)
+#
+#   register_commands(app) is called from create_app().
+# -------------------------------------------------------------
+
+import click
+
+
+def register_commands(app):
+    """Attach the TMJ maintenance commands to `app.cli`."""
+
+    @app.cli.command("upgrade-db")
+    def upgrade_db():
+        """Add missing tables, columns and indexes to the database."""
+        from .schema import upgrade_schema
+
+        changes = upgrade_schema(log=click.echo)
+        if not changes:
+            click.echo("Database schema is up to date.")
+
+    @app.cli.command("seed-synthetic")
+    @click.option("--users", type=int, default=1000, show_default=True)
+    @click.option("--courses-per-user", type=int, default=5, show_default=True)
+    @click.option("--modules-per-course", type=int, default=4, show_default=True)
+    @click.option("--notes-per-user", type=int, default=2, show_default=True)
+    @click.option("--seed", type=int, default=42, show_default=True,
+                  help="Same seed = same data.")
+    @click.option("--chunk-size", type=int, default=10000, show_default=True,
+                  help="Progress + note rows written per transaction.")
+    @click.option("--prefix", default="synth", show_default=True,
+                  help="Username prefix (usernames are <prefix><user id>).")
+    @click.option("--password", default="password123", show_default=True)
+    @click.option("--reset", is_flag=True,
+                  help="Drop and recreate all tables first (default: append).")
+    @click.option("--yes", is_flag=True, help="Do not ask before --reset.")
+    def seed_synthetic(users, courses_per_user, modules_per_course, notes_per_user,
+                       seed, chunk_size, prefix, password, reset, yes):
+        """Bulk-generate a large synthetic dataset for performance tests."""
+        from .datagen import generate_dataset
+
+        if reset and not yes:
+            click.confirm("Drop ALL existing data first?", abort=True)
+
+        def report(done, total, rows, seconds):
+            rate = rows / seconds if seconds else 0
+            click.echo(f"  {done}/{total} users, {rows} rows ({rate:,.0f} rows/s)")
+
+        counts = generate_dataset(
+            users,
+            courses_per_user=courses_per_user,
+            modules_per_course=modules_per_course,
+            notes_per_user=notes_per_user,
+            seed=seed,
+            chunk_size=chunk_size,
+            password=password,
+            prefix=prefix,
+            reset=reset,
+            progress=report,
+        )
+        seconds = counts.pop("seconds")
+        counts.pop("first_user_id")
+        click.echo(
+            f"Inserted {sum(counts.values())} rows in {seconds:.1f}s: "
+            + ", ".join(f"{table}={n}" for table, n in counts.items())
+        )
+
+    @app.cli.command("ingest-progress")
+    @click.argument("source", type=click.File("r", encoding="utf-8"), default="-")
+    @click.option("--format", "fmt", type=click.Choice(["ndjson", "csv"]),
+                  help="Default: from the file extension, else ndjson.")
+    @click.option("--chunk-size", type=int, help="Records per transaction.")
+    def ingest_progress_command(source, fmt, chunk_size):
+        """Upsert module progress from an NDJSON/CSV file (or stdin)."""
+        from .ingest import ingest_progress, read_records
+
+        if fmt is None:
+            fmt = "csv" if source.name.endswith(".csv") else "ndjson"
+
+        def report_chunk(report):
+            click.echo(f"  {report['records']} records "
+                       f"({report['inserted']} new, {report['updated']} updated)")
+
+        report = ingest_progress(
+            read_records(source, fmt),
+            chunk_size=chunk_size or app.config.get("INGEST_CHUNK_SIZE", 5000),
+            progress=report_chunk,
+        )
+        for error in report["errors"]:
+            click.echo("  " + error, err=True)
+        click.echo(
+            f"{report['records']} records in {report['seconds']:.1f}s "
+            f"({report['records_per_second']:,.0f}/s): {report['inserted']} inserted, "
+            f"{report['updated']} updated, {report['unchanged']} unchanged, "
+            f"{report['rejected']} rejected; {report['courses']} course totals recomputed"
+        )
+
+    @app.cli.command("export-data")
+    @click.argument("dataset", type=click.Choice(["progress", "notes"]))
+    @click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]),
+                  default="csv", show_default=True)
+    @click.option("--output", "-o", type=click.File("w", encoding="utf-8"),
+                  default="-", help="Default: stdout.")
+    def export_data(dataset, fmt, output):
+        """Stream all progress rows or notes as CSV/NDJSON."""
+        from .export import export_chunks
+
+        for chunk in export_chunks(
+            dataset, fmt, batch_size=app.config.get("EXPORT_BATCH_SIZE", 1000)
+        ):
+            output.write(chunk)
+
+    @app.cli.command("nightly")
+    @click.option("--date", "today", type=click.DateTime(["%Y-%m-%d"]),
+                  help="Run as if today were this date (default: today).")
+    @click.option("--chunk-size", type=int, default=10000, show_default=True,
+                  help="Users per transaction.")
+    def nightly(today, chunk_size):
+        """Reset broken streaks and recompute reminder flags for all users."""
+        from .nightly import run_nightly
+
+        report = run_nightly(
+            today=today.date() if today else None,
+            chunk_size=chunk_size,
+            progress=lambda lo, hi, r: click.echo(
+                f"  users {lo}-{hi}: {r['streaks_reset']} streaks reset, "
+                f"{r['reminders_changed']} reminders changed so far"
+            ),
+        )
+        click.echo(
+            f"Nightly batch done in {report['seconds']:.1f}s: "
+            f"{report['streaks_reset']} streaks reset, "
+            f"{report['reminders_changed']} reminder flags changed."
+        )
+
+    @app.cli.command("build-assets")
+    def build_assets_command():
+        """Fingerprint static files and build responsive image variants."""
+        from .assets import build_assets
+
+        build_assets(
+            app.static_folder,
+            asset_dir=app.config["ASSET_DIR"],
+            widths=app.config["ASSET_IMAGE_WIDTHS"],
+            log=click.echo,
+        )
+        click.echo("Restart the app servers to serve the new manifest.")
+
+    @app.cli.command("compile-templates")
+    def compile_templates_command():
+        """Compile all templates into the on-disk bytecode cache."""
+        from .templating import compile_templates
+
+        if not app.config.get("JINJA_BYTECODE_CACHE_DIR"):
+            raise click.ClickException("JINJA_BYTECODE_CACHE_DIR is not set.")
+        count = compile_templates(app)
+        click.echo(f"Compiled {count} templates into {app.config['JINJA_BYTECODE_CACHE_DIR']}.")
@@ -0,0 +1,170 @@
+# -------------------------------------------------------------
+# compression.py
+# -------------------------------------------------------------
+# Purpose:
+#   Send fewer bytes over the wire (COMPRESS_* in config.py).
+#
+#   Dynamic responses (HTML pages, JSON, CSS ...):
+#     - compressed in an after_request hook with brotli (if the
+#       `brotli` package is installed) or gzip, whichever the
+#       client's Accept-Encoding prefers
+#     - small bodies (< COMPRESS_MIN_SIZE), streamed responses
+#       (exports) and files are left alone
+#     - ETags become weak (W/"..."): the compressed body is a
+#       different byte sequence, but the same content
+#
+#   Pages that carry the CSRF token (forms) are never compressed:
+#   the token next to text an attacker can put in the page (e.g. the
+#   echoed username on a failed login) lets the compressed size leak
+#   the token byte by byte (the BREACH attack).
+#
+#   Built static files (app/static/<ASSET_DIR>, see assets.py):
+#     - `flask build-assets` stores <file>.br / <file>.gz next to
+#       every compressible file, at maximum compression, once
+#     - the static route serves the best precompressed copy the
+#       client accepts, so static files are never compressed per
+#       request.  Range and conditional requests keep working
+#       (Flask's send_file handles them for every copy).
+#
+#   Media (mp4, png, ...) is already compressed and is always sent
+#   as is, with byte-range support for seeking/streaming.
+# -------------------------------------------------------------
+
+import gzip
+import mimetypes
+import os
+
+from flask import g, request, send_from_directory
+
+try:  # optional: gzip only without it
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Content-Encoding -> suffix of the precompressed static copy
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+COMPRESSIBLE_MIMETYPES = {
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/csv",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+def available_encodings():
+    """Encodings this process can produce, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress(data, encoding, level=None):
+    """Compress bytes; `level` None = maximum (used for build time)."""
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if level is None else level)
+    if encoding == "gzip":
+        # mtime=0: the same input always gives the same bytes
+        return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+    raise ValueError(f"unsupported encoding {encoding!r}")
+
+
+def precompress(data, mimetype):
+    """{encoding: bytes} worth storing next to a static file."""
+    if mimetype not in COMPRESSIBLE_MIMETYPES:
+        return {}
+    copies = {}
+    for encoding in available_encodings():
+        body = compress(data, encoding)
+        if len(body) < len(data) * 0.95:
+            copies[encoding] = body
+    return copies
+
+
+def _add_vary(response):
+    response.vary.add("Accept-Encoding")
+
+
+def _weaken_etag(response):
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+# -------------------------------------------------------------
+# Precompressed static files
+# -------------------------------------------------------------
+def _static_view(app, plain_view):
+    asset_prefix = app.config["ASSET_DIR"] + "/"
+
+    def static(filename):
+        if not filename.startswith(asset_prefix):
+            return plain_view(filename=filename)
+
+        path = os.path.join(app.static_folder, filename)
+        offered = [
+            encoding for encoding in available_encodings()
+            if os.path.isfile(path + SUFFIXES[encoding])
+        ]
+        encoding = request.accept_encodings.best_match(offered) if offered else None
+        if encoding is None:
+            response = plain_view(filename=filename)
+        else:
+            response = send_from_directory(
+                app.static_folder,
+                filename + SUFFIXES[encoding],
+                mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                download_name=os.path.basename(filename),
+                max_age=app.get_send_file_max_age(filename),
+            )
+            response.headers["Content-Encoding"] = encoding
+        if offered:
+            _add_vary(response)
+        return response
+
+    return static
+
+
+def init_compression(app):
+    """Compress dynamic responses and serve precompressed static files."""
+    if not app.config["COMPRESS_ENABLED"]:
+        return
+
+    app.view_functions["static"] = _static_view(app, app.view_functions["static"])
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough  # files: see the static view above
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or (response.status_code != 304 and response.mimetype not in COMPRESSIBLE_MIMETYPES)
+            # BREACH: a CSRF token was rendered into this response
+            or app.config.get("WTF_CSRF_FIELD_NAME", "csrf_token") in g
+        ):
+            return response
+
+        _add_vary(response)
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+        if response.status_code == 304:
+            # same validator as the compressed 200 this replaces
+            _weaken_etag(response)
+            return response
+        if response.status_code != 200:
+            return response
+
+        data = response.get_data()
+        if len(data) < app.config["COMPRESS_MIN_SIZE"]:
+            return response
+
+        level = app.config["COMPRESS_BR_LEVEL" if encoding == "br" else "COMPRESS_GZIP_LEVEL"]
+        response.set_data(compress(data, encoding, level))
+        response.headers["Content-Encoding"] = encoding
+        _weaken_etag(response)
+        return response
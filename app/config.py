@@ -11,9 +11,12 @@
 #     - Sets up a SQLite database URI for SQLAlchemy
 #     - Disables unnecessary modification tracking
 #
-#   In later milestones (M2/M3):
-#     - we might load different configurations (dev/test/prod)
-#       or use environment variables for security.
+#   Environments:
+#     create_app("development" | "testing" | "production")
+#     picks one of the Config subclasses at the bottom of this
+#     file (default: the FLASK_CONFIG environment variable, or
+#     "development").  Most values can also be set through
+#     environment variables.
 # -------------------------------------------------------------
 
 import os  # Used to work with file paths and environment variables
@@ -76,3 +79,245 @@ class Config:
     # wastes memory, so we disable it by setting this to False.
     # ---------------------------------------------------------
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+
+    # ---------------------------------------------------------
+    # SQLite performance profile (see app/database.py)
+    # ---------------------------------------------------------
+    # PRAGMAs run on every new SQLite connection:
+    #   "production"  : WAL, synchronous=NORMAL, busy_timeout,
+    #                   bigger page cache, mmap, temp_store=MEMORY
+    #   "development" : WAL, synchronous=NORMAL, busy_timeout
+    #   "off"         : SQLite defaults
+    #
+    # SQLITE_PRAGMAS overrides single values, e.g.
+    #   SQLITE_PRAGMAS = {"busy_timeout": 10000}
+    # (ignored when DATABASE_URL points at a non-SQLite server)
+    # ---------------------------------------------------------
+    SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "production")
+    SQLITE_PRAGMAS = {}
+
+
+    # ---------------------------------------------------------
+    # Connection pool (see app/database.py)
+    # ---------------------------------------------------------
+    # Used when DATABASE_URL points at a server database
+    # (PostgreSQL / MySQL) and for SQLite files:
+    #   DB_POOL_SIZE        connections kept open per worker
+    #   DB_MAX_OVERFLOW     extra connections allowed under bursts
+    #   DB_POOL_TIMEOUT     seconds to wait for a free connection
+    #   DB_POOL_RECYCLE     reopen connections older than this (s)
+    #   DB_POOL_PRE_PING    test a connection before handing it out
+    #   DB_STATEMENT_TIMEOUT_MS  server-side query time limit (0 = none)
+    #
+    # Pool usage (checked out, overflow, wait time) is recorded
+    # so workers/pool sizes can be tuned; see pool_stats().
+    # ---------------------------------------------------------
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1") == "1"
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 0))
+
+
+    # ---------------------------------------------------------
+    # Password hashing (see app/passwords.py)
+    # ---------------------------------------------------------
+    # PASSWORD_HASH_METHOD uses werkzeug's format:
+    #   "scrypt:32768:8:1"       (scrypt, N / r / p)
+    #   "pbkdf2:sha256:600000"   (pbkdf2, iterations)
+    # Stored hashes made with other parameters are upgraded
+    # automatically the next time that user logs in.
+    #
+    # PASSWORD_VERIFY_WORKERS > 0 checks passwords in a bounded
+    # thread pool (0 = check on the request thread).  When more
+    # than PASSWORD_VERIFY_MAX_PENDING checks are waiting, new
+    # logins get "try again" instead of piling up.
+    # ---------------------------------------------------------
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_SALT_LENGTH = int(os.environ.get("PASSWORD_SALT_LENGTH", 16))
+    PASSWORD_VERIFY_WORKERS = int(os.environ.get("PASSWORD_VERIFY_WORKERS", 0))
+    PASSWORD_VERIFY_MAX_PENDING = int(os.environ.get("PASSWORD_VERIFY_MAX_PENDING", 0))
+    PASSWORD_VERIFY_TIMEOUT = float(os.environ.get("PASSWORD_VERIFY_TIMEOUT", 10))
+
+
+    # ---------------------------------------------------------
+    # Instrumentation + admin metrics (see app/instrumentation.py)
+    # ---------------------------------------------------------
+    # INSTRUMENTATION_ENABLED adds Server-Timing headers, a JSON
+    # log line per request and rolling p50/p95/p99 per endpoint
+    # (last METRICS_WINDOW requests).
+    #
+    # ADMIN_USERNAMES (comma separated) may open /admin/metrics.
+    # ---------------------------------------------------------
+    INSTRUMENTATION_ENABLED = os.environ.get("INSTRUMENTATION_ENABLED", "0") == "1"
+    METRICS_WINDOW = int(os.environ.get("METRICS_WINDOW", 1000))
+    ADMIN_USERNAMES = {
+        name.strip()
+        for name in os.environ.get("ADMIN_USERNAMES", "").split(",")
+        if name.strip()
+    }
+
+
+    # ---------------------------------------------------------
+    # Background jobs (see app/jobs.py)
+    # ---------------------------------------------------------
+    # Follow-up work (completion badges) runs on
+    # JOB_WORKERS threads per process, in batches of up to
+    # JOB_BATCH_SIZE jobs collected for JOB_BATCH_WAIT seconds.
+    # JOB_WORKERS = 0 runs jobs inline right after the commit.
+    # ---------------------------------------------------------
+    JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 1))
+    JOB_BATCH_SIZE = int(os.environ.get("JOB_BATCH_SIZE", 100))
+    JOB_BATCH_WAIT = float(os.environ.get("JOB_BATCH_WAIT", 0.05))
+
+
+    # ---------------------------------------------------------
+    # Data API for sync / reporting jobs (see app/api/routes.py)
+    # ---------------------------------------------------------
+    # Jobs send "Authorization: Bearer <API_TOKEN>" (admins may
+    # also call the API from a logged-in session).  No token set =
+    # admin sessions only.
+    #
+    # INGEST_CHUNK_SIZE records are written per transaction;
+    # exports fetch and send EXPORT_BATCH_SIZE rows at a time.
+    # ---------------------------------------------------------
+    API_TOKEN = os.environ.get("API_TOKEN")
+    INGEST_CHUNK_SIZE = int(os.environ.get("INGEST_CHUNK_SIZE", 5000))
+    EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+
+
+    # ---------------------------------------------------------
+    # Dashboard cache (see app/cache.py)
+    # ---------------------------------------------------------
+    # The /feature page shows DASHBOARD_PAGE_SIZE course cards per
+    # page and keeps each user's first page for DASHBOARD_CACHE_TTL
+    # seconds (at most DASHBOARD_CACHE_SIZE users per worker).
+    # Entries carry the user's data_version, checked on every view,
+    # so a change made by any process (another worker, ingest,
+    # nightly) is seen on the next request, even with "memory".
+    #
+    # Backend: "memory" (default), "null" (off), or
+    # "package.module:factory" for a custom/shared cache.
+    # ---------------------------------------------------------
+    DASHBOARD_CACHE_BACKEND = os.environ.get("DASHBOARD_CACHE_BACKEND", "memory")
+    DASHBOARD_CACHE_TTL = int(os.environ.get("DASHBOARD_CACHE_TTL", 300))
+    DASHBOARD_CACHE_SIZE = int(os.environ.get("DASHBOARD_CACHE_SIZE", 1024))
+    DASHBOARD_PAGE_SIZE = int(os.environ.get("DASHBOARD_PAGE_SIZE", 20))
+
+    # Anonymous visitors see a cached snapshot of this user's courses
+    # (the demo student created by seed.py), never live queries.
+    DEMO_USERNAME = os.environ.get("DEMO_USERNAME", "student1")
+
+
+    # ---------------------------------------------------------
+    # Static assets (see app/assets.py)
+    # ---------------------------------------------------------
+    # `flask build-assets` writes fingerprinted copies of app/static
+    # into app/static/<ASSET_DIR>/, plus WebP variants of images at
+    # ASSET_IMAGE_WIDTHS pixels (needs Pillow).  Built files are
+    # served with an immutable Cache-Control of ASSET_MAX_AGE seconds.
+    # ---------------------------------------------------------
+    ASSET_DIR = os.environ.get("ASSET_DIR", "dist")
+    ASSET_IMAGE_WIDTHS = tuple(
+        int(w) for w in os.environ.get("ASSET_IMAGE_WIDTHS", "160,320,640,1280").split(",")
+    )
+    ASSET_MAX_AGE = int(os.environ.get("ASSET_MAX_AGE", 365 * 24 * 3600))
+
+
+    # ---------------------------------------------------------
+    # Response compression (see app/compression.py)
+    # ---------------------------------------------------------
+    # HTML / JSON / CSS responses of at least COMPRESS_MIN_SIZE
+    # bytes are sent brotli- (needs the `brotli` package) or
+    # gzip-compressed, as the client's Accept-Encoding prefers.
+    # Built static files are precompressed once by build-assets.
+    # Pages with a CSRF token are sent uncompressed (BREACH); a
+    # proxy that compresses must skip them too (or all HTML).
+    # Turn off when a proxy in front (nginx, CDN) compresses.
+    # ---------------------------------------------------------
+    COMPRESS_ENABLED = os.environ.get("COMPRESS_ENABLED", "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 500))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", 6))
+    COMPRESS_BR_LEVEL = int(os.environ.get("COMPRESS_BR_LEVEL", 5))
+
+
+    # ---------------------------------------------------------
+    # Identity cache (Flask-Login user_loader, see app/cache.py)
+    # ---------------------------------------------------------
+    # The logged-in User row is cached for USER_CACHE_TTL seconds,
+    # so most requests resolve the user by reading data_version only
+    # (one primary key lookup).  A row cached for an older version is
+    # reloaded, whichever process changed it (streak, password, ...).
+    # ---------------------------------------------------------
+    USER_CACHE_BACKEND = os.environ.get("USER_CACHE_BACKEND", "memory")
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 60))
+    USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 4096))
+
+
+    # ---------------------------------------------------------
+    # Template caches (see app/templating.py)
+    # ---------------------------------------------------------
+    # JINJA_BYTECODE_CACHE_DIR keeps compiled templates on disk so
+    # new workers start warm (empty = compile in memory only).
+    #
+    # {% cache %} fragments (course cards, module lists) are kept
+    # for FRAGMENT_CACHE_TTL seconds, at most FRAGMENT_CACHE_SIZE
+    # per worker; same backend choices as the dashboard cache.
+    # ---------------------------------------------------------
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get(
+        "JINJA_BYTECODE_CACHE_DIR", os.path.join(os.path.dirname(BASE_DIR), "instance", "jinja-cache")
+    )
+    FRAGMENT_CACHE_BACKEND = os.environ.get("FRAGMENT_CACHE_BACKEND", "memory")
+    FRAGMENT_CACHE_TTL = int(os.environ.get("FRAGMENT_CACHE_TTL", 3600))
+    FRAGMENT_CACHE_SIZE = int(os.environ.get("FRAGMENT_CACHE_SIZE", 10000))
+
+
+# -------------------------------------------------------------
+# Environment-specific configs
+# -------------------------------------------------------------
+class DevelopmentConfig(Config):
+    SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "development")
+
+
+class TestingConfig(Config):
+    TESTING = True
+    WTF_CSRF_ENABLED = False  # easier POSTs in tests
+
+    # fresh in-memory database per app (nothing written to app/app.db)
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    SQLITE_PROFILE = "off"
+
+    # cheap hashes keep the test suite fast
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+
+    # run background jobs inline, so tests see their results at once
+    JOB_WORKERS = 0
+
+    # nothing written outside the test's own temp dirs
+    JINJA_BYTECODE_CACHE_DIR = ""
+
+
+class ProductionConfig(Config):
+    SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "production")
+
+    # more connections per worker + a default query time limit
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 15000))
+
+    # check passwords off the request threads, 2 at a time per worker
+    PASSWORD_VERIFY_WORKERS = int(os.environ.get("PASSWORD_VERIFY_WORKERS", 2))
+
+    JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+
+
+config = {
+    "development": DevelopmentConfig,
+    "testing": TestingConfig,
+    "production": ProductionConfig,
+    "default": DevelopmentConfig,
+}
+
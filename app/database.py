@@ -0,0 +1,198 @@
+# -------------------------------------------------------------
+# database.py
+# -------------------------------------------------------------
+# Purpose:
+#   Engine-level tuning for the database behind Flask-SQLAlchemy.
+#
+#   SQLite: every new connection gets a PRAGMA profile (WAL journal,
+#   busy timeout, page cache, mmap, ...).  WAL lets readers run while
+#   one writer commits, and busy_timeout makes a second writer WAIT
+#   for the lock instead of failing with "database is locked" - which
+#   is what concurrent Gunicorn workers need once logins write streaks.
+#
+#   The profile is picked with SQLITE_PROFILE and individual pragmas
+#   can be overridden with SQLITE_PRAGMAS (see config.py).
+#
+#   Pool: engine_options() turns the DB_POOL_* settings into
+#   SQLALCHEMY_ENGINE_OPTIONS.  Connections come from a TimedQueuePool,
+#   which also records how long requests wait for a connection;
+#   pool_stats() reports that together with checked-out / overflow
+#   counts, to size workers and pools.
+# -------------------------------------------------------------
+
+import threading
+import time
+from functools import partial
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+SQLITE_PROFILES = {
+    # many processes, durable enough, fast reads
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",  # safe with WAL, far fewer fsyncs than FULL
+        "busy_timeout": 5000,  # ms to wait for a lock before giving up
+        "cache_size": -16000,  # negative = KiB -> ~16 MB page cache per connection
+        "mmap_size": 268435456,  # 256 MB memory-mapped reads
+        "temp_store": "MEMORY",
+    },
+    # local runs: WAL + waiting for locks, default caches
+    "development": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+    },
+    # leave SQLite's defaults alone (tests, in-memory databases)
+    "off": {},
+}
+
+
+def sqlite_pragmas(profile="production", overrides=None):
+    """The PRAGMA name -> value dict for a profile (+ overrides)."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(
+            f"Unknown SQLITE_PROFILE {profile!r}; "
+            f"choose one of {', '.join(SQLITE_PROFILES)}"
+        )
+    pragmas = dict(SQLITE_PROFILES[profile])
+    pragmas.update(overrides or {})
+    return pragmas
+
+
+def apply_sqlite_pragmas(pragmas, dbapi_connection, connection_record=None):
+    """'connect' event handler: run the PRAGMAs on a new DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Apply `pragmas` to every connection `engine` opens (SQLite only)."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+    event.listen(engine, "connect", partial(apply_sqlite_pragmas, pragmas))
+
+
+def init_database(app, db):
+    """Install the configured tuning on all of the app's engines."""
+    pragmas = sqlite_pragmas(
+        app.config.get("SQLITE_PROFILE", "production"),
+        app.config.get("SQLITE_PRAGMAS"),
+    )
+    with app.app_context():
+        for engine in db.engines.values():
+            install_sqlite_pragmas(engine, pragmas)
+
+
+# -------------------------------------------------------------
+# Connection pool
+# -------------------------------------------------------------
+class PoolMetrics:
+    """Counters for connection checkouts from one pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited, timed_out=False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_total": round(self.total_wait * 1000, 3),
+                "wait_ms_avg": round(self.total_wait * 1000 / self.checkouts, 3)
+                if self.checkouts
+                else 0.0,
+                "wait_ms_max": round(self.max_wait * 1000, 3),
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that measures how long each checkout waits."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        # _do_get is where QueuePool blocks when every connection is busy
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the configured database, built from
+    the DB_POOL_* settings.  Values already present in
+    config["SQLALCHEMY_ENGINE_OPTIONS"] win.
+    """
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    options = {}
+
+    # in-memory SQLite uses a single shared connection (no pool to tune)
+    if not _is_memory_sqlite(url):
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=config.get("DB_POOL_SIZE", 5),
+            max_overflow=config.get("DB_MAX_OVERFLOW", 10),
+            pool_timeout=config.get("DB_POOL_TIMEOUT", 30),
+            pool_recycle=config.get("DB_POOL_RECYCLE", 1800),
+            pool_pre_ping=config.get("DB_POOL_PRE_PING", True),
+        )
+
+    timeout_ms = config.get("DB_STATEMENT_TIMEOUT_MS", 0)
+    if timeout_ms:
+        backend = url.get_backend_name()
+        if backend == "postgresql":
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+        elif backend in ("mysql", "mariadb"):
+            options["connect_args"] = {
+                "init_command": f"SET SESSION max_execution_time={timeout_ms}"
+            }
+
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    return options
+
+
+def pool_stats(engine):
+    """Current pool utilization for one engine (for the metrics page)."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, TimedQueuePool):
+        stats.update(pool.metrics.as_dict())
+    return stats
+
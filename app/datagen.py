@@ -0,0 +1,200 @@
+# -------------------------------------------------------------
+# datagen.py
+# -------------------------------------------------------------
+# Purpose:
+#   Generate large synthetic datasets for performance testing:
+#
+#       flask --app app seed-synthetic --users 200000 \
+#             --courses-per-user 10 --modules-per-course 6
+#
+#   - rows are built as plain dicts and written with executemany
+#     INSERTs in chunks (one transaction per chunk), never as ORM
+#     objects, so memory stays bounded by --chunk-size
+#   - the same --seed always produces the same data
+#   - course progress totals are computed while generating (bulk
+#     INSERTs skip the ORM hooks in progress.py); reminder flags are
+#     set afterwards by refresh_reminders (reminders.py)
+#   - ids continue after the current max ids, so a run can append
+#     to an existing database (or use --reset to start empty)
+# -------------------------------------------------------------
+
+import random
+import time
+from datetime import date, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from . import db
+from .models import Course, Module, ModuleNote, ModuleProgress, User
+from .passwords import hash_password
+from .progress import progress_percent_of
+from .reminders import refresh_reminders
+
+COURSE_TITLES = [
+    "Intro to Python",
+    "Study Skills & Habits",
+    "Time Management Essentials",
+    "Effective Note-Taking",
+    "Mindfulness for Students",
+    "Data Analysis Basics",
+    "Academic Writing",
+    "Public Speaking",
+]
+
+PERCENT_CHOICES = (0, 0, 10, 25, 40, 60, 80, 100, 100, 100)
+
+# vocabulary for note text (gives search something realistic to index)
+WORDS = (
+    "review quiz exam lecture chapter summary question answer practice "
+    "python loop function variable list dictionary class module import "
+    "deadline schedule plan focus break habit goal streak reminder week "
+    "notes cornell mindmap outline highlight flashcard memory recall "
+    "breathing meditation calm stress sleep energy project group reading"
+).split()
+
+
+def _next_id(model):
+    return (db.session.execute(db.select(db.func.max(model.id))).scalar() or 0) + 1
+
+
+def _note_text(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 24))).capitalize() + "."
+
+
+def generate_dataset(
+    users,
+    courses_per_user=5,
+    modules_per_course=4,
+    notes_per_user=2,
+    seed=42,
+    chunk_size=10000,
+    password="password123",
+    password_method=None,
+    prefix="synth",
+    reset=False,
+    progress=None,
+):
+    """
+    Insert `users` synthetic users with their courses, modules,
+    module progress and notes.
+
+    Every user gets `password` (one shared hash, computed once with
+    `password_method`, or PASSWORD_HASH_METHOD when not given).
+    `progress(done_users, total_users, rows, seconds)` is called after
+    every chunk.  Returns {table name: rows inserted, "first_user_id",
+    "seconds"}.
+    """
+    if reset:
+        db.drop_all()
+        db.create_all()
+
+    rng = random.Random(seed)
+    today = date.today()
+    if password_method:
+        password_hash = generate_password_hash(password, method=password_method)
+    else:
+        password_hash = hash_password(password)
+    notes_per_user = min(notes_per_user, courses_per_user * modules_per_course)
+
+    first_user_id = user_id = _next_id(User)
+    course_id = _next_id(Course)
+    module_id = _next_id(Module)
+
+    tables = [User, Course, Module, ModuleProgress, ModuleNote]  # FK order
+    buffers = {model: [] for model in tables}
+    counts = {model.__tablename__: 0 for model in tables}
+    started = time.perf_counter()
+
+    def flush():
+        for model in tables:
+            rows = buffers[model]
+            if rows:
+                db.session.execute(db.insert(model.__table__), rows)
+                counts[model.__tablename__] += len(rows)
+                rows.clear()
+        db.session.commit()
+        if progress:
+            progress(
+                user_id - first_user_id, users, sum(counts.values()),
+                time.perf_counter() - started,
+            )
+
+    for _ in range(users):
+        username = f"{prefix}{user_id}"
+        inactive_days = rng.randint(0, 14)
+        buffers[User].append(
+            {
+                "id": user_id,
+                "username": username,
+                "email": f"{username}@example.com",
+                "password_hash": password_hash,
+                "streak_days": rng.randint(0, 30),
+                "last_active_date": today - timedelta(days=inactive_days),
+            }
+        )
+
+        user_first_module = module_id
+        for c in range(courses_per_user):
+            percents = [rng.choice(PERCENT_CHOICES) for _ in range(modules_per_course)]
+            completed = sum(p == 100 for p in percents)
+            is_complete = bool(percents) and completed == len(percents)
+
+            buffers[Course].append(
+                {
+                    "id": course_id,
+                    "user_id": user_id,
+                    "title": f"{COURSE_TITLES[c % len(COURSE_TITLES)]} {c // len(COURSE_TITLES) + 1}",
+                    "module_count": len(percents),
+                    "percent_sum": sum(percents),
+                    "completed_module_count": completed,
+                    "started_module_count": sum(p > 0 for p in percents),
+                    "progress_percent": progress_percent_of(sum(percents), len(percents)),
+                    "completed_at": today - timedelta(days=rng.randint(0, 90))
+                    if is_complete
+                    else None,
+                }
+            )
+            for index, percent in enumerate(percents, start=1):
+                buffers[Module].append(
+                    {
+                        "id": module_id,
+                        "course_id": course_id,
+                        "title": f"Module {index}",
+                        "order_index": index,
+                        "is_completed": percent == 100,
+                    }
+                )
+                buffers[ModuleProgress].append(
+                    {
+                        "user_id": user_id,
+                        "course_id": course_id,
+                        "module_name": f"Module {index}",
+                        "percent_complete": percent,
+                    }
+                )
+                module_id += 1
+            course_id += 1
+
+        # notes on distinct modules of this user's courses
+        for offset in range(notes_per_user):
+            buffers[ModuleNote].append(
+                {
+                    "user_id": user_id,
+                    "module_id": user_first_module + offset,
+                    "content": _note_text(rng),
+                    "created_at": today - timedelta(days=rng.randint(0, 60)),
+                }
+            )
+
+        user_id += 1
+        if len(buffers[ModuleProgress]) + len(buffers[ModuleNote]) >= chunk_size:
+            flush()
+
+    flush()
+    # reminder flags come from the same set-based UPDATE as `flask nightly`
+    if users:
+        refresh_reminders(id_range=(first_user_id, user_id - 1), today=today)
+
+    counts["first_user_id"] = first_user_id
+    counts["seconds"] = round(time.perf_counter() - started, 3)
+    return counts
@@ -0,0 +1,112 @@
+# -------------------------------------------------------------
+# export.py
+# -------------------------------------------------------------
+# Purpose:
+#   Stream progress and notes out of the database for reporting,
+#   as CSV or NDJSON, in constant memory:
+#
+#     - rows are read with yield_per (a server-side cursor on
+#       PostgreSQL/MySQL, fetchmany batches on SQLite), never with
+#       .all()
+#     - each batch is formatted and handed on as one text chunk, so
+#       the first bytes go out before the query has finished
+#
+#   export_chunks() is shared by GET /api/export/<dataset> (a
+#   streamed Flask Response) and `flask export-data` (a file/stdout).
+# -------------------------------------------------------------
+
+import csv
+import io
+import json
+from datetime import date
+
+from . import db
+from .models import Course, Module, ModuleNote, ModuleProgress, User
+
+FORMATS = ("csv", "ndjson")
+MIMETYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _progress_query():
+    return (
+        db.select(
+            ModuleProgress.id.label("progress_id"),
+            User.id.label("user_id"),
+            User.username,
+            Course.id.label("course_id"),
+            Course.title.label("course_title"),
+            Course.progress_percent.label("course_percent"),
+            Course.completed_at.label("course_completed_at"),
+            ModuleProgress.module_name,
+            ModuleProgress.percent_complete,
+        )
+        .join(User, User.id == ModuleProgress.user_id)
+        .join(Course, Course.id == ModuleProgress.course_id)
+        .order_by(ModuleProgress.id)
+    )
+
+
+def _notes_query():
+    return (
+        db.select(
+            ModuleNote.id.label("note_id"),
+            User.id.label("user_id"),
+            User.username,
+            Course.id.label("course_id"),
+            Course.title.label("course_title"),
+            Module.id.label("module_id"),
+            Module.title.label("module_title"),
+            ModuleNote.created_at,
+            ModuleNote.content,
+        )
+        .join(User, User.id == ModuleNote.user_id)
+        .join(Module, Module.id == ModuleNote.module_id)
+        .join(Course, Course.id == Module.course_id)
+        .order_by(ModuleNote.id)
+    )
+
+
+DATASETS = {
+    "progress": _progress_query,
+    "notes": _notes_query,
+}
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def export_chunks(dataset, fmt="csv", batch_size=1000):
+    """
+    Yield the export of `dataset` ("progress" or "notes") as text
+    chunks of about `batch_size` rows each.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"unknown dataset {dataset!r} (expected one of {sorted(DATASETS)})")
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r} (expected one of {FORMATS})")
+
+    query = DATASETS[dataset]().execution_options(yield_per=batch_size)
+    result = db.session.execute(query)
+    columns = list(result.keys())
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    try:
+        if fmt == "csv":
+            writer.writerow(columns)
+        for rows in result.partitions():
+            if fmt == "csv":
+                writer.writerows([_plain(v) for v in row] for row in rows)
+            else:
+                for row in rows:
+                    buffer.write(json.dumps(dict(zip(columns, map(_plain, row)))))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():  # header only: nothing to export
+            yield buffer.getvalue()
+    finally:
+        result.close()
@@ -0,0 +1,303 @@
+# -------------------------------------------------------------
+# ingest.py
+# -------------------------------------------------------------
+# Purpose:
+#   Bulk import of module progress from the upstream LMS export.
+#
+#   Input is a stream of records (NDJSON lines or CSV with a header)
+#   with four fields:
+#       user         username (a JSON integer is read as a user id)
+#       course       course title of that user (JSON integer: course id)
+#       module_name  ModuleProgress.module_name
+#       percent      0 - 100
+#
+#   `user_id` / `course_id` may be given instead of user / course to
+#   refer to rows by id (also from CSV).  Text in user / course is
+#   always a name, even "2024", so it never resolves to another row.
+#
+#   Records are upserted in chunks, one transaction per chunk:
+#     - users / courses / existing rows are looked up once per chunk
+#       (IN queries), never per record
+#     - new and changed rows are written with one executemany
+#       INSERT ... ON CONFLICT DO UPDATE on the unique (user, course,
+#       module_name) key, so concurrent runs never duplicate a row;
+#       unchanged rows are not written at all
+#     - course totals (progress_percent, completed_at) are rebuilt
+#       once per affected course per chunk
+#   Bad records are counted and reported, they do not stop the run.
+# -------------------------------------------------------------
+
+import csv
+import json
+import time
+from importlib import import_module
+
+from . import db
+from .changes import note_users_changed
+from .models import Course, ModuleProgress, User
+from .progress import rebuild_course_aggregates
+
+FIELDS = ("user", "course", "module_name", "percent")
+ID_FIELDS = {"user": "user_id", "course": "course_id"}
+FORMATS = ("ndjson", "csv")
+
+# how many "line N: problem" messages a report keeps
+MAX_REPORTED_ERRORS = 20
+
+
+def read_records(lines, fmt):
+    """
+    Yield (line number, record dict or None) from text lines.
+    None means the line could not be parsed.
+    """
+    if fmt == "ndjson":
+        for number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield number, record if isinstance(record, dict) else None
+    elif fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        raise ValueError(f"unknown format {fmt!r} (expected one of {FORMATS})")
+
+
+def _reference(record, name):
+    """An id (int) or a name (str) for the user / course of a record."""
+    id_field = ID_FIELDS[name]
+    value = record.get(id_field)
+    if value is not None and value != "":
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        text = str(value).strip()
+        if not text.isdigit():
+            raise ValueError(f"{id_field} {value!r} is not an id")
+        return int(text)
+
+    value = record.get(name)
+    if isinstance(value, bool) or value is None or value == "":
+        raise ValueError(f"missing {name}")
+    if isinstance(value, int):
+        return value  # a JSON number is an id
+    return str(value).strip()
+
+
+def clean_record(record):
+    """Validate one record -> (user ref, course ref, module_name, percent)."""
+    if record is None:
+        raise ValueError("not a valid record")
+    missing = [
+        field for field in FIELDS
+        if field not in record and ID_FIELDS.get(field) not in record
+    ]
+    if missing:
+        raise ValueError("missing " + ", ".join(missing))
+
+    module_name = str(record["module_name"] or "").strip()
+    if not module_name or len(module_name) > 128:
+        raise ValueError("module_name must be 1-128 characters")
+    try:
+        percent = int(float(record["percent"]))
+    except (TypeError, ValueError, OverflowError):  # OverflowError: "inf"
+        raise ValueError(f"percent {record['percent']!r} is not a number") from None
+    if not 0 <= percent <= 100:
+        raise ValueError(f"percent {percent} is outside 0-100")
+
+    return (
+        _reference(record, "user"),
+        _reference(record, "course"),
+        module_name,
+        percent,
+    )
+
+
+# -------------------------------------------------------------
+# Writing one chunk
+# -------------------------------------------------------------
+def _resolve_users(refs):
+    ids = {ref for ref in refs if isinstance(ref, int)}
+    names = {ref for ref in refs if isinstance(ref, str)}
+    found = {}
+    if ids or names:
+        rows = db.session.execute(
+            db.select(User.id, User.username).where(
+                db.or_(User.id.in_(ids), User.username.in_(names))
+            )
+        )
+        for user_id, username in rows:
+            found[user_id] = user_id
+            found[username] = user_id
+    return found
+
+
+def _resolve_courses(pairs):
+    """{(user_id, course ref): course_id} for courses owned by that user."""
+    ids = {ref for _, ref in pairs if isinstance(ref, int)}
+    titles = {ref for _, ref in pairs if isinstance(ref, str)}
+    owners = {user_id for user_id, _ in pairs}
+    found = {}
+    if ids:
+        rows = db.session.execute(
+            db.select(Course.id, Course.user_id).where(Course.id.in_(ids))
+        )
+        for course_id, user_id in rows:
+            found[(user_id, course_id)] = course_id
+    if titles:
+        rows = db.session.execute(
+            db.select(Course.id, Course.user_id, Course.title)
+            .where(Course.user_id.in_(owners), Course.title.in_(titles))
+            .order_by(Course.id)
+        )
+        for course_id, user_id, title in rows:
+            found.setdefault((user_id, title), course_id)
+    return found
+
+
+def _write_chunk(chunk, report):
+    """Upsert one chunk of (line, user ref, course ref, name, percent)."""
+    users = _resolve_users({rec[1] for rec in chunk})
+    courses = _resolve_courses(
+        {(users[rec[1]], rec[2]) for rec in chunk if rec[1] in users}
+    )
+
+    # last record wins when the same module appears twice in a chunk
+    wanted = {}
+    for line, user_ref, course_ref, module_name, percent in chunk:
+        user_id = users.get(user_ref)
+        course_id = courses.get((user_id, course_ref))
+        if user_id is None:
+            _reject(report, line, f"unknown user {user_ref!r}")
+        elif course_id is None:
+            _reject(report, line, f"user {user_ref!r} has no course {course_ref!r}")
+        else:
+            wanted[(user_id, course_id, module_name)] = percent
+
+    if not wanted:
+        return
+
+    mp = ModuleProgress.__table__
+    rows = db.session.execute(
+        db.select(mp.c.user_id, mp.c.course_id, mp.c.module_name, mp.c.percent_complete)
+        .where(
+            mp.c.course_id.in_({key[1] for key in wanted}),
+            mp.c.module_name.in_({key[2] for key in wanted}),
+        )
+    )
+    existing = {(u, c, m): p for u, c, m, p in rows}
+
+    inserts, updates = [], []
+    for (user_id, course_id, module_name), percent in wanted.items():
+        key = (user_id, course_id, module_name)
+        row = {"user_id": user_id, "course_id": course_id,
+               "module_name": module_name, "percent_complete": percent}
+        if key not in existing:
+            inserts.append(row)
+        elif existing[key] != percent:
+            updates.append(row)
+        else:
+            report["unchanged"] += 1
+
+    if inserts or updates:
+        _upsert_progress(inserts, updates)
+
+    changed = {(row["user_id"], row["course_id"]) for row in inserts + updates}
+    if changed:
+        rebuild_course_aggregates({course_id for _, course_id in changed})
+        # bulk SQL bypasses the ORM change tracking -> record it ourselves
+        note_users_changed(
+            db.session, {user_id: {"progress", "course"} for user_id, _ in changed}
+        )
+    db.session.commit()
+
+    report["inserted"] += len(inserts)
+    report["updated"] += len(updates)
+    report["courses"] += len({course_id for _, course_id in changed})
+
+
+def _upsert_progress(inserts, updates):
+    """
+    INSERT ... ON CONFLICT (user_id, course_id, module_name) DO UPDATE,
+    so a row written by another run (or a page) since the lookup above
+    is updated instead of duplicated.
+    """
+    mp = ModuleProgress.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = import_module(f"sqlalchemy.dialects.{dialect}").insert
+        statement = insert(mp)
+        statement = statement.on_conflict_do_update(
+            index_elements=[mp.c.user_id, mp.c.course_id, mp.c.module_name],
+            set_={"percent_complete": statement.excluded.percent_complete},
+        )
+        db.session.execute(statement, inserts + updates)
+        return
+
+    # other databases: plain writes; the unique index refuses a
+    # duplicate (the chunk then fails instead of double counting)
+    if inserts:
+        db.session.execute(db.insert(mp), inserts)
+    if updates:
+        db.session.execute(
+            db.update(mp)
+            .where(
+                mp.c.user_id == db.bindparam("u"),
+                mp.c.course_id == db.bindparam("c"),
+                mp.c.module_name == db.bindparam("m"),
+            )
+            .values(percent_complete=db.bindparam("p")),
+            [
+                {"u": r["user_id"], "c": r["course_id"], "m": r["module_name"],
+                 "p": r["percent_complete"]}
+                for r in updates
+            ],
+        )
+
+
+def _reject(report, line, message):
+    report["rejected"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append(f"line {line}: {message}")
+
+
+def ingest_progress(records, chunk_size=5000, progress=None):
+    """
+    Upsert (line number, record) pairs from read_records().
+
+    `progress(report)` is called after every chunk.  Returns a report:
+    records, inserted, updated, unchanged, rejected, errors (first
+    few), courses (recomputed), seconds and records_per_second.
+    """
+    report = {
+        "records": 0, "inserted": 0, "updated": 0, "unchanged": 0,
+        "rejected": 0, "errors": [], "courses": 0,
+    }
+    started = time.perf_counter()
+    chunk = []
+
+    for line, record in records:
+        report["records"] += 1
+        try:
+            chunk.append((line,) + clean_record(record))
+        except ValueError as exc:
+            _reject(report, line, str(exc))
+        if len(chunk) >= chunk_size:
+            _write_chunk(chunk, report)
+            chunk = []
+            if progress:
+                progress(report)
+
+    if chunk:
+        _write_chunk(chunk, report)
+        if progress:
+            progress(report)
+
+    seconds = time.perf_counter() - started
+    report["seconds"] = round(seconds, 3)
+    report["records_per_second"] = round(report["records"] / seconds, 1) if seconds else 0.0
+    return report
@@ -0,0 +1,169 @@
+# -------------------------------------------------------------
+# instrumentation.py
+# -------------------------------------------------------------
+# Purpose:
+#   Opt-in request timing (INSTRUMENTATION_ENABLED in config.py).
+#
+#   For every request it records:
+#     - wall time of the whole request
+#     - number of SQL queries and total SQL time
+#       (SQLAlchemy before/after_cursor_execute hooks)
+#
+#   and then:
+#     - adds a Server-Timing header (visible in browser dev tools):
+#           Server-Timing: app;dur=12.4, db;dur=3.1;desc="4 queries"
+#     - logs one structured (JSON) line on the "tmj.requests" logger
+#     - keeps the last METRICS_WINDOW samples per endpoint so the
+#       admin metrics page can show rolling p50 / p95 / p99.
+# -------------------------------------------------------------
+
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+request_log = logging.getLogger("tmj.requests")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+class EndpointMetrics:
+    """Rolling window of request samples for each endpoint."""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._samples = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, duration_ms, queries, sql_ms):
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append((duration_ms, queries, sql_ms))
+            self._totals[endpoint] = self._totals.get(endpoint, 0) + 1
+
+    def summary(self):
+        """{endpoint: {count, p50_ms, p95_ms, p99_ms, avg_queries, avg_sql_ms}}"""
+        with self._lock:
+            snapshot = {name: list(s) for name, s in self._samples.items()}
+            totals = dict(self._totals)
+
+        result = {}
+        for endpoint, samples in snapshot.items():
+            durations = sorted(s[0] for s in samples)
+            n = len(samples)
+            result[endpoint] = {
+                "count": totals[endpoint],
+                "window": n,
+                "p50_ms": round(percentile(durations, 50), 3),
+                "p95_ms": round(percentile(durations, 95), 3),
+                "p99_ms": round(percentile(durations, 99), 3),
+                "avg_queries": round(sum(s[1] for s in samples) / n, 2),
+                "avg_sql_ms": round(sum(s[2] for s in samples) / n, 3),
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+
+# -------------------------------------------------------------
+# SQL hooks
+# -------------------------------------------------------------
+def _timing_request():
+    return has_request_context() and "timing_start" in g
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # the start time lives on the statement's own execution context, so a
+    # failed statement (no after_cursor_execute) leaves nothing behind
+    if context is not None and _timing_request():
+        context._tmj_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_tmj_query_start", None)
+    if started is None or not _timing_request():
+        return
+    g.sql_queries += 1
+    g.sql_time += time.perf_counter() - started
+
+
+def _install_sql_hooks(engine):
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# -------------------------------------------------------------
+# Request hooks
+# -------------------------------------------------------------
+def _start_timer():
+    if not current_app.config.get("INSTRUMENTATION_ENABLED"):
+        return
+    g.timing_start = time.perf_counter()
+    g.sql_queries = 0
+    g.sql_time = 0.0
+
+
+def _finish_timer(response):
+    if "timing_start" not in g:
+        return response
+
+    duration_ms = (time.perf_counter() - g.timing_start) * 1000
+    sql_ms = g.sql_time * 1000
+    endpoint = request.endpoint or "<unmatched>"
+
+    response.headers.add(
+        "Server-Timing",
+        f"app;dur={duration_ms:.1f}, "
+        f'db;dur={sql_ms:.1f};desc="{g.sql_queries} queries"',
+    )
+    request_log.info(
+        json.dumps(
+            {
+                "endpoint": endpoint,
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round(duration_ms, 3),
+                "queries": g.sql_queries,
+                "sql_ms": round(sql_ms, 3),
+            }
+        )
+    )
+    current_app.extensions["endpoint_metrics"].record(
+        endpoint, duration_ms, g.sql_queries, sql_ms
+    )
+    return response
+
+
+def init_instrumentation(app, db):
+    """
+    Register the timing hooks.  They are cheap no-ops unless
+    INSTRUMENTATION_ENABLED is true (checked on every request).
+    """
+    app.extensions["endpoint_metrics"] = EndpointMetrics(
+        window=app.config.get("METRICS_WINDOW", 1000)
+    )
+    app.before_request(_start_timer)
+    app.after_request(_finish_timer)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            _install_sql_hooks(engine)
@@ -0,0 +1,208 @@
+# -------------------------------------------------------------
+# jobs.py
+# -------------------------------------------------------------
+# Purpose:
+#   A small in-process job queue for follow-up work that should not
+#   slow down the request that triggered it (completion badges, ...).
+#
+#   - handlers are registered per job name:
+#
+#         @job_handler("course_completed")
+#         def award_badges(payloads): ...
+#
+#     and always receive a LIST of payloads, so they can do their
+#     work for a whole batch with a few set-based queries
+#   - enqueue_after_commit(session, name, payload) queues a job only
+#     if (and when) the current transaction commits; a rollback
+#     drops it
+#   - JOB_WORKERS threads (config.py) pull jobs, wait up to
+#     JOB_BATCH_WAIT seconds to collect up to JOB_BATCH_SIZE of them,
+#     and run each handler once per batch in its own app context
+#     (= its own database session)
+#   - JOB_WORKERS = 0 runs jobs inline right after the commit
+#     (tests, one-off scripts)
+#
+#   Jobs live in memory: anything still queued when the process
+#   exits is lost, so handlers must be safe to re-run and the data
+#   they derive must be rebuildable in bulk.
+# -------------------------------------------------------------
+
+import atexit
+import logging
+import queue
+import threading
+import time
+import weakref
+from collections import defaultdict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+
+from . import db
+
+job_log = logging.getLogger("tmj.jobs")
+
+_handlers = {}
+
+_STOP = object()
+
+# queues whose worker threads are running; one exit hook drains them all
+_running = weakref.WeakSet()
+
+
+@atexit.register
+def _shutdown_running_queues():
+    for jobs in list(_running):
+        jobs.shutdown()
+
+
+def job_handler(name):
+    """Decorator: run `func(payloads)` for batches of `name` jobs."""
+
+    def register(func):
+        _handlers[name] = func
+        return func
+
+    return register
+
+
+class JobQueue:
+    """Worker threads that run queued jobs in batches."""
+
+    def __init__(self, app, workers=1, batch_size=100, batch_wait=0.05):
+        self.app = app
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._counts = {"enqueued": 0, "processed": 0, "failed": 0, "batches": 0}
+
+    def enqueue(self, name, payload):
+        if name not in _handlers:
+            raise KeyError(f"no handler for job {name!r}")
+        self._count("enqueued", 1)
+        if not self.workers:
+            self._run(name, [payload])
+            return
+        self._start()
+        self._queue.put((name, payload))
+
+    def join(self):
+        """Block until every queued job has been processed."""
+        self._queue.join()
+
+    def shutdown(self):
+        """Finish the queued jobs, then stop the worker threads."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        _running.discard(self)
+        for _ in threads:
+            self._queue.put(_STOP)
+        for thread in threads:
+            thread.join()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+        stats["pending"] = self._queue.unfinished_tasks
+        stats["workers"] = len(self._threads)
+        return stats
+
+    # ---------------------------------------------------------
+    def _count(self, key, n):
+        with self._lock:
+            self._counts[key] += n
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for n in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"tmj-jobs-{n}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            _running.add(self)
+
+    def _next_batch(self):
+        """Block for one job, then collect more for up to batch_wait s."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while batch[-1] is not _STOP and len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            by_name = defaultdict(list)
+            for item in batch:
+                if item is not _STOP:
+                    by_name[item[0]].append(item[1])
+            for name, payloads in by_name.items():
+                self._run(name, payloads)
+            for _ in batch:
+                self._queue.task_done()
+            if batch[-1] is _STOP:
+                return
+
+    def _run(self, name, payloads):
+        # a fresh app context = a fresh session, never the request's
+        with self.app.app_context():
+            try:
+                _handlers[name](payloads)
+            except Exception:
+                db.session.rollback()
+                self._count("failed", len(payloads))
+                job_log.exception("job %s failed for %d payloads", name, len(payloads))
+            else:
+                self._count("processed", len(payloads))
+            self._count("batches", 1)
+
+
+def init_jobs(app):
+    """Create the app's job queue (threads start on the first job)."""
+    jobs = JobQueue(
+        app,
+        workers=app.config.get("JOB_WORKERS", 1),
+        batch_size=app.config.get("JOB_BATCH_SIZE", 100),
+        batch_wait=app.config.get("JOB_BATCH_WAIT", 0.05),
+    )
+    app.extensions["job_queue"] = jobs
+    return jobs
+
+
+def job_queue():
+    return current_app.extensions["job_queue"]
+
+
+# -------------------------------------------------------------
+# Transaction-bound enqueueing
+# -------------------------------------------------------------
+def enqueue_after_commit(session, name, payload):
+    """Queue a job once the session's current transaction commits."""
+    session.info.setdefault("pending_jobs", []).append((name, payload))
+
+
+@event.listens_for(db.session, "after_commit")
+def _enqueue_pending_jobs(session):
+    pending = session.info.pop("pending_jobs", None)
+    if not pending or not has_app_context() or "job_queue" not in current_app.extensions:
+        return
+    jobs = job_queue()
+    for name, payload in pending:
+        jobs.enqueue(name, payload)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _drop_pending_jobs(session):
+    session.info.pop("pending_jobs", None)
@@ -1,81 +1,72 @@
-from datetime import date
-
 # Import Flask tools
-from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
 
 # For login-required pages
 from flask_login import current_user, login_required
 
 # Database + models
 from app import db
-from app.models import Course, Module, ModuleNote, ModuleProgress
+from app.models import Badge, Course, Module, ModuleNote, ModuleProgress, User
+from sqlalchemy.orm import selectinload
 
 # Forms
 from app.forms import ModuleNoteForm
 
+# Progress rules (read-only on the page views)
+from app.progress import STATUS_LABELS, describe_course_progress
+
+# Per-user dashboard cache
+from app.cache import dashboard_cache
+
+# Precomputed reminder flag -> banner text
+from app.reminders import reminder_message
+
+# Completion badges (awarded by a background job)
+from app.badges import COURSE_COMPLETE
+
 # --------------------------------------------
 # Create Blueprint
 # --------------------------------------------
 main_bp = Blueprint("main", __name__, template_folder="templates")
 
 
-def update_course_progress(course, modules):
+def load_module_progress(course_ids, user_id=None):
     """
-    Given a Course and list of ModuleProgress entries for that course/user,
-    compute and store course-level progress.
+    Load the ModuleProgress rows for many courses in ONE query and
+    group them by course id (each list ordered by ModuleProgress.id).
 
-    Returns (status, status_label, progress_percent, completion_date_str).
+    `course_ids` can be a list of ids or a select() of course ids,
+    so the dashboard never issues one query per course.
     """
+    query = ModuleProgress.query.filter(ModuleProgress.course_id.in_(course_ids))
+    if user_id is not None:
+        query = query.filter_by(user_id=user_id)
 
-    if modules:
-        total = sum(m.percent_complete for m in modules)
-        count = len(modules)
-        progress_percent = round(total / count)
-
-        if all(m.percent_complete == 100 for m in modules):
-            status = "completed"
-            status_label = "Completed"
-        elif any(m.percent_complete > 0 for m in modules):
-            status = "in-progress"
-            status_label = "In progress"
-        else:
-            status = "not-started"
-            status_label = "Not started"
-    else:
-        progress_percent = 0
-        status = "not-started"
-        status_label = "Not started"
+    progress_by_course = {}
+    for row in query.order_by(ModuleProgress.id):
+        progress_by_course.setdefault(row.course_id, []).append(row)
 
-    if status == "completed" and course.completed_at is None:
-        course.completed_at = date.today()
-
-    course.progress_percent = progress_percent
-    db.session.commit()
-
-    completion_date = (
-        course.completed_at.strftime("%b %d, %Y") if course.completed_at else "—"
-    )
-
-    return status, status_label, progress_percent, completion_date
+    return progress_by_course
 
 
 def get_reminder_message(user):
     """
     Return a reminder message string if the user has been inactive long enough,
     or None if no reminder should be shown.
-    """
-
-    if user is None or user.last_active_date is None:
-        return None
-
-    days_since = (date.today() - user.last_active_date).days
-    if days_since >= 3:
-        return (
-            "You haven't studied in "
-            f"{days_since} days. Jump back in to keep your streak alive!"
-        )
 
-    return None
+    Reads the precomputed User.reminder_due flag (see app/reminders.py).
+    """
+    return reminder_message(user)
 
 
 @main_bp.route("/")
@@ -84,42 +75,127 @@ def index():
     return render_template("main/index.html")
 
 
-@main_bp.route("/feature")
-def feature():
+def course_card(course):
+    """The dashboard card of one course, as a plain (cacheable) dict."""
+    status, status_label, progress_percent, completion_date = describe_course_progress(
+        course
+    )
+    return {
+        "course": {"id": course.id, "title": course.title, "version": course.version},
+        "module_count": course.module_count,
+        "status": status,
+        "status_label": status_label,
+        "progress_percent": progress_percent,
+        "completion_date": completion_date,
+    }
+
+
+def build_course_page(user_id, after=None, status=None, limit=20):
     """
-    Feature demo page wired to real progress data
-    for ALL of the student's courses.
+    One page of a user's dashboard course cards, keyset-paginated by
+    course id:
+
+        WHERE user_id = ? AND id > :after [AND <status> = :status]
+        ORDER BY id LIMIT :limit + 1
+
+    so page N costs the same single index range scan as page 1.
+    Module rows are NOT loaded here (see course_modules_json).
+    Returns {"cards": [...], "next_after": id of the last card or None}.
     """
+    query = Course.query.filter(Course.user_id == user_id)
+    if after is not None:
+        query = query.filter(Course.id > after)
+    if status is not None:
+        query = query.filter(Course.status == status)
+    courses = query.order_by(Course.id).limit(limit + 1).all()
+
+    has_more = len(courses) > limit
+    courses = courses[:limit]
+    return {
+        "cards": [course_card(course) for course in courses],
+        "next_after": courses[-1].id if has_more else None,
+    }
+
+
+# cache key of the shared anonymous snapshot (user ids are ints)
+ANONYMOUS_DASHBOARD = "anonymous"
+
+
+def demo_user():
+    """(id, data_version) of the demo user (DEMO_USERNAME in config.py), or None."""
+    return db.session.execute(
+        db.select(User.id, User.data_version).where(
+            User.username == current_app.config.get("DEMO_USERNAME")
+        )
+    ).first()
 
-    # Get all courses (for the logged-in user if possible)
-    if current_user.is_authenticated:
-        courses = Course.query.filter_by(user_id=current_user.id).all()
-    else:
-        courses = Course.query.all()
 
-    course_cards = []
+def build_demo_snapshot(demo_id, limit=20):
+    """
+    The page anonymous visitors see: the first page of the demo
+    user's courses, module rows included, built once per demo
+    data_version and then served from the dashboard cache.
+    """
+    page = build_course_page(demo_id, limit=limit)
+    progress_by_course = load_module_progress(
+        [card["course"]["id"] for card in page["cards"]], user_id=demo_id
+    )
+    for card in page["cards"]:
+        card["modules"] = [
+            {"module_name": m.module_name, "percent_complete": m.percent_complete}
+            for m in progress_by_course.get(card["course"]["id"], [])
+        ]
+    # a fixed snapshot: no paging through the database
+    page["next_after"] = None
+    return page
 
-    for course in courses:
-        # Load this course's module progress for this user
-        query = ModuleProgress.query.filter_by(course_id=course.id)
-        if current_user.is_authenticated:
-            query = query.filter_by(user_id=current_user.id)
-        modules = query.order_by(ModuleProgress.id).all()
 
-        status, status_label, progress_percent, completion_date = (
-            update_course_progress(course, modules)
-        )
+@main_bp.route("/feature")
+def feature():
+    """
+    Feature demo page wired to real progress data for the student's
+    courses, one page at a time:
 
-        course_cards.append(
-            {
-                "course": course,
-                "modules": modules,
-                "status": status,
-                "status_label": status_label,
-                "progress_percent": progress_percent,
-                "completion_date": completion_date,
+        /feature?status=in-progress&after=<last course id seen>
+    """
+    status = request.args.get("status")
+    if status not in STATUS_LABELS:
+        status = None
+    after = request.args.get("after", type=int)
+    limit = current_app.config.get("DASHBOARD_PAGE_SIZE", 20)
+
+    if not current_user.is_authenticated:
+        # Anonymous visitors (and crawlers) share one cached snapshot
+        # of the demo courses: one indexed lookup of the demo user's
+        # data_version per visit, never a write
+        demo = demo_user()
+        if demo is None:
+            page = {"cards": [], "next_after": None}
+        else:
+            page = dashboard_cache().get_or_build(
+                ANONYMOUS_DASHBOARD,
+                lambda: build_demo_snapshot(demo.id, limit),
+                version=demo.data_version,
+            )
+        if status is not None:
+            page = {
+                "cards": [card for card in page["cards"] if card["status"] == status],
+                "next_after": None,
             }
+    # The first unfiltered page is what almost every visit shows:
+    # logged-in users get it from the per-user cache, checked against
+    # the data_version the user_loader just read (load_user_cached),
+    # so it is rebuilt after ANY process changes their courses or
+    # progress.  Other pages are a single indexed query each.
+    elif after is None and status is None:
+        user_id = current_user.id
+        page = dashboard_cache().get_or_build(
+            user_id,
+            lambda: build_course_page(user_id, limit=limit),
+            version=current_user.data_version,
         )
+    else:
+        page = build_course_page(current_user.id, after=after, status=status, limit=limit)
 
     streak_days = current_user.streak_days if current_user.is_authenticated else 0
     reminder_message = (
@@ -128,34 +204,103 @@ def feature():
 
     return render_template(
         "main/feature.html",
-        course_cards=course_cards,
+        course_cards=page["cards"],
+        next_after=page["next_after"],
+        status=status,
+        status_labels=STATUS_LABELS,
         streak_days=streak_days,
         reminder_message=reminder_message,
     )
 
 
+@main_bp.route("/courses/<int:course_id>/modules.json")
+@login_required
+def course_modules_json(course_id):
+    """
+    Module progress of one of the user's courses, fetched by the
+    dashboard only when a card is expanded.
+    """
+    owned = db.session.scalar(
+        db.select(Course.id).where(Course.id == course_id, Course.user_id == current_user.id)
+    )
+    if owned is None:
+        abort(404)
+
+    modules = load_module_progress([course_id], user_id=current_user.id).get(course_id, [])
+    return jsonify(
+        course_id=course_id,
+        modules=[
+            {"module_name": m.module_name, "percent_complete": m.percent_complete or 0}
+            for m in modules
+        ],
+    )
+
+
 # --------------------------------------------
 # Route 3: Course Detail Page (notes + real progress)
 # --------------------------------------------
+def load_course_detail(course_id, user_id):
+    """
+    Everything the course detail page reads, in two queries:
+
+      1) the course, its first module (by order_index), the user's
+         note on that module and the user's completion badge for the
+         course - one SELECT with three outer joins
+      2) the user's ModuleProgress rows for the course (selectinload)
+
+    Returns (course, first module or None, note or None, badge or None,
+    progress rows in id order); aborts with 404 if the course does not
+    exist.
+    """
+    first_module_id = (
+        db.select(Module.id)
+        .where(Module.course_id == Course.id)
+        .order_by(Module.order_index, Module.id)
+        .limit(1)
+        .correlate(Course)
+        .scalar_subquery()
+    )
+    row = db.session.execute(
+        db.select(Course, Module, ModuleNote, Badge)
+        .outerjoin(Module, Module.id == first_module_id)
+        .outerjoin(
+            ModuleNote,
+            db.and_(ModuleNote.module_id == Module.id, ModuleNote.user_id == user_id),
+        )
+        .outerjoin(
+            Badge,
+            db.and_(
+                Badge.course_id == Course.id,
+                Badge.user_id == user_id,
+                Badge.kind == COURSE_COMPLETE,
+            ),
+        )
+        .where(Course.id == course_id)
+        .options(
+            selectinload(
+                Course.module_progress.and_(ModuleProgress.user_id == user_id)
+            )
+        )
+    ).first()
+    if row is None:
+        abort(404)
+
+    course, module, note, badge = row
+    progress = sorted(course.module_progress, key=lambda mp: mp.id)
+    return course, module, note, badge, progress
+
+
 @main_bp.route("/courses/<int:course_id>", methods=["GET", "POST"])
 @login_required
 def course_detail(course_id):
-    # Get course or 404
-    course = Course.query.get_or_404(course_id)
-
-    # For now, use the first module as the "current" module for notes
-    current_module = course.modules[0] if course.modules else None
+    # Course + first module + note + badge + progress rows (2 queries) or 404
+    course, current_module, module_note, badge, modules = load_course_detail(
+        course_id, current_user.id
+    )
 
     form = ModuleNoteForm()
-    module_note = None
 
     if current_module:
-        # Look for an existing note for this user + module
-        module_note = ModuleNote.query.filter_by(
-            user_id=current_user.id,
-            module_id=current_module.id,
-        ).first()
-
         # Handle saving notes (POST)
         if form.validate_on_submit():
             if module_note is None:
@@ -176,15 +321,8 @@ def course_detail(course_id):
         elif request.method == "GET" and module_note is not None:
             form.content.data = module_note.content
 
-    # ---------------------------------
-    # Real progress data using ModuleProgress
-    # ---------------------------------
-    query = ModuleProgress.query.filter_by(course_id=course.id)
-    query = query.filter_by(user_id=current_user.id)
-    modules = query.order_by(ModuleProgress.id).all()
-
-    status, status_label, progress_percent, completion_date = update_course_progress(
-        course, modules
+    status, status_label, progress_percent, completion_date = describe_course_progress(
+        course
     )
 
     course_name = course.title if hasattr(course, "title") else "Course"
@@ -203,6 +341,7 @@ def course_detail(course_id):
         status_label=status_label,
         progress_percent=progress_percent,
         completion_date=completion_date,
+        badge=badge,
         streak_days=streak_days,
         reminder_message=reminder_message,
     )
@@ -1,9 +1,9 @@
 from datetime import date
 
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
-
+from sqlalchemy.ext.hybrid import hybrid_property
 from . import db
+from .passwords import hash_password, needs_rehash, verify_password
 
 
 # =============================================================
@@ -24,6 +24,14 @@ class User(db.Model, UserMixin):
     streak_days = db.Column(db.Integer, default=0)
     last_active_date = db.Column(db.Date, nullable=True)
 
+    # precomputed by the reminder job (see app/reminders.py),
+    # so pages only read a column
+    reminder_due = db.Column(db.Boolean, nullable=False, default=False, server_default="0")
+
+    # +1 on every commit that changes this user, their courses or
+    # their progress (see app/changes.py); the API's ETags use it
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     # one-to-many: user → courses
     courses = db.relationship("Course", backref="user", lazy=True)
 
@@ -34,12 +42,16 @@ class User(db.Model, UserMixin):
     module_progress = db.relationship("ModuleProgress", backref="user", lazy=True)
 
     def set_password(self, password: str) -> None:
-        """Hash and store the user's password."""
-        self.password_hash = generate_password_hash(password)
+        """Hash and store the user's password (policy in passwords.py)."""
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
         """Return True if the provided password matches the stored hash."""
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self) -> bool:
+        """True if the stored hash uses outdated hashing parameters."""
+        return needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f"<User {self.username}>"
@@ -50,6 +62,10 @@ class User(db.Model, UserMixin):
 # =============================================================
 class Course(db.Model):
     __tablename__ = "course"
+    __table_args__ = (
+        # dashboard: a user's courses in id order
+        db.Index("ix_course_user_id", "user_id", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
@@ -62,6 +78,18 @@ class Course(db.Model):
     # when finished → used for badge + “completed on”
     completed_at = db.Column(db.Date, nullable=True)
 
+    # running totals over this course's ModuleProgress rows.
+    # app/progress.py keeps them up to date on every write, so pages
+    # read status + percent in O(1) instead of scanning the modules.
+    module_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    percent_sum = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    completed_module_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    started_module_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # +1 on every change to the course or its progress rows; part of
+    # the cache key of rendered course fragments ({% cache %} tags)
+    version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     # one-to-many: course → modules
     modules = db.relationship("Module", backref="course", lazy=True)
 
@@ -71,6 +99,30 @@ class Course(db.Model):
     def is_completed(self) -> bool:
         return self.progress_percent >= 100 or self.completed_at is not None
 
+    @hybrid_property
+    def status(self) -> str:
+        """'completed', 'in-progress' or 'not-started' (from the totals)."""
+        if self.module_count and self.completed_module_count == self.module_count:
+            return "completed"
+        if self.started_module_count:
+            return "in-progress"
+        return "not-started"
+
+    @status.expression
+    def status(cls):
+        # same rule in SQL, so queries can filter/sort by status
+        return db.case(
+            (
+                db.and_(
+                    cls.module_count > 0,
+                    cls.completed_module_count == cls.module_count,
+                ),
+                "completed",
+            ),
+            (cls.started_module_count > 0, "in-progress"),
+            else_="not-started",
+        )
+
     def __repr__(self):
         return f"<Course {self.title}>"
 
@@ -80,6 +132,10 @@ class Course(db.Model):
 # =============================================================
 class Module(db.Model):
     __tablename__ = "module"
+    __table_args__ = (
+        # course detail: a course's modules in display order
+        db.Index("ix_module_course_order", "course_id", "order_index"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     course_id = db.Column(db.Integer, db.ForeignKey("course.id"), nullable=False)
@@ -102,6 +158,10 @@ class Module(db.Model):
 # =============================================================
 class ModuleNote(db.Model):
     __tablename__ = "module_note"
+    __table_args__ = (
+        # one note per user + module (also the lookup index)
+        db.Index("uq_module_note_user_module", "user_id", "module_id", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
@@ -114,6 +174,29 @@ class ModuleNote(db.Model):
         return f"<ModuleNote {self.id}>"
 
 
+# =============================================================
+# Badge model
+# =============================================================
+class Badge(db.Model):
+    """An award, e.g. one "course-complete" badge per finished course."""
+
+    __tablename__ = "badge"
+    __table_args__ = (
+        # each badge is awarded once (also the lookup index)
+        db.Index("uq_badge_user_kind_course", "user_id", "kind", "course_id", unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey("course.id"), nullable=True)
+
+    kind = db.Column(db.String(32), nullable=False)
+    awarded_at = db.Column(db.Date, default=date.today)
+
+    def __repr__(self):
+        return f"<Badge {self.kind} user={self.user_id} course={self.course_id}>"
+
+
 # =============================================================
 # ModuleProgress model
 # =============================================================
@@ -121,6 +204,18 @@ class ModuleProgress(db.Model):
     """Tracks user progress for individual course modules."""
 
     __tablename__ = "module_progress"
+    __table_args__ = (
+        # dashboard + course detail: WHERE user_id, course_id ORDER BY id
+        db.Index("ix_module_progress_user_course", "user_id", "course_id", "id"),
+        # course totals rebuild: WHERE course_id
+        db.Index("ix_module_progress_course", "course_id"),
+        # one row per user + course + module (ingest upserts on it)
+        db.Index(
+            "uq_module_progress_user_course_module",
+            "user_id", "course_id", "module_name",
+            unique=True,
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -128,13 +223,21 @@ class ModuleProgress(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
 
     # Which course this module is part of
-    course_id = db.Column(db.Integer, db.ForeignKey("course.id"), nullable=False)
+    # (active_history: keep the old value when changed, so the course
+    #  totals in app/progress.py can subtract it)
+    course_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey("course.id"), nullable=False),
+        active_history=True,
+    )
 
     # Display name of the module
     module_name = db.Column(db.String(128), nullable=False)
 
     # Completion percentage (0–100)
-    percent_complete = db.Column(db.Integer, default=0)
+    percent_complete = db.column_property(
+        db.Column(db.Integer, default=0),
+        active_history=True,
+    )
 
     def __repr__(self) -> str:
         return f"<ModuleProgress {self.module_name}: {self.percent_complete}%>"
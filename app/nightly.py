@@ -0,0 +1,82 @@
+# -------------------------------------------------------------
+# nightly.py
+# -------------------------------------------------------------
+# Purpose:
+#   The nightly batch (run once a day, e.g. from cron):
+#
+#       flask --app app nightly
+#
+#   1) streaks: users who were not active yesterday or today have
+#      broken their streak -> streak_days = 0
+#   2) reminders: recompute User.reminder_due (reminders.py)
+#
+#   Both are set-based UPDATEs over consecutive user id ranges of
+#   `chunk_size` users, one short transaction per range, so the batch
+#   scales linearly and never locks the whole user table.  Only rows
+#   that really change are written (and their caches invalidated).
+# -------------------------------------------------------------
+
+import time
+from datetime import date, timedelta
+
+from . import db
+from .changes import note_users_changed
+from .models import User
+from .reminders import refresh_reminders
+
+
+def user_id_ranges(chunk_size=10000):
+    """Yield (lo, hi) id ranges that together cover every user."""
+    lo, hi = db.session.execute(db.select(db.func.min(User.id), db.func.max(User.id))).one()
+    if lo is None:
+        return
+    while lo <= hi:
+        yield lo, lo + chunk_size - 1
+        lo += chunk_size
+
+
+def reset_broken_streaks(today=None, id_range=None):
+    """
+    streak_days = 0 for users last active before yesterday.
+    Commits, and returns how many users changed.
+    """
+    yesterday = (today or date.today()) - timedelta(days=1)
+    condition = [
+        db.or_(User.last_active_date.is_(None), User.last_active_date < yesterday),
+        User.streak_days != 0,
+    ]
+    if id_range is not None:
+        condition.append(User.id.between(*id_range))
+
+    changed_ids = db.session.scalars(db.select(User.id).where(*condition)).all()
+    if not changed_ids:
+        return 0
+
+    db.session.execute(
+        db.update(User).where(*condition).values(streak_days=0),
+        execution_options={"synchronize_session": False},
+    )
+    note_users_changed(db.session, {user_id: {"user"} for user_id in changed_ids})
+    db.session.commit()
+    return len(changed_ids)
+
+
+def run_nightly(today=None, chunk_size=10000, progress=None):
+    """
+    Run the whole nightly batch.  `progress(lo, hi, report)` is called
+    after every id range.  Returns {"streaks_reset", "reminders_changed",
+    "ranges", "seconds"}.
+    """
+    today = today or date.today()
+    report = {"streaks_reset": 0, "reminders_changed": 0, "ranges": 0}
+    started = time.perf_counter()
+
+    for id_range in user_id_ranges(chunk_size):
+        report["streaks_reset"] += reset_broken_streaks(today, id_range)
+        report["reminders_changed"] += refresh_reminders(today=today, id_range=id_range)
+        report["ranges"] += 1
+        if progress:
+            progress(*id_range, report)
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
@@ -0,0 +1,122 @@
+# -------------------------------------------------------------
+# passwords.py
+# -------------------------------------------------------------
+# Purpose:
+#   Password hashing policy + verification for User.
+#
+#   - Algorithm and work factor come from PASSWORD_HASH_METHOD
+#     (werkzeug format, e.g. "scrypt:32768:8:1" or
+#     "pbkdf2:sha256:600000"), so the cost can be tuned per
+#     environment without code changes.
+#   - needs_rehash() tells the login route when a stored hash was made
+#     with older parameters; the route then re-hashes the password it
+#     just verified (users never have to reset anything).
+#   - With PASSWORD_VERIFY_WORKERS > 0, hashes are checked in a small
+#     bounded thread pool.  At most that many CPU-heavy checks run at
+#     once, so a burst of logins cannot take every core away from
+#     dashboard requests; when the queue is full, verify raises
+#     LoginBusyError and the route answers "try again" right away.
+# -------------------------------------------------------------
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache
+
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+DEFAULT_SALT_LENGTH = 16
+
+
+class LoginBusyError(Exception):
+    """Too many password checks are already queued; try again shortly."""
+
+
+def _policy():
+    if has_app_context():
+        return (
+            current_app.config.get("PASSWORD_HASH_METHOD", DEFAULT_METHOD),
+            current_app.config.get("PASSWORD_SALT_LENGTH", DEFAULT_SALT_LENGTH),
+        )
+    return DEFAULT_METHOD, DEFAULT_SALT_LENGTH
+
+
+@lru_cache(maxsize=16)
+def _full_method(method):
+    """
+    The method string werkzeug writes into the hash, e.g.
+    "scrypt" -> "scrypt:32768:8:1" (defaults filled in).
+    """
+    return generate_password_hash("", method=method, salt_length=1).split("$", 1)[0]
+
+
+def hash_password(password):
+    """Hash `password` with the configured method and salt length."""
+    method, salt_length = _policy()
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+def needs_rehash(pwhash):
+    """True if `pwhash` was made with a different method / work factor."""
+    method, _ = _policy()
+    return pwhash.split("$", 1)[0] != _full_method(method)
+
+
+class PasswordVerifier:
+    """
+    Runs check_password_hash, either inline (workers=0) or in a
+    bounded thread pool of `workers` threads with at most
+    `max_pending` checks queued or running.
+    """
+
+    def __init__(self, workers=0, max_pending=None, timeout=10.0):
+        self.workers = workers
+        self.timeout = timeout
+        self._executor = None
+        self._slots = None
+        if workers:
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-check"
+            )
+            self._slots = threading.BoundedSemaphore(max_pending or workers * 4)
+
+    def verify(self, pwhash, password):
+        if self._executor is None:
+            return check_password_hash(pwhash, password)
+
+        if not self._slots.acquire(blocking=False):
+            raise LoginBusyError()
+        try:
+            future = self._executor.submit(check_password_hash, pwhash, password)
+        except BaseException:
+            self._slots.release()
+            raise
+        # the slot is freed when the check finishes, even if we time out
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise LoginBusyError() from None
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+def init_passwords(app):
+    """Create the app's PasswordVerifier from its config."""
+    app.extensions["password_verifier"] = PasswordVerifier(
+        workers=app.config.get("PASSWORD_VERIFY_WORKERS", 0),
+        max_pending=app.config.get("PASSWORD_VERIFY_MAX_PENDING") or None,
+        timeout=app.config.get("PASSWORD_VERIFY_TIMEOUT", 10.0),
+    )
+
+
+def verify_password(pwhash, password):
+    """Check `password` against `pwhash` using the app's verifier."""
+    if has_app_context() and "password_verifier" in current_app.extensions:
+        return current_app.extensions["password_verifier"].verify(pwhash, password)
+    return check_password_hash(pwhash, password)
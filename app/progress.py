@@ -0,0 +1,358 @@
+# -------------------------------------------------------------
+# progress.py
+# -------------------------------------------------------------
+# Purpose:
+#   Course-level progress rules (percent, status, completion date).
+#
+#   Each Course stores running totals over its ModuleProgress rows
+#   (module_count, percent_sum, completed_module_count,
+#   started_module_count).  A before_flush hook applies the *change*
+#   of every inserted / updated / deleted ModuleProgress row to these
+#   totals as SQL increments (SET n = n + :delta, so concurrent
+#   writers never overwrite each other), and an after-flush hook reads
+#   the new totals back to refresh progress_percent and completed_at -
+#   all in the writer's own transaction.  Pages only READ the Course columns,
+#   so showing a course costs O(1) no matter how many modules it has.
+#
+#   rebuild_course_aggregates() recomputes the totals from scratch in
+#   SQL, for existing databases and bulk (non-ORM) writers.
+#
+#   Course.version goes up by one with every such change (and with
+#   any other edit of the course row), so rendered fragments keyed by
+#   (course id, version) never go stale (see templating.py).
+#
+#   A course that becomes completed queues a "course_completed" job
+#   (badges.py) that runs after the commit, off the request.
+# -------------------------------------------------------------
+
+from collections import defaultdict
+from datetime import date
+from itertools import chain
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm.attributes import set_committed_value
+
+from . import db
+from .jobs import enqueue_after_commit
+from .models import Course, ModuleProgress
+
+
+STATUS_LABELS = {
+    "completed": "Completed",
+    "in-progress": "In progress",
+    "not-started": "Not started",
+}
+
+# order of the totals inside a delta tuple
+AGGREGATE_COLUMNS = (
+    "module_count",
+    "percent_sum",
+    "completed_module_count",
+    "started_module_count",
+)
+
+
+def progress_percent_of(percent_sum, module_count):
+    """Average module percent, rounded like the old per-module scan."""
+    if not module_count:
+        return 0
+    return round(percent_sum / module_count)
+
+
+def format_completion_date(course):
+    """Return the 'completed on' text shown next to a course."""
+    return course.completed_at.strftime("%b %d, %Y") if course.completed_at else "—"
+
+
+def describe_course_progress(course):
+    """
+    Read-only view of a course's progress for templates.
+
+    Returns (status, status_label, progress_percent, completion_date_str).
+    """
+    status = course.status
+    return (
+        status,
+        STATUS_LABELS[status],
+        course.progress_percent or 0,
+        format_completion_date(course),
+    )
+
+
+def refresh_course_progress(course):
+    """
+    Derive progress_percent / completed_at from the course totals.
+
+    Only assigns columns whose value really changes, so an unchanged
+    course never produces an UPDATE.  Returns True if anything changed.
+    """
+    changed = False
+    progress_percent = progress_percent_of(course.percent_sum, course.module_count)
+
+    if course.progress_percent != progress_percent:
+        course.progress_percent = progress_percent
+        changed = True
+
+    if course.status == "completed" and course.completed_at is None:
+        course.completed_at = date.today()
+        changed = True
+
+    return changed
+
+
+def _derived_progress(row, today):
+    """
+    (progress_percent, completed_at, newly completed?) for a row with
+    the course totals, status, progress_percent and completed_at.
+    """
+    percent = progress_percent_of(row.percent_sum, row.module_count)
+    completed = row.completed_at
+    newly_completed = row.status == "completed" and completed is None
+    if newly_completed:
+        completed = today
+    return percent, completed, newly_completed
+
+
+# writes the derived columns of many courses (executemany)
+_DERIVED_UPDATE = (
+    db.update(Course.__table__)
+    .where(Course.__table__.c.id == db.bindparam("course_id"))
+    .values(
+        progress_percent=db.bindparam("percent"),
+        completed_at=db.bindparam("completed"),
+    )
+)
+
+
+# -------------------------------------------------------------
+# Write-path hook (incremental)
+# -------------------------------------------------------------
+def _module_delta(percent, sign):
+    """Contribution of one module row to the totals (sign = +1 / -1)."""
+    percent = percent or 0
+    return (
+        sign,
+        sign * percent,
+        sign * (percent == 100),
+        sign * (percent > 0),
+    )
+
+
+def _old_value(state, key):
+    """Value of a column as last loaded from the database."""
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.object, key)
+
+
+def _new_course(obj, state):
+    """Course a row belongs to after this flush: id, or a Course object."""
+    assigned = state.attrs.course.history.added
+    if assigned:
+        # `row.course = other`: course_id is only synced by the flush
+        course = assigned[0]
+    elif obj.course_id is not None:
+        return obj.course_id
+    else:
+        course = obj.course
+    # one key per course, whichever way the row refers to it
+    return course.id if course is not None and course.id is not None else course
+
+
+def _row_changes(session):
+    """
+    Yield (course_id_or_course, delta) for every ModuleProgress change
+    in this flush.
+    """
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, ModuleProgress):
+            continue
+
+        state = inspect(obj)
+        new_course = _new_course(obj, state)
+
+        if obj in session.new:
+            yield new_course, _module_delta(obj.percent_complete, +1)
+            continue
+
+        old_course = _old_value(state, "course_id")
+        old_percent = _old_value(state, "percent_complete")
+        yield old_course, _module_delta(old_percent, -1)
+
+        if obj not in session.deleted:
+            yield new_course, _module_delta(obj.percent_complete, +1)
+
+
+@event.listens_for(db.session, "before_flush")
+def _apply_progress_deltas(session, flush_context, instances):
+    totals = defaultdict(lambda: [0, 0, 0, 0])
+    for course, delta in _row_changes(session):
+        if course is None:
+            continue
+        for i, value in enumerate(delta):
+            totals[course][i] += value
+
+    if not totals:
+        return
+
+    with session.no_autoflush:
+        for course, delta in totals.items():
+            if not isinstance(course, Course):
+                course = session.get(Course, course)
+            if course is None or course in session.deleted:
+                continue
+            if not any(delta):
+                # rows changed but the totals did not (e.g. two modules
+                # swapped percents): the module list still looks different
+                _bump_version(course)
+                continue
+
+            if inspect(course).persistent:
+                # UPDATE ... SET module_count = module_count + :delta, so
+                # concurrent writers to one course add up instead of
+                # overwriting each other; percent / completed_at are
+                # derived from the new totals after the flush
+                for column, value in zip(AGGREGATE_COLUMNS, delta):
+                    if value:
+                        setattr(course, column, getattr(Course, column) + value)
+                session.info.setdefault("incremented_courses", {})[course.id] = course
+                continue
+
+            # a new course: no other transaction can see it yet
+            for column, value in zip(AGGREGATE_COLUMNS, delta):
+                if value:
+                    setattr(course, column, (getattr(course, column) or 0) + value)
+            was_completed = course.completed_at is not None
+            refresh_course_progress(course)
+            if not was_completed and course.completed_at is not None:
+                session.info.setdefault("completed_courses", []).append(course)
+
+
+def _bump_version(course):
+    if inspect(course).attrs.version.history.added:
+        return
+    if inspect(course).persistent:
+        course.version = Course.version + 1
+    else:
+        course.version = (course.version or 0) + 1
+
+
+@event.listens_for(db.session, "before_flush")
+def _bump_course_versions(session, flush_context, instances):
+    # runs after _apply_progress_deltas (registered first)
+    for obj in session.dirty:
+        if isinstance(obj, Course) and session.is_modified(obj):
+            _bump_version(obj)
+
+
+@event.listens_for(db.session, "after_flush_postexec")
+def _refresh_incremented_courses(session, flush_context):
+    """Read back the incremented totals and derive percent / completed_at."""
+    courses = session.info.pop("incremented_courses", None)
+    if not courses:
+        return
+
+    table = Course.__table__
+    columns = AGGREGATE_COLUMNS + ("version", "progress_percent", "completed_at")
+    rows = session.execute(
+        db.select(
+            table.c.id, table.c.user_id, Course.status, *(table.c[name] for name in columns)
+        ).where(table.c.id.in_(courses))
+    )
+    updates = []
+    today = date.today()
+    for row in rows:
+        course = courses[row.id]
+        for name in columns:
+            set_committed_value(course, name, getattr(row, name))
+        percent, completed, newly_completed = _derived_progress(row, today)
+        if newly_completed:
+            enqueue_after_commit(
+                session, "course_completed", {"course_id": row.id, "user_id": row.user_id}
+            )
+        if (percent, completed) != (row.progress_percent, row.completed_at):
+            updates.append({"course_id": row.id, "percent": percent, "completed": completed})
+            set_committed_value(course, "progress_percent", percent)
+            set_committed_value(course, "completed_at", completed)
+    if updates:
+        session.execute(_DERIVED_UPDATE, updates)
+
+
+@event.listens_for(db.session, "after_flush")
+def _queue_completion_jobs(session, flush_context):
+    # badges etc. run in the background once this transaction commits
+    # (ids are known only after the flush, for brand new courses)
+    for course in session.info.pop("completed_courses", ()):
+        enqueue_after_commit(
+            session, "course_completed", {"course_id": course.id, "user_id": course.user_id}
+        )
+
+
+# -------------------------------------------------------------
+# Full rebuild (set-based)
+# -------------------------------------------------------------
+def rebuild_course_aggregates(course_ids=None):
+    """
+    Recompute the course totals from the module_progress table.
+
+    Used to backfill existing databases and after bulk writes that
+    bypass the ORM.  `course_ids` limits the rebuild to some courses.
+    The caller commits.
+    """
+    mp = ModuleProgress.__table__
+    percent = func.coalesce(mp.c.percent_complete, 0)
+
+    def total(expr):
+        return (
+            db.select(func.coalesce(func.sum(expr), 0))
+            .where(mp.c.course_id == Course.id)
+            .scalar_subquery()
+        )
+
+    stmt = db.update(Course).values(
+        version=Course.version + 1,
+        module_count=total(1),
+        percent_sum=total(percent),
+        completed_module_count=total(db.case((percent == 100, 1), else_=0)),
+        started_module_count=total(db.case((percent > 0, 1), else_=0)),
+    )
+    if course_ids is not None:
+        stmt = stmt.where(Course.id.in_(course_ids))
+    db.session.execute(stmt, execution_options={"synchronize_session": False})
+
+    # progress_percent / completed_at use the Python rules above,
+    # so derive them per course and write only the rows that changed
+    table = Course.__table__
+    select = db.select(
+        Course.id,
+        Course.user_id,
+        Course.percent_sum,
+        Course.module_count,
+        Course.progress_percent,
+        Course.completed_at,
+        Course.status,
+    ).execution_options(yield_per=5000)
+    if course_ids is not None:
+        select = select.where(Course.id.in_(course_ids))
+    changed = 0
+    today = date.today()
+    for rows in db.session.execute(select).partitions():
+        updates = []
+        for row in rows:
+            percent, completed, newly_completed = _derived_progress(row, today)
+            if newly_completed:
+                enqueue_after_commit(
+                    db.session, "course_completed", {"course_id": row.id, "user_id": row.user_id}
+                )
+            if (percent, completed) != (row.progress_percent, row.completed_at):
+                updates.append(
+                    {"course_id": row.id, "percent": percent, "completed": completed}
+                )
+        if updates:
+            db.session.execute(_DERIVED_UPDATE, updates)
+            changed += len(updates)
+
+    # Course objects already in the session now hold stale totals
+    db.session.expire_all()
+    return changed
@@ -0,0 +1,70 @@
+# -------------------------------------------------------------
+# reminders.py
+# -------------------------------------------------------------
+# Purpose:
+#   "You haven't studied in N days" reminders.
+#
+#   User.reminder_due is precomputed in SQL for many users at once
+#   (refresh_reminders), so pages just read the column instead of
+#   working it out on every render.  Signing in clears it (in the
+#   streak UPDATE, auth/routes.py); the nightly batch (nightly.py)
+#   sets it for everyone who has gone quiet.
+# -------------------------------------------------------------
+
+from datetime import date, timedelta
+
+from . import db
+from .changes import note_users_changed
+from .models import User
+
+# days without activity before a reminder is shown
+REMINDER_AFTER_DAYS = 3
+
+
+def reminder_due_expression(today=None):
+    """SQL: True when the user has been inactive for REMINDER_AFTER_DAYS+."""
+    cutoff = (today or date.today()) - timedelta(days=REMINDER_AFTER_DAYS)
+    return db.and_(User.last_active_date.is_not(None), User.last_active_date <= cutoff)
+
+
+def refresh_reminders(user_ids=None, today=None, id_range=None):
+    """
+    Recompute reminder_due with one set-based UPDATE for `user_ids`,
+    for the users with lo <= id <= hi (`id_range`), or for everyone.
+    Only rows whose flag changes are written.  Commits, and returns
+    how many users changed.
+    """
+    due = db.case((reminder_due_expression(today), True), else_=False)
+    condition = [User.reminder_due != due]
+    if user_ids is not None:
+        condition.append(User.id.in_(user_ids))
+    if id_range is not None:
+        condition.append(User.id.between(*id_range))
+
+    changed_ids = db.session.scalars(db.select(User.id).where(*condition)).all()
+    if not changed_ids:
+        return 0
+
+    db.session.execute(
+        db.update(User).where(*condition).values(reminder_due=due),
+        execution_options={"synchronize_session": False},
+    )
+    # bulk SQL bypasses the ORM change tracking -> record it ourselves
+    note_users_changed(db.session, {user_id: {"user"} for user_id in changed_ids})
+    db.session.commit()
+    return len(changed_ids)
+
+
+def reminder_message(user, today=None):
+    """The reminder banner text for `user`, or None."""
+    if user is None or not user.reminder_due or user.last_active_date is None:
+        return None
+    days_since = ((today or date.today()) - user.last_active_date).days
+    # the flag may be a moment older than a fresh sign-in
+    if days_since < REMINDER_AFTER_DAYS:
+        return None
+    return (
+        "You haven't studied in "
+        f"{days_since} days. Jump back in to keep your streak alive!"
+    )
+
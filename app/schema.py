@@ -0,0 +1,145 @@
+# -------------------------------------------------------------
+# schema.py
+# -------------------------------------------------------------
+# Purpose:
+#   Bring an existing database (e.g. an old app/app.db) up to the
+#   schema declared in models.py without losing data.
+#
+#   db.create_all() only creates *missing tables*.  upgrade_schema()
+#   also adds missing columns and indexes, so it is safe to run on
+#   every deploy:
+#
+#       flask --app app upgrade-db
+#
+#   Every step is idempotent (it checks what already exists first).
+#   On SQLite it also creates the notes full-text index (search.py).
+# -------------------------------------------------------------
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from . import db
+from .models import Course, ModuleNote, ModuleProgress, User
+
+
+def _missing_columns(inspector, table):
+    existing = {col["name"] for col in inspector.get_columns(table.name)}
+    return [col for col in table.columns if col.name not in existing]
+
+
+def _add_column(conn, table, column):
+    """ALTER TABLE ... ADD COLUMN, using the model's column definition."""
+    preparer = conn.dialect.identifier_preparer
+    column_ddl = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.execute(
+        text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}")
+    )
+
+
+def _dedupe_module_notes(conn):
+    """
+    Keep only the newest note per (user, module) so the unique
+    index on module_note(user_id, module_id) can be created.
+    """
+    notes = ModuleNote.__table__
+    newest = (
+        db.select(db.func.max(notes.c.id))
+        .group_by(notes.c.user_id, notes.c.module_id)
+    )
+    result = conn.execute(notes.delete().where(notes.c.id.not_in(newest)))
+    return result.rowcount
+
+
+def _dedupe_module_progress(conn):
+    """
+    Keep only the newest progress row per (user, course, module name)
+    so its unique index can be created.  Returns the affected course
+    ids (their totals counted the removed rows).
+    """
+    rows = ModuleProgress.__table__
+    newest = (
+        db.select(db.func.max(rows.c.id))
+        .group_by(rows.c.user_id, rows.c.course_id, rows.c.module_name)
+    )
+    duplicates = rows.c.id.not_in(newest)
+    course_ids = set(conn.scalars(db.select(rows.c.course_id).where(duplicates).distinct()))
+    if course_ids:
+        conn.execute(rows.delete().where(duplicates))
+    return course_ids
+
+
+def upgrade_schema(log=print):
+    """
+    Create missing tables, columns and indexes.
+
+    Returns a list of the changes that were made (empty if the
+    database was already up to date).
+    """
+    changes = []
+
+    # 1) brand new tables
+    db.create_all()
+
+    with db.engine.begin() as conn:
+        inspector = inspect(conn)
+
+        # 2) columns added to existing tables
+        added_columns = set()
+        for table in db.metadata.sorted_tables:
+            for column in _missing_columns(inspector, table):
+                _add_column(conn, table, column)
+                added_columns.add((table.name, column.name))
+                changes.append(f"added column {table.name}.{column.name}")
+
+        # 3) indexes (unique note / progress indexes need duplicates
+        #    removed first)
+        deduped_courses = set()
+        for table in db.metadata.sorted_tables:
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                if table is ModuleNote.__table__ and index.unique:
+                    removed = _dedupe_module_notes(conn)
+                    if removed:
+                        changes.append(f"removed {removed} duplicate module notes")
+                if table is ModuleProgress.__table__ and index.unique:
+                    deduped_courses = _dedupe_module_progress(conn)
+                    if deduped_courses:
+                        changes.append(
+                            f"removed duplicate module progress in {len(deduped_courses)} courses"
+                        )
+                index.create(conn)
+                changes.append(f"created index {index.name}")
+
+        # 4) notes full-text index + its sync triggers (SQLite)
+        from .search import FTS_TABLE, ensure_search_index
+
+        if ensure_search_index(conn):
+            changes.append(f"created full-text index {FTS_TABLE}")
+
+    # 5) new course totals start at 0 -> compute them from the rows
+    #    (and recount the courses that lost duplicate progress rows)
+    if (Course.__tablename__, "module_count") in added_columns:
+        from .progress import rebuild_course_aggregates
+
+        rebuild_course_aggregates()
+        db.session.commit()
+        changes.append("rebuilt course progress totals")
+    elif deduped_courses:
+        from .progress import rebuild_course_aggregates
+
+        rebuild_course_aggregates(deduped_courses)
+        db.session.commit()
+        changes.append(f"rebuilt progress totals of {len(deduped_courses)} courses")
+
+    # 6) new reminder flags start at false -> compute them
+    if (User.__tablename__, "reminder_due") in added_columns:
+        from .reminders import refresh_reminders
+
+        refresh_reminders()
+        changes.append("computed reminder flags")
+
+    for change in changes:
+        log(change)
+    return changes
@@ -0,0 +1,242 @@
+# -------------------------------------------------------------
+# search.py
+# -------------------------------------------------------------
+# Purpose:
+#   Full-text search over a user's module notes.
+#
+#   SQLite: an FTS5 index (module_note_fts) over module_note, kept in
+#   sync by triggers on INSERT / UPDATE / DELETE, so every writer -
+#   ORM, bulk INSERTs, raw SQL - keeps it current in its own
+#   transaction.  It is an "external content" index: the note text is
+#   stored once, in module_note; the index only holds the tokens.
+#
+#   Two columns are indexed:
+#       content   the note text (porter stemming: "reviews" ~ "review")
+#       user_id   the owner, as a token, so "user_id:7 AND ..." only
+#                 walks user 7's notes even in a table of millions
+#
+#   search_notes() returns ranked, highlighted, paginated hits.
+#   Other databases fall back to a LIKE scan (correct, not fast).
+#
+#   The index is created with the tables (db.create_all) and added to
+#   existing databases by `flask upgrade-db` (ensure_search_index).
+# -------------------------------------------------------------
+
+import re
+
+from markupsafe import Markup, escape
+from sqlalchemy import DDL, event, inspect
+
+from . import db
+from .models import Course, Module, ModuleNote
+
+FTS_TABLE = "module_note_fts"
+
+# query limits (keep user input from becoming an expensive query)
+MAX_TERMS = 8
+MAX_PAGE_SIZE = 50
+
+# highlight markers: control characters never typed into a note, so
+# the snippet can be HTML-escaped first and marked up afterwards
+_OPEN, _CLOSE = "\x02", "\x03"
+
+_CREATE_STATEMENTS = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        content, user_id,
+        content='module_note', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS module_note_fts_insert
+        AFTER INSERT ON module_note BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, content, user_id)
+            VALUES (new.id, new.content, new.user_id);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS module_note_fts_delete
+        AFTER DELETE ON module_note BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content, user_id)
+            VALUES ('delete', old.id, old.content, old.user_id);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS module_note_fts_update
+        AFTER UPDATE OF content, user_id ON module_note BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content, user_id)
+            VALUES ('delete', old.id, old.content, old.user_id);
+            INSERT INTO {FTS_TABLE}(rowid, content, user_id)
+            VALUES (new.id, new.content, new.user_id);
+        END""",
+)
+
+for _statement in _CREATE_STATEMENTS:
+    event.listen(
+        ModuleNote.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
+# the triggers go with module_note; the index table must be dropped too
+event.listen(
+    ModuleNote.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"),
+)
+
+
+def ensure_search_index(conn):
+    """
+    Create the FTS index + triggers on an existing SQLite database and
+    fill it from module_note.  Returns True if it had to be created.
+    """
+    if conn.dialect.name != "sqlite" or inspect(conn).has_table(FTS_TABLE):
+        return False
+    for statement in _CREATE_STATEMENTS:
+        conn.exec_driver_sql(statement)
+    conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+# -------------------------------------------------------------
+# Queries
+# -------------------------------------------------------------
+# Ranking: FTS5's own bm25() counts, on every query, how many notes
+# of ALL users contain each term - a scan of the term's whole doclist
+# that grows with the table (2 ms per query at 100k notes, 10x that at
+# 1M).  Instead the index only finds the user's matching notes (user_id
+# token AND the terms), and SQL ranks all of them with the BM25 term
+# saturation + length normalisation before LIMIT / OFFSET:
+#
+#     hits   = matched tokens (highlight() adds one marker pair each)
+#     length = note length, against the average of the user's matches
+#
+# Every term is required, so the IDF part would only reweigh terms
+# that all matches contain anyway and is left out.
+# -------------------------------------------------------------
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_WORDS = 16
+
+
+def query_terms(text):
+    """Words of a search box string (FTS syntax is never passed through)."""
+    return re.findall(r"\w+", text or "", flags=re.UNICODE)[:MAX_TERMS]
+
+
+def _score(hits, length, average_length):
+    """BM25 term-frequency part; works on numbers and SQL expressions."""
+    norm = 1 - BM25_B + BM25_B * length / average_length
+    return hits * (BM25_K1 + 1) / (hits + BM25_K1 * norm)
+
+
+def _snippet(marked):
+    """About SNIPPET_WORDS words around the first match, as safe HTML."""
+    words = marked.split()
+    first = next((i for i, word in enumerate(words) if _OPEN in word), 0)
+    start = max(0, min(first - SNIPPET_WORDS // 4, len(words) - SNIPPET_WORDS))
+    end = start + SNIPPET_WORDS
+    text = ("… " if start else "") + " ".join(words[start:end]) + (" …" if end < len(words) else "")
+    html = str(escape(text))
+    return Markup(html.replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>"))
+
+
+def search_notes(user_id, text, page=1, per_page=20):
+    """
+    One page of `user_id`'s notes matching every word of `text`.
+
+    Returns {"results": [{note_id, module_id, module_title, course_id,
+    course_title, created_at, snippet (escaped HTML with <mark>)}],
+    "page", "per_page", "has_more"}; best matches first.
+    """
+    terms = query_terms(text)
+    page = max(int(page), 1)
+    per_page = min(max(int(per_page), 1), MAX_PAGE_SIZE)
+    found = {"results": [], "page": page, "per_page": per_page, "has_more": False}
+    if not terms:
+        return found
+
+    # one row more than the page tells whether there is a next page
+    search = _search_fts if db.session.get_bind().dialect.name == "sqlite" else _search_like
+    rows = search(user_id, terms, per_page + 1, (page - 1) * per_page)
+    found["results"] = [
+        dict(row, snippet=_snippet(row.pop("marked"))) for row in rows[:per_page]
+    ]
+    found["has_more"] = len(rows) > per_page
+    return found
+
+
+def _select(matches):
+    """Note, module and course columns for the rows of `matches`."""
+    return (
+        db.select(
+            ModuleNote.id.label("note_id"),
+            ModuleNote.module_id,
+            Module.title.label("module_title"),
+            Course.id.label("course_id"),
+            Course.title.label("course_title"),
+            ModuleNote.created_at,
+            matches.c.marked,
+        )
+        .select_from(matches)
+        .join(ModuleNote, ModuleNote.id == matches.c.note_id)
+        .join(Module, Module.id == ModuleNote.module_id)
+        .join(Course, Course.id == Module.course_id)
+    )
+
+
+def _search_fts(user_id, terms, limit, offset):
+    """A ranked slice of the user's notes containing every term."""
+    fts = db.table(FTS_TABLE, db.column("rowid"))
+    fts_name = db.literal_column(FTS_TABLE)
+    # the owner token narrows the match to this user's notes first
+    match = f"user_id:{int(user_id)} AND content:(" + " ".join(f'"{t}"' for t in terms) + ")"
+    marked = db.func.highlight(fts_name, 0, _OPEN, _CLOSE)
+    length = db.func.length(ModuleNote.content)
+    # materialized: highlight() only works while the FTS scan is on the row
+    notes = (
+        db.select(
+            fts.c.rowid.label("note_id"),
+            marked.label("marked"),
+            length.label("length"),
+        )
+        .select_from(fts)
+        .join(ModuleNote, ModuleNote.id == fts.c.rowid)
+        .where(fts_name.op("MATCH")(match))
+        .cte("note_hits")
+        .prefix_with("MATERIALIZED")
+    )
+    matches = db.select(
+        notes,
+        ((db.func.length(notes.c.marked) - notes.c.length) / 2.0).label("hits"),
+        db.func.avg(notes.c.length).over().label("average_length"),
+    ).subquery()
+    score = _score(matches.c.hits, matches.c.length, matches.c.average_length)
+    query = (
+        _select(matches)
+        .order_by(score.desc(), matches.c.note_id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    return [row._asdict() for row in db.session.execute(query)]
+
+
+def _search_like(user_id, terms, limit, offset):
+    """LIKE fallback: the user's matches are scored here, in Python."""
+    query = db.select(ModuleNote.id, ModuleNote.content).where(
+        ModuleNote.user_id == user_id,
+        *(ModuleNote.content.icontains(term, autoescape=True) for term in terms),
+    )
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    notes = {
+        note_id: pattern.sub(lambda m: _OPEN + m.group() + _CLOSE, content)
+        for note_id, content in db.session.execute(query)
+    }
+    if not notes:
+        return []
+    average_length = sum(len(marked) for marked in notes.values()) / len(notes)
+
+    def rank(note_id):
+        marked = notes[note_id]
+        hits = marked.count(_OPEN)
+        return -_score(hits, len(marked) - 2 * hits, average_length), -note_id
+
+    page = sorted(notes, key=rank)[offset:offset + limit]
+    matches = db.select(ModuleNote.id.label("note_id"), db.literal("").label("marked"))
+    matches = matches.where(ModuleNote.id.in_(page)).subquery()
+    rows = [row._asdict() for row in db.session.execute(_select(matches))]
+    for row in rows:
+        row["marked"] = notes[row["note_id"]]
+    return sorted(rows, key=lambda row: rank(row["note_id"]))
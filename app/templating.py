@@ -0,0 +1,80 @@
+# -------------------------------------------------------------
+# templating.py
+# -------------------------------------------------------------
+# Purpose:
+#   Make template rendering cheaper:
+#
+#   1) Bytecode cache (JINJA_BYTECODE_CACHE_DIR in config.py)
+#      Compiled templates are stored on disk, so a new worker loads
+#      them instead of parsing + compiling every template on its
+#      first request.  `flask compile-templates` fills the cache
+#      ahead of time (e.g. during a deploy).  Entries are checked
+#      against the template source, so edits are picked up.
+#
+#   2) Fragment cache: a {% cache %} tag for rendered HTML pieces
+#
+#          {% cache "course-card", course.id, course.version %}
+#            ... expensive markup ...
+#          {% endcache %}
+#
+#      The arguments form the cache key.  Keys must include a
+#      version that changes whenever the fragment's data changes
+#      (Course.version, see progress.py), so entries never need to
+#      be deleted: a changed course simply gets a new key and only
+#      that fragment is rendered again.
+# -------------------------------------------------------------
+
+import os
+
+from flask import current_app, has_app_context
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache key, ... %}...{% endcache %}, stored in the fragment cache."""
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_render", [nodes.List(args)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render(self, key_parts, caller):
+        if not has_app_context() or "fragment_cache" not in current_app.extensions:
+            return caller()
+        cache = current_app.extensions["fragment_cache"]
+        key = ":".join(str(part) for part in key_parts)
+        html = cache.get(key)
+        if html is None:
+            html = caller()
+            cache.set(key, html)
+        return Markup(html)
+
+
+def init_templating(app):
+    """Attach the bytecode cache and the {% cache %} tag to app.jinja_env."""
+    directory = app.config.get("JINJA_BYTECODE_CACHE_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(
+            directory, pattern="tmj-%s.cache"
+        )
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
+
+def compile_templates(app):
+    """Load every template once (fills the bytecode cache); returns the count."""
+    names = app.jinja_env.list_templates(
+        filter_func=lambda name: name.endswith((".html", ".txt", ".xml"))
+    )
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
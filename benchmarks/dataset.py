@@ -0,0 +1,62 @@
+# -------------------------------------------------------------
+# benchmarks/dataset.py
+# -------------------------------------------------------------
+# Purpose:
+#   Seed a synthetic dataset of a given size for the benchmarks:
+#       users x courses x modules (+ progress) x notes
+#
+#   The rows come from app/datagen.py (the same generator behind
+#   `flask seed-synthetic`), so benchmark data and staging data look
+#   alike.  The same `seed` always produces the same data.
+# -------------------------------------------------------------
+
+from dataclasses import dataclass
+
+from app.datagen import generate_dataset
+
+PASSWORD = "password123"
+PREFIX = "bench"
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int
+    courses: int  # per user
+    modules: int  # per course
+    notes: int  # per user
+
+
+SCALES = {
+    "small": Scale(users=20, courses=5, modules=4, notes=2),
+    "medium": Scale(users=200, courses=20, modules=6, notes=5),
+    "large": Scale(users=2000, courses=40, modules=8, notes=10),
+}
+
+
+def seed_dataset(scale, seed=42, password_method="pbkdf2:sha256:1000", chunk=5000):
+    """
+    Drop + recreate all tables and fill them at `scale`.
+
+    Every user gets the password "password123".  Returns a
+    {username: [course ids]} map for the scenarios.
+    """
+    generate_dataset(
+        scale.users,
+        courses_per_user=scale.courses,
+        modules_per_course=scale.modules,
+        notes_per_user=scale.notes,
+        seed=seed,
+        chunk_size=chunk,
+        password=PASSWORD,
+        password_method=password_method,
+        prefix=PREFIX,
+        reset=True,
+    )
+
+    # on an empty database ids are handed out sequentially from 1
+    return {
+        f"{PREFIX}{user_id}": list(
+            range((user_id - 1) * scale.courses + 1, user_id * scale.courses + 1)
+        )
+        for user_id in range(1, scale.users + 1)
+    }
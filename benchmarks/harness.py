@@ -0,0 +1,184 @@
+# -------------------------------------------------------------
+# benchmarks/harness.py
+# -------------------------------------------------------------
+# Purpose:
+#   Drive the hot pages through the Flask test client with several
+#   threads and measure them:
+#       dashboard      GET  /feature
+#       course_detail  GET  /courses/<id>
+#       login          POST /auth/login
+#
+#   Each worker thread has its own client (and its own logged-in
+#   user).  Latency is measured around every request; the query count
+#   comes from the Server-Timing header that app/instrumentation.py
+#   adds, so the numbers match what production monitoring sees.
+# -------------------------------------------------------------
+
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import ProductionConfig
+from app.instrumentation import percentile
+
+from .dataset import PASSWORD
+
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+def benchmark_config(database_uri, cache=True):
+    """A ProductionConfig pointed at the benchmark database."""
+
+    class BenchmarkConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        WTF_CSRF_ENABLED = False
+        INSTRUMENTATION_ENABLED = True
+        DASHBOARD_CACHE_BACKEND = "memory" if cache else "null"
+        USER_CACHE_BACKEND = "memory" if cache else "null"
+
+    return BenchmarkConfig
+
+
+# -------------------------------------------------------------
+# Scenarios: (client, username, course_ids, rng) -> response
+# -------------------------------------------------------------
+def _login(client, username):
+    return client.post(
+        "/auth/login",
+        data={"username": username, "password": PASSWORD},
+    )
+
+
+def dashboard(client, username, course_ids, rng):
+    return client.get("/feature")
+
+
+def course_detail(client, username, course_ids, rng):
+    return client.get(f"/courses/{rng.choice(course_ids)}")
+
+
+def login(client, username, course_ids, rng):
+    # a fresh client (no session cookie) = a real sign-in every time
+    return _login(client.application.test_client(), username)
+
+
+SCENARIOS = {
+    "dashboard": dashboard,
+    "course_detail": course_detail,
+    "login": login,
+}
+
+# a response with one of these codes counts as success
+OK_STATUS = {200, 302}
+
+
+def _run_worker(app, scenario, username, course_ids, requests, seed, samples, lock):
+    rng = random.Random(seed)
+    client = app.test_client()
+    _login(client, username)
+    scenario(client, username, course_ids, rng)  # warm-up, not measured
+
+    local = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = scenario(client, username, course_ids, rng)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        match = QUERIES_RE.search(response.headers.get("Server-Timing", ""))
+        queries = int(match.group(1)) if match else 0
+        local.append((elapsed_ms, queries, response.status_code in OK_STATUS))
+
+    with lock:
+        samples.extend(local)
+
+
+def run_scenario(app, name, course_ids, requests=50, concurrency=4, seed=42):
+    """
+    Run one scenario with `concurrency` threads x `requests` each.
+    Returns a dict of throughput, latency percentiles and query counts.
+    """
+    scenario = SCENARIOS[name]
+    usernames = sorted(course_ids)
+    samples, lock = [], threading.Lock()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(
+                _run_worker,
+                app,
+                scenario,
+                usernames[worker % len(usernames)],
+                course_ids[usernames[worker % len(usernames)]],
+                requests,
+                seed + worker,
+                samples,
+                lock,
+            )
+            for worker in range(concurrency)
+        ]
+        for future in futures:
+            future.result()
+    wall = time.perf_counter() - started
+
+    latencies = sorted(s[0] for s in samples)
+    queries = [s[1] for s in samples]
+    return {
+        "requests": len(samples),
+        "concurrency": concurrency,
+        "throughput_rps": round(len(samples) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "avg_queries": round(sum(queries) / len(queries), 2) if queries else 0.0,
+        "max_queries": max(queries, default=0),
+        "errors": sum(not s[2] for s in samples),
+    }
+
+
+# -------------------------------------------------------------
+# Baselines
+# -------------------------------------------------------------
+def compare_to_baseline(results, baseline, tolerance=0.5):
+    """
+    Return a list of human-readable regressions (empty = all good).
+
+    - any errors, or more queries per request than the baseline, fail
+      (query counts are deterministic, so no tolerance)
+    - p95 latency may be up to `tolerance` slower, and throughput up
+      to `tolerance` lower, than the baseline
+    """
+    problems = []
+    for name, result in results.items():
+        if result["errors"]:
+            problems.append(f"{name}: {result['errors']} failed requests")
+
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        if result["max_queries"] > expected["max_queries"]:
+            problems.append(
+                f"{name}: {result['max_queries']} queries/request "
+                f"(baseline {expected['max_queries']})"
+            )
+        if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            problems.append(
+                f"{name}: p95 {result['p95_ms']} ms (baseline {expected['p95_ms']} ms)"
+            )
+        if result["throughput_rps"] < expected["throughput_rps"] * (1 - tolerance):
+            problems.append(
+                f"{name}: {result['throughput_rps']} req/s "
+                f"(baseline {expected['throughput_rps']} req/s)"
+            )
+    return problems
+
+
+def baseline_entry(result):
+    """The subset of a result that is stored as a baseline."""
+    return {
+        "max_queries": result["max_queries"],
+        "p95_ms": result["p95_ms"],
+        "throughput_rps": result["throughput_rps"],
+    }
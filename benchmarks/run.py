@@ -0,0 +1,136 @@
+# -------------------------------------------------------------
+# benchmarks/run.py
+# -------------------------------------------------------------
+# Purpose:
+#   Command line entry point for the benchmark suite.
+#
+#   Examples (from the project root):
+#       python -m benchmarks.run                        # small scale
+#       python -m benchmarks.run --scale medium --concurrency 8
+#       python -m benchmarks.run --users 500 --courses 60 --no-cache
+#       python -m benchmarks.run --update-baseline      # store new numbers
+#
+#   The database is a throw-away SQLite file (production PRAGMAs).
+#   Results are compared with benchmarks/baselines.json; any
+#   regression prints a report and exits with status 1.  Baselines
+#   are machine-specific: refresh them on the machine that runs the
+#   comparison with --update-baseline.
+# -------------------------------------------------------------
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import replace
+
+from app import create_app
+
+from .dataset import SCALES, seed_dataset
+from .harness import (
+    SCENARIOS,
+    baseline_entry,
+    benchmark_config,
+    compare_to_baseline,
+    run_scenario,
+)
+
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="TMJ benchmark suite")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--users", type=int, help="override users at this scale")
+    parser.add_argument("--courses", type=int, help="override courses per user")
+    parser.add_argument("--modules", type=int, help="override modules per course")
+    parser.add_argument("--notes", type=int, help="override notes per user")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS),
+                        default=sorted(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=50,
+                        help="measured requests per worker thread")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="disable the dashboard + identity caches")
+    parser.add_argument("--baseline", default=BASELINES)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed slow-down for latency/throughput (0.5 = 50%%)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    return parser.parse_args(argv)
+
+
+def baseline_key(args, scale):
+    """Baselines are stored per dataset size + cache mode."""
+    key = f"{scale.users}x{scale.courses}x{scale.modules}x{scale.notes}"
+    return key + ("-nocache" if args.no_cache else "")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scale = replace(
+        SCALES[args.scale],
+        **{
+            field: getattr(args, field)
+            for field in ("users", "courses", "modules", "notes")
+            if getattr(args, field) is not None
+        },
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(
+            benchmark_config(f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                             cache=not args.no_cache)
+        )
+        with app.app_context():
+            started = time.perf_counter()
+            course_ids = seed_dataset(
+                scale, seed=args.seed,
+                password_method=app.config["PASSWORD_HASH_METHOD"],
+            )
+            seeded_in = time.perf_counter() - started
+
+        results = {
+            name: run_scenario(app, name, course_ids, requests=args.requests,
+                               concurrency=args.concurrency, seed=args.seed)
+            for name in args.scenarios
+        }
+
+    key = baseline_key(args, scale)
+    if args.json:
+        print(json.dumps({"dataset": key, "results": results}, indent=2))
+    else:
+        print(f"dataset {key} seeded in {seeded_in:.2f}s")
+        print(f"{'scenario':<15}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}"
+              f"{'p99 ms':>10}{'queries':>9}{'errors':>8}")
+        for name, r in results.items():
+            print(f"{name:<15}{r['throughput_rps']:>9}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+                  f"{r['p99_ms']:>10}{r['avg_queries']:>9}{r['errors']:>8}")
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as fh:
+            baselines = json.load(fh)
+
+    if args.update_baseline:
+        stored = baselines.setdefault(key, {})
+        stored.update({name: baseline_entry(r) for name, r in results.items()})
+        with open(args.baseline, "w") as fh:
+            json.dump(baselines, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        print(f"baseline for {key} written to {args.baseline}")
+        return 0
+
+    problems = compare_to_baseline(results, baselines.get(key, {}), args.tolerance)
+    if problems:
+        print("\nREGRESSIONS against baseline " + key + ":", file=sys.stderr)
+        for problem in problems:
+            print("  - " + problem, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# -------------------------------------------------------------
+# benchmarks/search.py
+# -------------------------------------------------------------
+# Purpose:
+#   Time notes full-text search (app/search.py) on a large dataset:
+#
+#       python -m benchmarks.search                    # 1,000,000 notes
+#       python -m benchmarks.search --notes 100000 --queries 200
+#
+#   Seeds a throw-away SQLite file with `--notes` notes (the FTS
+#   index is filled by its triggers while seeding), then runs
+#   `--queries` searches for random users with one or two random
+#   words and reports p50 / p95 / p99 latency.  The same searches
+#   through the LIKE fallback are timed for comparison.  Exits with
+#   status 1 when the FTS p95 is above --budget-ms.
+# -------------------------------------------------------------
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from app import create_app
+from app.datagen import WORDS, generate_dataset
+from app.instrumentation import percentile
+from app.search import _search_like, query_terms, search_notes
+
+from .harness import benchmark_config
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="TMJ notes search benchmark")
+    parser.add_argument("--notes", type=int, default=1_000_000)
+    parser.add_argument("--notes-per-user", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--budget-ms", type=float, default=10.0,
+                        help="fail when the FTS p95 is slower than this")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    return parser.parse_args(argv)
+
+
+def _timed(searches, run):
+    latencies = []
+    for user_id, text in searches:
+        started = time.perf_counter()
+        run(user_id, text)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "queries": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    users = max(args.notes // args.notes_per_user, 1)
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(benchmark_config(f"sqlite:///{os.path.join(tmp, 'search.db')}"))
+        with app.app_context():
+            started = time.perf_counter()
+            counts = generate_dataset(
+                users,
+                courses_per_user=1,
+                modules_per_course=args.notes_per_user,
+                notes_per_user=args.notes_per_user,
+                seed=args.seed,
+                chunk_size=50000,
+                password_method="pbkdf2:sha256:1000",
+                prefix="search",
+                reset=True,
+                progress=None if args.json else lambda done, total, rows, s: print(
+                    f"  seeding {done}/{total} users ({rows:,} rows, {s:.0f}s)", end="\r"
+                ),
+            )
+            seeded_in = time.perf_counter() - started
+
+            searches = [
+                (rng.randint(1, users), " ".join(rng.sample(WORDS, rng.choice((1, 1, 2)))))
+                for _ in range(args.queries)
+            ]
+            hits = sum(
+                len(search_notes(user_id, text, per_page=args.per_page)["results"])
+                for user_id, text in searches[:50]
+            )  # also warms the page cache
+            results = {
+                "fts": _timed(
+                    searches,
+                    lambda u, t: search_notes(u, t, per_page=args.per_page),
+                ),
+                "like": _timed(
+                    searches,
+                    lambda u, t: _search_like(u, query_terms(t), args.per_page + 1, 0),
+                ),
+            }
+
+    report = {
+        "notes": counts["module_note"],
+        "users": users,
+        "seeded_seconds": round(seeded_in, 1),
+        "avg_hits_per_query": round(hits / min(50, len(searches)), 1),
+        "results": results,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"\n{report['notes']:,} notes / {users:,} users seeded in {seeded_in:.1f}s; "
+              f"~{report['avg_hits_per_query']} hits per query")
+        print(f"{'search':<16}{'queries':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for name, r in results.items():
+            print(f"{name:<16}{r['queries']:>9}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+                  f"{r['p99_ms']:>10}{r['max_ms']:>10}")
+
+    if results["fts"]["p95_ms"] > args.budget_ms:
+        print(f"FTS p95 {results['fts']['p95_ms']} ms is over the "
+              f"{args.budget_ms} ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+# -------------------------------------------------------------
+# benchmarks/wire.py
+# -------------------------------------------------------------
+# Purpose:
+#   Measure bytes on the wire for the login page and the dashboard,
+#   including everything the browser loads with them (CSS, images,
+#   the login video), before and after the transfer optimisations:
+#
+#       before : no compression, plain app/static files
+#       after  : gzip/brotli (compression.py) + `build-assets`
+#                (fingerprinted, immutable, precompressed, WebP)
+#
+#       python -m benchmarks.wire
+#       python -m benchmarks.wire --accept-encoding gzip --viewport 390 --dpr 3
+#
+#   Each page is visited twice by a simulated browser cache:
+#       first  : empty cache
+#       repeat : fresh (max-age / immutable) files are not requested,
+#                stale ones are revalidated with If-None-Match
+#   Bytes = status line + headers + body, as sent by the app.
+# -------------------------------------------------------------
+
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+from dataclasses import replace
+from html.parser import HTMLParser
+
+from app import create_app
+from app.assets import Image, build_assets, load_manifest
+from app.compression import brotli
+
+from .dataset import PASSWORD, SCALES, seed_dataset
+from .harness import benchmark_config
+
+STATIC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "static")
+
+PAGES = {
+    "login": ("/auth/login", False),  # (path, logged in)
+    "dashboard": ("/feature", True),
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="TMJ bytes-on-the-wire benchmark")
+    parser.add_argument("--accept-encoding", default="gzip, deflate, br",
+                        help="Accept-Encoding the simulated browser sends")
+    parser.add_argument("--viewport", type=int, default=1280,
+                        help="CSS pixel width used to resolve <img sizes>")
+    parser.add_argument("--dpr", type=float, default=1.0, help="device pixel ratio")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    return parser.parse_args(argv)
+
+
+# -------------------------------------------------------------
+# What a browser would fetch for a page
+# -------------------------------------------------------------
+def _slot_width(sizes, viewport):
+    """CSS pixel width an image gets from a `sizes` attribute."""
+    for part in (p.strip() for p in (sizes or "100vw").split(",")):
+        condition = re.match(r"\(max-width:\s*(\d+)px\)\s*(.+)", part)
+        if condition:
+            if viewport > int(condition.group(1)):
+                continue
+            part = condition.group(2)
+        value = float(re.match(r"[\d.]+", part).group())
+        return value * viewport / 100 if part.endswith("vw") else value
+    return viewport
+
+
+def _pick_from_srcset(srcset, sizes, viewport, dpr):
+    candidates = sorted(
+        (int(width[:-1]), url)
+        for url, width in (item.split() for item in srcset.split(","))
+    )
+    needed = _slot_width(sizes, viewport) * dpr
+    for width, url in candidates:
+        if width >= needed:
+            return url
+    return candidates[-1][1]
+
+
+class _AssetCollector(HTMLParser):
+    """Static URLs a browser loads for a page (one image per <picture>)."""
+
+    def __init__(self, viewport, dpr):
+        super().__init__()
+        self.viewport, self.dpr = viewport, dpr
+        self.urls = []
+        self._picked = None  # WebP source chosen inside the current <picture>
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "link" and attrs.get("rel") == "stylesheet":
+            self.urls.append(attrs["href"])
+        elif tag == "picture":
+            self._picked = None
+        elif tag == "source" and attrs.get("srcset"):
+            self._picked = self._picked or _pick_from_srcset(
+                attrs["srcset"], attrs.get("sizes"), self.viewport, self.dpr
+            )
+        elif tag == "source" and attrs.get("src"):
+            self.urls.append(attrs["src"])  # <video><source src>
+        elif tag == "img":
+            self.urls.append(self._picked or attrs["src"])
+            self._picked = None
+
+
+def _wire_bytes(response):
+    head = len(f"HTTP/1.1 {response.status}\r\n")
+    head += sum(len(f"{k}: {v}\r\n") for k, v in response.headers.items()) + 2
+    return head + len(response.get_data())
+
+
+def _fresh(response):
+    control = response.cache_control
+    return bool(control.immutable or (control.max_age and not control.no_cache))
+
+
+def visit(client, path, cache, accept_encoding, viewport, dpr):
+    """Load a page + its assets through `cache` -> (requests, bytes)."""
+    headers = {"Accept-Encoding": accept_encoding}
+    page = client.get(path, headers=headers)
+    requests, total = 1, _wire_bytes(page)
+
+    html = page.get_data()
+    if page.headers.get("Content-Encoding"):
+        html = _decode(html, page.headers["Content-Encoding"])
+    collector = _AssetCollector(viewport, dpr)
+    collector.feed(html.decode("utf-8"))
+
+    for url in dict.fromkeys(collector.urls):  # each URL once per page
+        cached = cache.get(url)
+        if cached is not None and _fresh(cached):
+            continue
+        conditional = dict(headers)
+        if cached is not None and cached.headers.get("ETag"):
+            conditional["If-None-Match"] = cached.headers["ETag"]
+        response = client.get(url, headers=conditional)
+        requests += 1
+        total += _wire_bytes(response)
+        if response.status_code == 200:
+            cache[url] = response
+    return requests, total
+
+
+def _decode(data, encoding):
+    return brotli.decompress(data) if encoding == "br" else gzip.decompress(data)
+
+
+# -------------------------------------------------------------
+# Before / after
+# -------------------------------------------------------------
+def measure(app, username, args):
+    results = {}
+    for name, (path, logged_in) in PAGES.items():
+        client = app.test_client()
+        if logged_in:
+            client.post("/auth/login", data={"username": username, "password": PASSWORD})
+        cache = {}
+        for visit_name in ("first", "repeat"):
+            requests, total = visit(
+                client, path, cache, args.accept_encoding, args.viewport, args.dpr
+            )
+            results[f"{name}/{visit_name}"] = {"requests": requests, "bytes": total}
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scale = replace(SCALES["small"], users=2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = benchmark_config(f"sqlite:///{os.path.join(tmp, 'wire.db')}")
+
+        class BeforeConfig(base):
+            COMPRESS_ENABLED = False
+
+        class AfterConfig(base):
+            COMPRESS_ENABLED = True
+
+        before = create_app(BeforeConfig)
+        before.extensions["assets"] = {}  # ignore a local app/static/dist
+        with before.app_context():
+            username = sorted(
+                seed_dataset(scale, password_method=before.config["PASSWORD_HASH_METHOD"])
+            )[0]
+
+        static = os.path.join(tmp, "static")
+        shutil.copytree(STATIC, static, ignore=shutil.ignore_patterns("dist"))
+        build_assets(static, log=lambda message: None)
+        after = create_app(AfterConfig)
+        after.static_folder = static
+        after.extensions["assets"] = load_manifest(after)
+
+        results = {
+            "before": measure(before, username, args),
+            "after": measure(after, username, args),
+        }
+
+    notes = []
+    if Image is None:
+        notes.append("Pillow not installed: no WebP/downscaled image variants")
+    if brotli is None:
+        notes.append("brotli not installed: gzip only")
+
+    if args.json:
+        print(json.dumps({"results": results, "notes": notes}, indent=2))
+        return 0
+
+    print(f"Accept-Encoding: {args.accept_encoding}; viewport {args.viewport}px @ {args.dpr}x")
+    print(f"{'page/visit':<18}{'before req':>11}{'before KB':>11}"
+          f"{'after req':>11}{'after KB':>11}{'saved':>8}")
+    for key in results["before"]:
+        b, a = results["before"][key], results["after"][key]
+        saved = 1 - a["bytes"] / b["bytes"] if b["bytes"] else 0.0
+        print(f"{key:<18}{b['requests']:>11}{b['bytes'] / 1024:>11.1f}"
+              f"{a['requests']:>11}{a['bytes'] / 1024:>11.1f}{saved:>8.0%}")
+    for note in notes:
+        print("note: " + note)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@
 from datetime import date, timedelta
 from app import create_app, db
 from app.models import User, Course, Module, ModuleNote, ModuleProgress
+from app.reminders import refresh_reminders
 
 app = create_app()
 
@@ -119,4 +120,9 @@ with app.app_context():
     # 5) Commit everything
     # -------------------------------------------------
     db.session.commit()
+
+    # -------------------------------------------------
+    # 6) Reminder flags (normally set by `flask nightly`)
+    # -------------------------------------------------
+    refresh_reminders()
     print("Seeded: 1 user, 5 courses, multi-module progress, 1 note, streak demo")
@@ -0,0 +1,125 @@
+# tests/test_api.py
+
+import os
+import sys
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.models import Course, ModuleProgress, User
+
+
+def create_test_app():
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        user = User(username="mobile", email="mobile@example.com", streak_days=3)
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        course = Course(user_id=user.id, title="Intro to Python")
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(ModuleProgress(user_id=user.id, course_id=course.id,
+                                      module_name="Getting Started", percent_complete=40))
+        db.session.commit()
+    return app
+
+
+@contextmanager
+def captured_statements(app):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def logged_in_client(app):
+    client = app.test_client()
+    client.post("/auth/login", data={"username": "mobile", "password": "password123"})
+    return client
+
+
+def test_api_requires_login():
+    app = create_test_app()
+    assert app.test_client().get("/api/courses").status_code == 401
+
+
+def test_courses_api_returns_progress_with_etag():
+    app = create_test_app()
+    client = logged_in_client(app)
+
+    response = client.get("/api/courses")
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('"u1-v')
+    assert response.get_json()["courses"][0]["progress_percent"] == 40
+
+    detail = client.get("/api/courses/1").get_json()
+    assert detail["modules"] == [{"module_name": "Getting Started", "percent_complete": 40}]
+    assert client.get("/api/me").get_json()["streak_days"] == 1  # reset by login
+
+
+def test_conditional_get_returns_304_until_progress_changes():
+    app = create_test_app()
+    client = logged_in_client(app)
+    etag = client.get("/api/courses").headers["ETag"]
+
+    with captured_statements(app) as statements:
+        response = client.get("/api/courses", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert not any("module_progress" in s or "FROM course" in s for s in statements)
+
+    with app.app_context():
+        row = ModuleProgress.query.one()
+        row.percent_complete = 100
+        db.session.commit()
+
+    response = client.get("/api/courses", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json()["courses"][0]["status"] == "completed"
+
+
+def test_unknown_or_foreign_course_is_404_even_with_a_current_etag():
+    app = create_test_app()
+    with app.app_context():
+        other = User(username="other")
+        other.set_password("password123")
+        db.session.add(other)
+        db.session.flush()
+        db.session.add(Course(user_id=other.id, title="Not yours"))
+        db.session.commit()
+        foreign_id = Course.query.filter_by(title="Not yours").one().id
+
+    client = logged_in_client(app)
+    etag = client.get("/api/courses/1").headers["ETag"]
+    assert client.get("/api/courses/1", headers={"If-None-Match": etag}).status_code == 304
+    for course_id in (999, foreign_id):
+        response = client.get(f"/api/courses/{course_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 404
+
+
+def test_rolled_back_changes_keep_the_version():
+    app = create_test_app()
+    with app.app_context():
+        before = db.session.get(User, 1).data_version
+        db.session.get(Course, 1).title = "Renamed"
+        db.session.flush()
+        db.session.rollback()
+        assert db.session.get(User, 1).data_version == before
+
+        db.session.get(Course, 1).title = "Renamed"
+        db.session.commit()
+        assert db.session.get(User, 1).data_version == before + 1
@@ -0,0 +1,98 @@
+# tests/test_assets.py
+
+import io
+import os
+import sys
+
+import pytest
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import create_app
+from app.assets import build_assets, load_manifest
+
+
+def make_static(root):
+    (root / "img").mkdir()
+    (root / "styles.css").write_text("body { color: #111; }\n")
+    (root / "img" / "Big Badge.png").write_bytes(b"not really a png")
+    return root
+
+
+def create_test_app(static_dir=None):
+    app = create_app("testing")
+    if static_dir is not None:
+        app.static_folder = str(static_dir)
+        app.extensions["assets"] = load_manifest(app)
+    return app
+
+
+def test_build_writes_fingerprinted_copies_and_manifest(tmp_path):
+    static = make_static(tmp_path)
+    manifest = build_assets(str(static), log=lambda message: None)
+
+    css = manifest["styles.css"]["file"]
+    assert css.startswith("dist/styles.") and css.endswith(".css")
+    assert (static / css).read_text() == "body { color: #111; }\n"
+    # spaces are dropped from built names, the original path stays the key
+    assert " " not in manifest["img/Big Badge.png"]["file"]
+    assert (static / "dist" / "manifest.json").exists()
+
+    # same content -> same name; changed content -> new name
+    assert build_assets(str(static), log=lambda message: None)["styles.css"]["file"] == css
+    (static / "styles.css").write_text("body { color: #222; }\n")
+    rebuilt = build_assets(str(static), log=lambda message: None)
+    assert rebuilt["styles.css"]["file"] != css
+    assert not (static / css).exists()  # the old build is replaced
+
+
+def test_asset_url_falls_back_without_a_build():
+    app = create_test_app()
+    with app.test_request_context():
+        assert app.jinja_env.globals["asset_url"]("styles.css") == "/static/styles.css"
+        assert app.jinja_env.globals["asset_srcset"]("img/tmj-logo.png") == ""
+
+    html = app.test_client().get("/").get_data(as_text=True)
+    assert 'href="/static/styles.css"' in html
+    assert "<picture>" in html and 'src="/static/img/Home-page.png"' in html
+
+
+def test_built_assets_are_served_immutable(tmp_path):
+    static = make_static(tmp_path)
+    manifest = build_assets(str(static), log=lambda message: None)
+    app = create_test_app(static)
+    client = app.test_client()
+
+    with app.test_request_context():
+        url = app.jinja_env.globals["asset_url"]("styles.css")
+    assert url == "/static/" + manifest["styles.css"]["file"]
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.cache_control.immutable
+    assert response.cache_control.public
+    assert response.cache_control.max_age == app.config["ASSET_MAX_AGE"]
+
+    # the unhashed original and the manifest keep revalidating
+    assert not client.get("/static/styles.css").cache_control.immutable
+    assert not client.get("/static/dist/manifest.json").cache_control.immutable
+
+
+def test_image_variants_with_pillow(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    static = make_static(tmp_path)
+    out = io.BytesIO()
+    Image.new("RGB", (800, 400), (120, 60, 200)).save(out, format="PNG")
+    (static / "img" / "hero.png").write_bytes(out.getvalue())
+
+    manifest = build_assets(str(static), widths=(200, 400, 1600), log=lambda message: None)
+    entry = manifest["img/hero.png"]
+    assert (entry["width"], entry["height"]) == (800, 400)
+    widths = [w for w, _ in entry["variants"]["image/webp"]]
+    assert widths == [200, 400, 800]  # never upscaled past the original
+
+    app = create_test_app(static)
+    with app.test_request_context():
+        srcset = app.jinja_env.globals["asset_srcset"]("img/hero.png")
+    assert srcset.count("w, ") == 2 and srcset.endswith(" 800w")
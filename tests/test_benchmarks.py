@@ -0,0 +1,41 @@
+# tests/test_benchmarks.py
+
+import os
+import sys
+
+# Make sure Python can find the 'app' and 'benchmarks' packages
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import create_app
+from benchmarks.dataset import Scale, seed_dataset
+from benchmarks.harness import benchmark_config, compare_to_baseline, run_scenario
+
+
+def test_benchmark_harness_smoke(tmp_path):
+    """
+    Tiny end-to-end run of the benchmark harness: seeds a dataset,
+    drives two scenarios with 2 threads and reports sane numbers.
+    """
+    app = create_app(benchmark_config(f"sqlite:///{tmp_path / 'bench.db'}"))
+    with app.app_context():
+        course_ids = seed_dataset(Scale(users=3, courses=4, modules=3, notes=2))
+
+    assert sorted(course_ids) == ["bench1", "bench2", "bench3"]
+
+    results = {
+        name: run_scenario(app, name, course_ids, requests=3, concurrency=2)
+        for name in ("dashboard", "course_detail")
+    }
+    for result in results.values():
+        assert result["requests"] == 6
+        assert result["errors"] == 0
+        assert result["p99_ms"] >= result["p50_ms"] > 0
+
+    # a query-count increase is always reported as a regression
+    baseline = {
+        name: {"max_queries": r["max_queries"] - 1, "p95_ms": 1e9, "throughput_rps": 0}
+        for name, r in results.items()
+        if r["max_queries"]
+    }
+    assert compare_to_baseline(results, baseline)
+    assert compare_to_baseline(results, {}) == []
@@ -0,0 +1,77 @@
+# tests/test_cache.py
+
+import os
+import sys
+import threading
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.cache import NullCache, TTLCache, UserCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now the most recently used
+    cache.set("c", 3)           # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    clock.now = 11
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_user_cache_counts_hits_and_misses():
+    cache = UserCache(TTLCache())
+    builds = []
+
+    def build():
+        builds.append(1)
+        return ["card"]
+
+    assert cache.get_or_build(1, build) == ["card"]
+    assert cache.get_or_build(1, build) == ["card"]
+    cache.invalidate(1)
+    cache.get_or_build(1, build)
+
+    assert len(builds) == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+    disabled = UserCache(NullCache())
+    disabled.get_or_build(1, build)
+    assert disabled.stats()["size"] == 0
+
+
+def test_user_cache_counters_are_exact_across_threads():
+    cache = UserCache(TTLCache())
+    cache.set(1, ["card"])
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+    try:
+        threads = [
+            threading.Thread(target=lambda: [cache.get(n % 2) for n in range(5000)])
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (8 * 2500, 8 * 2500)
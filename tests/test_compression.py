@@ -0,0 +1,178 @@
+# tests/test_compression.py
+
+import gzip
+import os
+import shutil
+import sys
+
+import pytest
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.assets import build_assets, load_manifest
+from app.models import User
+
+STATIC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "static")
+
+
+def create_test_app(static_dir=None, **settings):
+    app = create_app("testing")
+    app.config.update(settings)
+    if static_dir is not None:
+        app.static_folder = str(static_dir)
+        app.extensions["assets"] = load_manifest(app)
+    with app.app_context():
+        db.create_all()
+        user = User(username="student1", email="student1@example.com")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.commit()
+    return app
+
+
+def built_static(tmp_path):
+    static = tmp_path / "static"
+    shutil.copytree(STATIC, static, ignore=shutil.ignore_patterns("dist"))
+    return static, build_assets(str(static), log=lambda message: None)
+
+
+def test_html_is_gzipped_when_the_client_accepts_it():
+    app = create_test_app()
+    client = app.test_client()
+
+    plain = client.get("/auth/login")
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    packed = client.get("/auth/login", headers={"Accept-Encoding": "gzip, deflate"})
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert int(packed.headers["Content-Length"]) == len(packed.data) < len(plain.data)
+    assert gzip.decompress(packed.data) == plain.data
+
+    # nothing acceptable offered -> identity
+    other = client.get("/auth/login", headers={"Accept-Encoding": "gzip;q=0, zstd"})
+    assert "Content-Encoding" not in other.headers
+
+
+def test_pages_with_a_csrf_token_are_not_compressed():
+    app = create_test_app(WTF_CSRF_ENABLED=True)
+    client = app.test_client()
+    headers = {"Accept-Encoding": "gzip"}
+
+    login = client.get("/auth/login", headers=headers)
+    assert b'name="csrf_token"' in login.data
+    assert "Content-Encoding" not in login.headers
+
+    failed = client.post("/auth/login", headers=headers,
+                         data={"username": "guess", "password": "x"})
+    assert "Content-Encoding" not in failed.headers
+
+    home = client.get("/", headers=headers)  # no form: still compressed
+    assert b"csrf_token" not in gzip.decompress(home.data)
+    assert home.headers["Content-Encoding"] == "gzip"
+
+
+def test_small_and_streamed_responses_are_not_compressed():
+    app = create_test_app(COMPRESS_MIN_SIZE=10**6, API_TOKEN="secret")
+    client = app.test_client()
+    headers = {"Accept-Encoding": "gzip"}
+
+    assert "Content-Encoding" not in client.get("/auth/login", headers=headers).headers
+
+    headers["Authorization"] = "Bearer secret"
+    export = client.get("/api/export/progress", headers=headers)
+    assert export.is_streamed and "Content-Encoding" not in export.headers
+
+
+def test_compressed_api_keeps_conditional_requests_working():
+    app = create_test_app(COMPRESS_MIN_SIZE=0)
+    client = app.test_client()
+    client.post("/auth/login", data={"username": "student1", "password": "password123"})
+    headers = {"Accept-Encoding": "gzip"}
+
+    first = client.get("/api/me", headers=headers)
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert first.headers["ETag"].startswith('W/"')
+
+    again = client.get(
+        "/api/me", headers={**headers, "If-None-Match": first.headers["ETag"]}
+    )
+    assert again.status_code == 304
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+
+def test_precompressed_static_copy_is_picked_by_accept_encoding(tmp_path):
+    static, manifest = built_static(tmp_path)
+    entry = manifest["styles.css"]
+    assert "gzip" in entry["encodings"]
+    assert (static / (entry["file"] + ".gz")).exists()
+    # media is never precompressed
+    assert "encodings" not in manifest["video/login-hero.mp4"]
+
+    app = create_test_app(static)
+    client = app.test_client()
+    url = "/static/" + entry["file"]
+
+    plain = client.get(url)
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    packed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert packed.mimetype == "text/css"
+    assert packed.cache_control.immutable
+    assert gzip.decompress(packed.data) == plain.data
+
+    revalidated = client.get(
+        url, headers={"Accept-Encoding": "gzip", "If-None-Match": packed.headers["ETag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.parametrize("built", [False, True])
+def test_video_supports_ranges_and_conditional_requests(tmp_path, built):
+    if built:
+        static, manifest = built_static(tmp_path)
+        app = create_test_app(static)
+        url = "/static/" + manifest["video/login-hero.mp4"]["file"]
+    else:
+        app = create_test_app()
+        url = "/static/video/login-hero.mp4"
+    client = app.test_client()
+    headers = {"Accept-Encoding": "gzip, br"}
+
+    full = client.get(url, headers=headers)
+    size = len(full.data)
+    assert full.headers["Accept-Ranges"] == "bytes"
+    assert "Content-Encoding" not in full.headers  # mp4 is sent as is
+
+    part = client.get(url, headers={**headers, "Range": "bytes=1000-1999"})
+    assert part.status_code == 206
+    assert part.headers["Content-Range"] == f"bytes 1000-1999/{size}"
+    assert part.data == full.data[1000:2000]
+
+    tail = client.get(url, headers={**headers, "Range": "bytes=-100"})
+    assert tail.status_code == 206 and tail.data == full.data[-100:]
+
+    assert client.get(url, headers={"Range": f"bytes={size}-"}).status_code == 416
+
+    etag = full.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # If-Range: a matching validator resumes, a stale one restarts
+    resumed = client.get(url, headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert resumed.status_code == 206
+    restarted = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert restarted.status_code == 200 and len(restarted.data) == size
+
+
+def test_brotli_is_preferred_when_installed():
+    brotli = pytest.importorskip("brotli")
+    app = create_test_app()
+    response = app.test_client().get(
+        "/auth/login", headers={"Accept-Encoding": "gzip, br"}
+    )
+    assert response.headers["Content-Encoding"] == "br"
+    assert b"Welcome Back" in brotli.decompress(response.data)
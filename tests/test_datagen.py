@@ -0,0 +1,102 @@
+# tests/test_datagen.py
+
+import os
+import sys
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.datagen import generate_dataset
+from app.models import Course, ModuleNote, ModuleProgress, User
+from app.progress import rebuild_course_aggregates
+
+
+def create_test_app():
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def snapshot():
+    """Everything the generator wrote, minus ids."""
+    return (
+        db.session.execute(
+            db.select(User.username, User.streak_days).order_by(User.id)
+        ).all(),
+        db.session.execute(
+            db.select(ModuleProgress.course_id, ModuleProgress.percent_complete)
+            .order_by(ModuleProgress.id)
+        ).all(),
+        db.session.execute(db.select(ModuleNote.content).order_by(ModuleNote.id)).all(),
+    )
+
+
+def test_generator_is_deterministic_and_chunk_size_independent():
+    app = create_test_app()
+    with app.app_context():
+        chunks = []
+        counts = generate_dataset(
+            7, courses_per_user=3, modules_per_course=4, notes_per_user=2,
+            seed=5, chunk_size=10, progress=lambda *args: chunks.append(args),
+        )
+        first = snapshot()
+
+        assert counts["user"] == 7
+        assert counts["course"] == 21
+        assert counts["module_progress"] == 84
+        assert counts["module_note"] == 14
+        assert len(chunks) > 2  # bounded batches, each reported
+        assert chunks[-1][:2] == (7, 7)
+
+        generate_dataset(7, courses_per_user=3, modules_per_course=4,
+                         notes_per_user=2, seed=5, chunk_size=1000, reset=True)
+        assert snapshot() == first
+
+
+def test_generator_appends_and_writes_consistent_aggregates():
+    app = create_test_app()
+    with app.app_context():
+        generate_dataset(3, courses_per_user=2, modules_per_course=3, seed=1)
+        counts = generate_dataset(2, courses_per_user=2, modules_per_course=3, seed=2)
+        assert counts["first_user_id"] == 4
+        assert db.session.query(User).count() == 5
+
+        before = db.session.execute(
+            db.select(Course.id, Course.percent_sum, Course.completed_module_count,
+                      Course.progress_percent).order_by(Course.id)
+        ).all()
+        rebuild_course_aggregates()
+        db.session.commit()
+        after = db.session.execute(
+            db.select(Course.id, Course.percent_sum, Course.completed_module_count,
+                      Course.progress_percent).order_by(Course.id)
+        ).all()
+        assert before == after
+
+
+def test_generated_users_get_their_reminder_flags():
+    from datetime import date, timedelta
+
+    from app.reminders import REMINDER_AFTER_DAYS
+
+    app = create_test_app()
+    with app.app_context():
+        generate_dataset(40, courses_per_user=1, modules_per_course=1, seed=3)
+        cutoff = date.today() - timedelta(days=REMINDER_AFTER_DAYS)
+        rows = db.session.execute(db.select(User.last_active_date, User.reminder_due)).all()
+        assert any(due for _, due in rows) and not all(due for _, due in rows)
+        assert all(due == (last_active <= cutoff) for last_active, due in rows)
+
+
+def test_seed_synthetic_cli():
+    app = create_test_app()
+    result = app.test_cli_runner().invoke(
+        args=["seed-synthetic", "--users", "4", "--courses-per-user", "2",
+              "--modules-per-course", "2", "--chunk-size", "5"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "4/4 users" in result.output
+    with app.app_context():
+        assert db.session.query(ModuleProgress).count() == 16
@@ -0,0 +1,65 @@
+# tests/test_export.py
+
+import csv
+import io
+import json
+import os
+import sys
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.datagen import generate_dataset
+from app.export import export_chunks
+
+
+def create_test_app():
+    app = create_app("testing")
+    app.config["API_TOKEN"] = "report-secret"
+    with app.app_context():
+        db.create_all()
+        generate_dataset(3, courses_per_user=2, modules_per_course=2, notes_per_user=1)
+    return app
+
+
+def test_export_endpoint_streams_csv_and_ndjson():
+    app = create_test_app()
+    client = app.test_client()
+    auth = {"Authorization": "Bearer report-secret"}
+
+    assert client.get("/api/export/progress").status_code == 401
+    assert client.get("/api/export/grades", headers=auth).status_code == 404
+
+    response = client.get("/api/export/progress", headers=auth)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "text/csv"
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 12
+    assert rows[0]["username"] == "synth1"
+    assert rows[0]["module_name"] == "Module 1"
+
+    response = client.get("/api/export/notes?format=ndjson", headers=auth)
+    notes = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [note["user_id"] for note in notes] == [1, 2, 3]
+    assert notes[0]["content"]
+    assert notes[0]["created_at"]  # ISO date string
+
+
+def test_export_is_sent_in_batches():
+    app = create_test_app()
+    with app.app_context():
+        chunks = list(export_chunks("progress", "csv", batch_size=5))
+    assert len(chunks) == 3  # 12 rows in batches of 5 (header rides on the first)
+    assert "".join(chunks).count("\n") == 13
+
+
+def test_export_cli_writes_file(tmp_path):
+    app = create_test_app()
+    target = tmp_path / "notes.ndjson"
+    result = app.test_cli_runner().invoke(
+        args=["export-data", "notes", "--format", "ndjson", "-o", str(target)]
+    )
+    assert result.exit_code == 0, result.output
+    assert len(target.read_text().splitlines()) == 3
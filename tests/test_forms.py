@@ -11,10 +11,8 @@ from app.forms import LoginForm
 
 
 def create_test_app():
-    app = create_app()
-    app.config["TESTING"] = True
-    app.config["WTF_CSRF_ENABLED"] = False  # disable CSRF for tests
-    return app
+    # TestingConfig: in-memory database, CSRF off
+    return create_app("testing")
 
 
 def test_login_form_valid_data():
@@ -0,0 +1,148 @@
+# tests/test_ingest.py
+
+import json
+import os
+import sys
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.models import Course, ModuleProgress, User
+
+
+def create_test_app():
+    app = create_app("testing")
+    app.config["API_TOKEN"] = "sync-secret"
+    with app.app_context():
+        db.create_all()
+        user = User(username="alice", email="alice@example.com")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Course(user_id=user.id, title="Python"))
+        db.session.add(ModuleProgress(user_id=user.id, course_id=1,
+                                      module_name="Loops", percent_complete=20))
+        db.session.commit()
+    return app
+
+
+def ndjson(*records):
+    return "\n".join(json.dumps(r) for r in records) + "\n"
+
+
+def test_ingest_endpoint_upserts_and_recomputes_course():
+    app = create_test_app()
+    client = app.test_client()
+    body = ndjson(
+        {"user": "alice", "course": 1, "module_name": "Loops", "percent": 100},
+        {"user": 1, "course": "Python", "module_name": "Functions", "percent": 100},
+        {"user": "alice", "course": 1, "module_name": "Functions", "percent": 100},
+        {"user": "bob", "course": 1, "module_name": "Loops", "percent": 50},
+        {"user": "alice", "course": 1, "module_name": "Loops", "percent": 150},
+    ) + "not json\n"
+
+    assert client.post("/api/progress", data=body).status_code == 401
+
+    response = client.post(
+        "/api/progress",
+        data=body,
+        headers={"Authorization": "Bearer sync-secret"},
+        content_type="application/x-ndjson",
+    )
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report["records"] == 6
+    assert (report["inserted"], report["updated"], report["rejected"]) == (1, 1, 3)
+    assert report["courses"] == 1
+    assert any("unknown user 'bob'" in error for error in report["errors"])
+
+    with app.app_context():
+        course = db.session.get(Course, 1)
+        assert course.module_count == 2
+        assert course.progress_percent == 100
+        assert course.completed_at is not None
+
+
+def test_digit_names_are_names_not_ids():
+    app = create_test_app()
+    with app.app_context():
+        user = User(username="2024", email="2024@example.com")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Course(user_id=user.id, title="101"))
+        db.session.commit()
+
+    body = ndjson(
+        {"user": "2024", "course": "101", "module_name": "Loops", "percent": 50},
+        {"user": "1", "course": "Python", "module_name": "Loops", "percent": 50},
+        {"user_id": "1", "course_id": 1, "module_name": "Classes", "percent": 10},
+        {"user_id": "alice", "course": "Python", "module_name": "Files", "percent": 10},
+    )
+    report = app.test_client().post(
+        "/api/progress", data=body, headers={"Authorization": "Bearer sync-secret"}
+    ).get_json()
+    assert (report["inserted"], report["rejected"]) == (2, 2)
+    assert sorted(report["errors"]) == [
+        "line 2: unknown user '1'",
+        "line 4: user_id 'alice' is not an id",
+    ]
+
+    with app.app_context():
+        course = Course.query.filter_by(title="101").one()
+        assert course.user.username == "2024" and course.module_count == 1
+        assert db.session.get(Course, 1).module_count == 2  # Loops + Classes
+
+
+def test_upsert_never_duplicates_a_row_written_since_the_lookup():
+    from app.ingest import _upsert_progress
+
+    app = create_test_app()
+    with app.app_context():
+        # another run inserted "Loops" (20%) after this chunk looked it up
+        row = {"user_id": 1, "course_id": 1, "module_name": "Loops", "percent_complete": 90}
+        _upsert_progress([row], [])
+        db.session.commit()
+        rows = ModuleProgress.query.filter_by(course_id=1, module_name="Loops").all()
+        assert [r.percent_complete for r in rows] == [90]
+
+
+def test_non_finite_percent_is_rejected_not_a_server_error():
+    app = create_test_app()
+    body = ndjson(
+        {"user": "alice", "course": 1, "module_name": "Loops", "percent": "inf"},
+        {"user": "alice", "course": 1, "module_name": "Loops", "percent": "-Infinity"},
+        {"user": "alice", "course": 1, "module_name": "Loops", "percent": float("inf")},
+        {"user": "alice", "course": 1, "module_name": "Loops", "percent": float("nan")},
+        {"user": "alice", "course": 1, "module_name": "Loops", "percent": 60},
+    )  # json.dumps writes the floats as Infinity / NaN literals
+    response = app.test_client().post(
+        "/api/progress", data=body, headers={"Authorization": "Bearer sync-secret"}
+    )
+    assert response.status_code == 200
+    report = response.get_json()
+    assert (report["updated"], report["rejected"]) == (1, 4)
+    assert all("is not a number" in error for error in report["errors"])
+
+
+def test_ingest_cli_reads_csv_in_chunks(tmp_path):
+    app = create_test_app()
+    source = tmp_path / "export.csv"
+    source.write_text(
+        "user,course_id,module_name,percent\n"
+        "alice,1,Loops,20\n"
+        "alice,1,Classes,40\n"
+        "alice,1,Files,0\n"
+    )
+
+    result = app.test_cli_runner().invoke(
+        args=["ingest-progress", str(source), "--chunk-size", "2"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "2 inserted, 0 updated, 1 unchanged, 0 rejected" in result.output
+
+    with app.app_context():
+        course = db.session.get(Course, 1)
+        assert (course.module_count, course.percent_sum) == (3, 60)
+        assert course.progress_percent == 20
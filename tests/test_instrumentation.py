@@ -0,0 +1,93 @@
+# tests/test_instrumentation.py
+
+import os
+import sys
+
+from flask import g
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.instrumentation import EndpointMetrics, percentile
+from app.models import User
+
+
+def create_test_app():
+    app = create_app("testing")
+    app.config["INSTRUMENTATION_ENABLED"] = True
+    app.config["ADMIN_USERNAMES"] = {"admin"}
+    with app.app_context():
+        db.create_all()
+        for username in ("admin", "student1"):
+            user = User(username=username)
+            user.set_password("password123")
+            db.session.add(user)
+        db.session.commit()
+    return app
+
+
+def login(client, username):
+    client.post(
+        "/auth/login",
+        data={"username": username, "password": "password123"},
+    )
+
+
+def test_server_timing_header_reports_time_and_queries():
+    app = create_test_app()
+    client = app.test_client()
+    login(client, "student1")
+
+    response = client.get("/feature")
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("app;dur=")
+    assert 'queries"' in timing
+
+
+def test_failed_statement_does_not_skew_later_timings():
+    app = create_test_app()
+    with app.test_request_context("/"):
+        app.preprocess_request()  # starts the request timer
+        try:
+            db.session.execute(db.text("SELECT * FROM no_such_table"))
+        except Exception:
+            db.session.rollback()
+        db.session.execute(db.text("SELECT 1"))
+        assert g.sql_queries == 1
+        with db.engine.connect() as conn:
+            assert "query_start_time" not in conn.info
+
+
+def test_metrics_endpoint_is_admin_only():
+    app = create_test_app()
+    client = app.test_client()
+
+    # anonymous -> login page, non-admin -> 403
+    assert client.get("/admin/metrics").status_code == 302
+    login(client, "student1")
+    assert client.get("/admin/metrics").status_code == 403
+    client.get("/auth/logout")
+
+    login(client, "admin")
+    client.get("/feature")
+    data = client.get("/admin/metrics").get_json()
+
+    assert data["instrumentation_enabled"] is True
+    assert data["endpoints"]["main.feature"]["count"] == 1
+    assert "p99_ms" in data["endpoints"]["main.feature"]
+    assert "hits" in data["caches"]["dashboard"]
+    assert "default" in data["pools"]
+
+
+def test_rolling_percentiles():
+    metrics = EndpointMetrics(window=100)
+    for ms in range(1, 201):  # only the last 100 (101..200) are kept
+        metrics.record("main.feature", float(ms), 2, 0.5)
+
+    summary = metrics.summary()["main.feature"]
+    assert summary["count"] == 200
+    assert summary["window"] == 100
+    assert summary["p50_ms"] == 150
+    assert summary["p99_ms"] == 199
+    assert percentile([], 50) == 0.0
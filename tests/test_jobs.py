@@ -0,0 +1,128 @@
+# tests/test_jobs.py
+
+import os
+import sys
+import threading
+from datetime import date, timedelta
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.badges import award_completion_badges
+from app.jobs import JobQueue, _handlers, _running, job_handler
+from app.models import Badge, Course, ModuleProgress, User
+from app.progress import rebuild_course_aggregates
+from app.reminders import refresh_reminders, reminder_message
+
+
+def create_test_app():
+    # TestingConfig: JOB_WORKERS = 0, jobs run right after the commit
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        user = User(username="alice", email="alice@example.com")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.add(Course(user=user, title="Python"))
+        db.session.commit()
+    return app
+
+
+def test_completing_a_course_awards_a_badge_after_commit():
+    app = create_test_app()
+    with app.app_context():
+        row = ModuleProgress(user_id=1, course_id=1, module_name="Loops", percent_complete=100)
+        db.session.add(row)
+        db.session.flush()
+        db.session.rollback()
+        assert db.session.query(Badge).count() == 0  # rolled back: no job
+
+        db.session.add(ModuleProgress(user_id=1, course_id=1, module_name="Loops",
+                                      percent_complete=100))
+        db.session.commit()
+        badge = db.session.query(Badge).one()
+        assert (badge.user_id, badge.course_id, badge.kind) == (1, 1, "course-complete")
+
+        # a bulk rebuild that finds the course completed again adds nothing
+        db.session.get(Course, 1).completed_at = None
+        db.session.commit()
+        rebuild_course_aggregates([1])
+        db.session.commit()
+        assert db.session.query(Badge).count() == 1
+
+
+def test_course_page_shows_the_awarded_badge():
+    app = create_test_app()
+    client = app.test_client()
+    client.post("/auth/login", data={"username": "alice", "password": "pw"})
+    with app.app_context():
+        db.session.add(ModuleProgress(user_id=1, course_id=1, module_name="Loops",
+                                      percent_complete=100))
+        db.session.commit()
+        badge = db.session.query(Badge).one()
+        db.session.delete(badge)
+        db.session.commit()  # completed, badge not awarded (yet)
+
+    html = client.get("/courses/1").get_data(as_text=True)
+    assert "Course completed!" in html and "Badge earned" not in html
+    assert "completion-badge-image" not in html
+
+    with app.app_context():
+        assert award_completion_badges([{"course_id": 1, "user_id": 1}]) == 1
+
+    html = client.get("/courses/1").get_data(as_text=True)
+    assert "Badge earned on" in html and "completion-badge-image" in html
+
+
+def test_worker_threads_run_jobs_in_batches():
+    app = create_test_app()
+    batches, lock = [], threading.Lock()
+
+    @job_handler("test_collect")
+    def collect(payloads):
+        with lock:
+            batches.append(list(payloads))
+
+    try:
+        jobs = JobQueue(app, workers=2, batch_size=10, batch_wait=0.2)
+        for n in range(40):
+            jobs.enqueue("test_collect", n)
+        jobs.join()
+        jobs.shutdown()
+    finally:
+        _handlers.pop("test_collect")
+
+    assert sorted(n for batch in batches for n in batch) == list(range(40))
+    assert len(batches) < 40
+    assert all(len(batch) <= 10 for batch in batches)
+    stats = jobs.stats()
+    assert (stats["processed"], stats["failed"], stats["pending"]) == (40, 0, 0)
+    assert jobs not in _running  # shut down: nothing left for the exit hook
+
+
+def test_apps_do_not_pile_up_exit_hooks():
+    before = len(_running)
+    for _ in range(3):
+        create_app("testing")
+    assert len(_running) == before  # threads (and the exit hook) start on use
+
+
+def test_reminder_flag_is_precomputed_and_cleared_on_login():
+    app = create_test_app()
+    with app.app_context():
+        user = db.session.get(User, 1)
+        user.last_active_date = date.today() - timedelta(days=5)
+        db.session.commit()
+
+        assert reminder_message(user) is None  # not computed yet
+        assert refresh_reminders() == 1
+        user = db.session.get(User, 1)
+        assert user.reminder_due
+        assert "5 days" in reminder_message(user)
+        assert refresh_reminders() == 0  # nothing to rewrite
+
+    client = app.test_client()
+    client.post("/auth/login", data={"username": "alice", "password": "pw"})
+    with app.app_context():
+        assert db.session.get(User, 1).reminder_due is False
@@ -7,14 +7,14 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from app import create_app, db
-from app.models import User, Course, ModuleProgress, ModuleNote
+from app.models import User, Course, Module, ModuleProgress, ModuleNote
+from app.progress import rebuild_course_aggregates
+from app.schema import upgrade_schema
 
 
 def create_test_app():
-    app = create_app()
-    app.config["TESTING"] = True
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
-    return app
+    # TestingConfig: in-memory database, CSRF off
+    return create_app("testing")
 
 
 def test_create_user():
@@ -108,3 +108,278 @@ def test_module_progress_and_note():
         fetched_note = ModuleNote.query.filter_by(user_id=user.id).first()
         assert fetched_note is not None
         assert "Remember to plan" in fetched_note.content
+
+
+def test_course_progress_follows_module_progress_writes():
+    """
+    Course.progress_percent and completed_at are updated when
+    ModuleProgress rows are written (not when pages are viewed).
+    """
+    app = create_test_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        user = User(username="writer")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.commit()
+
+        course = Course(user_id=user.id, title="Mindfulness for Students")
+        db.session.add(course)
+        db.session.commit()
+
+        first = ModuleProgress(user_id=user.id, course_id=course.id,
+                               module_name="Breathing", percent_complete=100)
+        second = ModuleProgress(user_id=user.id, course_id=course.id,
+                                module_name="Meditation", percent_complete=50)
+        db.session.add_all([first, second])
+        db.session.commit()
+
+        assert course.progress_percent == 75
+        assert course.completed_at is None
+
+        second.percent_complete = 100
+        db.session.commit()
+
+        assert course.progress_percent == 100
+        assert course.completed_at is not None
+
+        db.session.delete(second)
+        db.session.commit()
+        assert course.progress_percent == 100
+        assert course.module_count == 1
+        assert course.status == "completed"
+
+
+def test_concurrent_writers_to_one_course_both_count():
+    """Totals are SQL increments: a stale Course object cannot undo another write."""
+    app = create_test_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username="racer")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Course(user_id=user.id, title="Shared"))
+        db.session.commit()
+
+        # writer A has the course loaded (module_count 0) ...
+        db.session().expire_on_commit = False
+        stale = db.session.get(Course, 1)
+        db.session.commit()
+        assert stale.module_count == 0
+
+        # ... while writer B adds a finished module and commits
+        with app.app_context():
+            db.session.add(ModuleProgress(user_id=1, course_id=1,
+                                          module_name="B", percent_complete=100))
+            db.session.commit()
+
+        db.session.add(ModuleProgress(user_id=1, course_id=1,
+                                      module_name="A", percent_complete=0))
+        db.session.commit()
+        assert (stale.module_count, stale.percent_sum) == (2, 100)
+        assert (stale.completed_module_count, stale.started_module_count) == (1, 1)
+        assert stale.progress_percent == 50
+
+        db.session.expire_all()
+        stored = db.session.get(Course, 1)
+        assert (stored.module_count, stored.percent_sum, stored.progress_percent) == (2, 100, 50)
+
+
+def test_moving_a_row_through_the_relationship_moves_its_totals():
+    app = create_test_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        user = User(username="mover")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        old = Course(user_id=user.id, title="Old")
+        new = Course(user_id=user.id, title="New")
+        db.session.add_all([old, new])
+        db.session.flush()
+        row = ModuleProgress(user_id=user.id, course_id=old.id,
+                             module_name="Loops", percent_complete=100)
+        db.session.add(row)
+        db.session.commit()
+        assert (old.module_count, new.module_count) == (1, 0)
+
+        row.course = new  # relationship only; course_id is still old.id
+        db.session.commit()
+        assert row.course_id == new.id
+        assert (old.module_count, old.percent_sum) == (0, 0)
+        assert (new.module_count, new.percent_sum, new.progress_percent) == (1, 100, 100)
+
+        # a Course that is not flushed yet
+        newest = Course(user_id=user.id, title="Newest")
+        row.course = newest
+        db.session.commit()
+        assert new.module_count == 0
+        assert (newest.module_count, newest.percent_sum) == (1, 100)
+
+
+def test_rebuild_course_aggregates_matches_rows():
+    """
+    rebuild_course_aggregates() recomputes the course totals from the
+    module_progress table (used for old databases and bulk writes).
+    """
+    app = create_test_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        user = User(username="rebuilder")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        course = Course(user_id=user.id, title="Effective Note-Taking")
+        db.session.add(course)
+        db.session.flush()
+        db.session.add_all(
+            [
+                ModuleProgress(user_id=user.id, course_id=course.id,
+                               module_name="Cornell", percent_complete=100),
+                ModuleProgress(user_id=user.id, course_id=course.id,
+                               module_name="Mind Maps", percent_complete=60),
+            ]
+        )
+        db.session.commit()
+
+        # wipe the totals behind the ORM's back, then rebuild them
+        db.session.execute(
+            db.update(Course).values(
+                module_count=0, percent_sum=0, completed_module_count=0,
+                started_module_count=0, progress_percent=0,
+            )
+        )
+        rebuild_course_aggregates()
+        db.session.commit()
+
+        assert course.module_count == 2
+        assert course.percent_sum == 160
+        assert course.progress_percent == 80
+        assert Course.query.filter(Course.status == "in-progress").count() == 1
+
+
+# Tables as they were created before the progress totals + indexes
+LEGACY_SCHEMA = [
+    """CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(64) NOT NULL UNIQUE,
+       email VARCHAR(120) UNIQUE, password_hash VARCHAR(256) NOT NULL,
+       streak_days INTEGER, last_active_date DATE)""",
+    """CREATE TABLE course (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES user(id),
+       title VARCHAR(128) NOT NULL, progress_percent INTEGER, completed_at DATE)""",
+    """CREATE TABLE module (id INTEGER PRIMARY KEY, course_id INTEGER NOT NULL REFERENCES course(id),
+       title VARCHAR(128) NOT NULL, order_index INTEGER, is_completed BOOLEAN)""",
+    """CREATE TABLE module_note (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES user(id),
+       module_id INTEGER NOT NULL REFERENCES module(id), content TEXT, created_at DATE)""",
+    """CREATE TABLE module_progress (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES user(id),
+       course_id INTEGER NOT NULL REFERENCES course(id), module_name VARCHAR(128) NOT NULL,
+       percent_complete INTEGER)""",
+]
+
+
+def test_upgrade_schema_migrates_legacy_database():
+    """
+    upgrade_schema() adds the new columns + indexes to an old database,
+    removes duplicate notes and backfills the course totals.
+    """
+    app = create_test_app()
+    with app.app_context():
+        db.drop_all()
+        with db.engine.begin() as conn:
+            for ddl in LEGACY_SCHEMA:
+                conn.exec_driver_sql(ddl)
+            conn.exec_driver_sql("INSERT INTO user VALUES (1, 'old', NULL, 'x', 0, NULL)")
+            conn.exec_driver_sql("INSERT INTO course VALUES (1, 1, 'Intro to Python', 0, NULL)")
+            conn.exec_driver_sql("INSERT INTO module VALUES (1, 1, 'Getting Started', 1, 0)")
+            conn.exec_driver_sql("INSERT INTO module_note VALUES (1, 1, 1, 'old', NULL)")
+            conn.exec_driver_sql("INSERT INTO module_note VALUES (2, 1, 1, 'new', NULL)")
+            conn.exec_driver_sql("INSERT INTO module_progress VALUES (1, 1, 1, 'A', 100)")
+            conn.exec_driver_sql("INSERT INTO module_progress VALUES (2, 1, 1, 'B', 50)")
+
+        changes = upgrade_schema(log=lambda message: None)
+        assert "created index uq_module_note_user_module" in changes
+        assert "added column user.reminder_due" in changes
+
+        course = db.session.get(Course, 1)
+        assert course.module_count == 2
+        assert course.progress_percent == 75
+        assert [n.content for n in ModuleNote.query.all()] == ["new"]
+
+        # running it again is a no-op
+        assert upgrade_schema(log=lambda message: None) == []
+
+
+def _query_plan(statement):
+    """EXPLAIN QUERY PLAN rows (detail text) for a SQLAlchemy statement."""
+    sql = str(statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    rows = db.session.execute(db.text("EXPLAIN QUERY PLAN " + sql)).all()
+    return [row[-1] for row in rows]
+
+
+def test_upgrade_schema_removes_duplicate_progress_rows():
+    app = create_test_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username="dupes")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Course(user_id=user.id, title="Twice"))
+        db.session.commit()
+
+        # an old database: no unique key, the same module written twice
+        db.session.execute(db.text("DROP INDEX uq_module_progress_user_course_module"))
+        for percent in (40, 100):
+            db.session.execute(db.text(
+                "INSERT INTO module_progress (user_id, course_id, module_name, percent_complete)"
+                f" VALUES (1, 1, 'Loops', {percent})"
+            ))
+        db.session.commit()
+        rebuild_course_aggregates()
+        db.session.commit()
+        assert db.session.get(Course, 1).module_count == 2
+
+        changes = upgrade_schema(log=lambda message: None)
+        assert "created index uq_module_progress_user_course_module" in changes
+        assert [r.percent_complete for r in ModuleProgress.query] == [100]  # newest kept
+        course = db.session.get(Course, 1)
+        assert (course.module_count, course.progress_percent) == (1, 100)
+
+
+def test_hot_queries_use_indexes():
+    """
+    The dashboard and course detail lookups SEARCH an index instead of
+    SCANning module_progress / module_note / course / module.
+    """
+    app = create_test_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        course_ids = db.select(Course.id).where(Course.user_id == 1)
+        statements = [
+            # /feature
+            db.select(Course).where(Course.user_id == 1).order_by(Course.id),
+            db.select(ModuleProgress)
+            .where(ModuleProgress.course_id.in_(course_ids), ModuleProgress.user_id == 1)
+            .order_by(ModuleProgress.id),
+            # /courses/<id>
+            db.select(Module).where(Module.course_id == 1).order_by(Module.order_index),
+            db.select(ModuleNote).where(ModuleNote.user_id == 1, ModuleNote.module_id == 1),
+            db.select(ModuleProgress)
+            .where(ModuleProgress.course_id == 1, ModuleProgress.user_id == 1)
+            .order_by(ModuleProgress.id),
+        ]
+
+        for statement in statements:
+            plan = " | ".join(_query_plan(statement))
+            assert "SCAN" not in plan.replace("SCAN CONSTANT ROW", ""), plan
+            assert "USING" in plan, plan
+
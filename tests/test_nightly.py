@@ -0,0 +1,61 @@
+# tests/test_nightly.py
+
+import os
+import sys
+from datetime import date, timedelta
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.cache import load_user_cached
+from app.models import User
+from app.nightly import run_nightly
+
+TODAY = date(2025, 3, 10)
+
+
+def create_test_app():
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        # (days since last activity, streak)
+        for n, (days, streak) in enumerate([(0, 4), (1, 3), (2, 7), (5, 2), (None, 1)]):
+            user = User(
+                username=f"u{n}",
+                password_hash="x",
+                streak_days=streak,
+                last_active_date=TODAY - timedelta(days=days) if days is not None else None,
+            )
+            db.session.add(user)
+        db.session.commit()
+    return app
+
+
+def test_nightly_resets_streaks_and_reminders_in_chunks():
+    app = create_test_app()
+    with app.app_context():
+        load_user_cached(4)  # cached before the batch
+
+        report = run_nightly(today=TODAY, chunk_size=2)
+        assert report["ranges"] == 3
+        assert report["streaks_reset"] == 3
+        assert report["reminders_changed"] == 1
+
+        users = db.session.scalars(db.select(User).order_by(User.id)).all()
+        assert [u.streak_days for u in users] == [4, 3, 0, 0, 0]
+        assert [u.reminder_due for u in users] == [False, False, False, True, False]
+
+        # caches were told about the bulk UPDATE
+        assert load_user_cached(4).streak_days == 0
+
+        # nothing left to change on a second run
+        again = run_nightly(today=TODAY, chunk_size=2)
+        assert (again["streaks_reset"], again["reminders_changed"]) == (0, 0)
+
+
+def test_nightly_cli():
+    app = create_test_app()
+    result = app.test_cli_runner().invoke(args=["nightly", "--date", "2025-03-10"])
+    assert result.exit_code == 0, result.output
+    assert "3 streaks reset, 1 reminder flags changed" in result.output
@@ -0,0 +1,72 @@
+# tests/test_passwords.py
+
+import os
+import sys
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models import User
+from app.passwords import LoginBusyError, PasswordVerifier
+
+
+def create_test_app():
+    # TestingConfig: in-memory database, CSRF off
+    return create_app("testing")
+
+
+def test_password_hash_uses_configured_method():
+    app = create_test_app()
+    with app.app_context():
+        user = User(username="policy")
+        user.set_password("password123")
+        assert user.password_hash.startswith("pbkdf2:sha256:1000$")
+        assert user.password_needs_rehash() is False
+
+        app.config["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:2000"
+        assert user.password_needs_rehash() is True
+
+
+def test_login_rehashes_outdated_password_hash():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user = User(
+            username="legacy",
+            password_hash=generate_password_hash("password123", "pbkdf2:sha256:500"),
+        )
+        db.session.add(user)
+        db.session.commit()
+
+    client = app.test_client()
+    response = client.post(
+        "/auth/login",
+        data={"username": "legacy", "password": "password123"},
+    )
+    assert response.status_code == 302
+
+    with app.app_context():
+        user = User.query.filter_by(username="legacy").one()
+        assert user.password_hash.startswith("pbkdf2:sha256:1000$")
+        assert user.check_password("password123")
+
+
+def test_verifier_pool_checks_passwords_and_rejects_overflow():
+    pwhash = generate_password_hash("secret", "pbkdf2:sha256:1000")
+    verifier = PasswordVerifier(workers=1, max_pending=1)
+
+    assert verifier.verify(pwhash, "secret") is True
+    assert verifier.verify(pwhash, "wrong") is False
+
+    # occupy the only slot, then a second check is refused immediately
+    verifier._slots.acquire()
+    try:
+        with pytest.raises(LoginBusyError):
+            verifier.verify(pwhash, "secret")
+    finally:
+        verifier._slots.release()
+        verifier.shutdown()
@@ -2,6 +2,9 @@
 
 import os
 import sys
+from contextlib import contextmanager
+
+from sqlalchemy import event
 
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
@@ -11,11 +14,31 @@ from app.models import User, Course, ModuleProgress
 
 
 def create_test_app():
-    app = create_app()
-    app.config["TESTING"] = True
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
-    app.config["WTF_CSRF_ENABLED"] = False  # easier POSTs in tests
-    return app
+    # TestingConfig: in-memory database, CSRF off
+    return create_app("testing")
+
+
+@contextmanager
+def count_queries(app):
+    """Count the SQL statements executed inside the `with` block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+# every logged-in request first reads the user's data_version
+# (load_user_cached); per-view query budgets leave that lookup out
+def view_queries(statements):
+    return [s for s in statements if not s.startswith("SELECT user.data_version")]
 
 
 def test_home_page():
@@ -166,3 +189,468 @@ def test_404_page_renders():
     assert resp.status_code == 404
     assert b"Page Not Found" in resp.data  # match text from your 404.html
 
+
+def _feature_query_count(course_total):
+    """
+    Log in a user owning `course_total` courses (2 modules each) and
+    return how many queries one /feature page view costs.
+    """
+    app = create_test_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        user = User(username="heavy_user")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+
+        for i in range(course_total):
+            course = Course(user_id=user.id, title=f"Course {i}")
+            db.session.add(course)
+            db.session.flush()
+            db.session.add_all(
+                [
+                    ModuleProgress(user_id=user.id, course_id=course.id,
+                                   module_name="Part 1", percent_complete=100),
+                    ModuleProgress(user_id=user.id, course_id=course.id,
+                                   module_name="Part 2", percent_complete=40),
+                ]
+            )
+        db.session.commit()
+
+    client = app.test_client()
+    client.post(
+        "/auth/login",
+        data={"username": "heavy_user", "password": "password123"},
+    )
+    # measure a view that really builds the cards (dashboard cache empty)
+    app.extensions["dashboard_cache"].backend.clear()
+
+    with count_queries(app) as statements:
+        response = client.get("/feature")
+
+    assert response.status_code == 200
+    assert b"Course 0" in response.data
+    return len(statements)
+
+
+def test_feature_query_count_does_not_grow_with_courses():
+    """
+    /feature must load courses + module progress in a fixed number of
+    queries (no N+1 fan-out per course).
+    """
+    assert _feature_query_count(2) == _feature_query_count(12)
+
+
+
+def test_dashboard_and_course_detail_do_not_write():
+    """
+    Viewing /feature and /courses/<id> is a pure read: no INSERT,
+    UPDATE or DELETE statements are sent to the database.
+    """
+    app = create_test_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        user = User(username="reader")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+
+        course = Course(user_id=user.id, title="Intro to Python")
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(
+            ModuleProgress(user_id=user.id, course_id=course.id,
+                           module_name="Getting Started", percent_complete=100)
+        )
+        db.session.commit()
+        course_id = course.id
+
+    client = app.test_client()
+    client.post(
+        "/auth/login",
+        data={"username": "reader", "password": "password123"},
+    )
+
+    with count_queries(app) as statements:
+        assert client.get("/feature").status_code == 200
+        assert client.get(f"/courses/{course_id}").status_code == 200
+
+    writes = [s for s in statements if s.split()[0].upper() in ("INSERT", "UPDATE", "DELETE")]
+    assert writes == []
+
+
+def test_dashboard_cache_hits_and_invalidates_on_progress_change():
+    """
+    The second /feature view is served from the per-user cache; a commit
+    that changes the user's ModuleProgress drops the cached cards.
+    """
+    app = create_test_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        user = User(username="cached")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        course = Course(user_id=user.id, title="Time Management Essentials")
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(
+            ModuleProgress(user_id=user.id, course_id=course.id,
+                           module_name="Time Blocking Basics", percent_complete=10)
+        )
+        db.session.commit()
+        user_id = user.id
+
+    cache = app.extensions["dashboard_cache"]
+    client = app.test_client()
+    client.post(
+        "/auth/login",
+        data={"username": "cached", "password": "password123"},
+    )
+
+    assert b"10%" in client.get("/feature").data
+    client.get("/feature")
+    assert cache.stats()["hits"] == 1
+
+    with app.app_context():
+        row = ModuleProgress.query.filter_by(user_id=user_id).one()
+        row.percent_complete = 90
+        db.session.commit()
+
+    assert b"90%" in client.get("/feature").data
+    assert cache.stats()["misses"] == 2
+
+
+def test_dashboard_cache_sees_changes_made_by_other_processes():
+    """
+    A write this worker never sees committed (another gunicorn worker,
+    flask ingest-progress, nightly, ...) still bumps user.data_version,
+    and the cached cards built for the old version are not served.
+    """
+    app = create_test_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        for name in ("student1", "elsewhere"):
+            user = User(username=name)
+            user.set_password("password123")
+            db.session.add(user)
+            db.session.flush()
+            course = Course(user_id=user.id, title="Time Management Essentials")
+            db.session.add(course)
+            db.session.flush()
+            db.session.add(
+                ModuleProgress(user_id=user.id, course_id=course.id,
+                               module_name="Time Blocking Basics", percent_complete=10)
+            )
+        db.session.commit()
+
+    def write_elsewhere(user_id):
+        # plain SQL: no ORM events, so this process's caches are not told
+        with app.app_context():
+            db.session.execute(db.text(
+                "UPDATE course SET title = 'Renamed Elsewhere', version = version + 1"
+                " WHERE user_id = :u"
+            ), {"u": user_id})
+            db.session.execute(db.text(
+                "UPDATE user SET data_version = data_version + 1 WHERE id = :u"
+            ), {"u": user_id})
+            db.session.commit()
+
+    cache = app.extensions["dashboard_cache"]
+    anonymous = app.test_client()
+    client = _login_as(app, "elsewhere")
+    assert b"Time Management" in anonymous.get("/feature").data
+    assert b"Time Management" in client.get("/feature").data
+    assert b"Time Management" in client.get("/feature").data
+    assert cache.stats()["hits"] == 1
+    dropped = cache.stats()["invalidations"]
+
+    write_elsewhere(1)
+    write_elsewhere(2)
+    assert b"Renamed Elsewhere" in anonymous.get("/feature").data  # demo snapshot too
+    assert b"Renamed Elsewhere" in client.get("/feature").data
+    assert cache.stats()["invalidations"] == dropped + 2  # both stale entries
+
+
+
+def _identity_queries(app):
+    """SQL run for an authenticated GET / (a page with no data)."""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username="identity")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.commit()
+
+    client = app.test_client()
+    client.post(
+        "/auth/login",
+        data={"username": "identity", "password": "password123"},
+    )
+    client.get("/")  # warm up
+
+    with count_queries(app) as statements:
+        response = client.get("/")
+    assert response.status_code == 200
+    assert b"Hi, identity" in response.data
+    return statements
+
+
+def test_user_loader_cache_reads_only_the_data_version():
+    """
+    Before: Flask-Login's user_loader loads the whole User row per request.
+    After:  a cached row only costs a lookup of the user's data_version.
+    """
+    from app.cache import NullCache
+
+    uncached_app = create_test_app()
+    uncached_app.extensions["identity_cache"].backend = NullCache()
+
+    assert len(_identity_queries(uncached_app)) == 2  # version, then the row
+    [statement] = _identity_queries(create_test_app())
+    assert statement.startswith("SELECT user.data_version \nFROM user")
+
+
+def test_user_loader_cache_reloads_a_changed_user():
+    app = create_test_app()
+    _identity_queries(app)
+    cache = app.extensions["identity_cache"]
+    client = _login_as(app, "identity")
+    client.get("/")
+    with app.app_context():
+        user_id = User.query.filter_by(username="identity").one().id
+    key = cache._key(user_id)
+    old_version, old_snapshot = cache.backend.get(key)
+
+    # a commit in this process drops the entry at once
+    with app.app_context():
+        db.session.get(User, user_id).streak_days = 7
+        db.session.commit()
+    assert cache.backend.get(key) is None
+    assert b"7 days" in client.get("/feature").data
+    version, snapshot = cache.backend.get(key)
+    assert version > old_version and snapshot["streak_days"] == 7
+
+    # a request that read the row before that commit stores it late
+    # (or another worker changed the user): the entry is now stale
+    cache.set(user_id, old_snapshot, old_version)
+    misses = cache.stats()["misses"]
+    assert b"7 days" in client.get("/feature").data
+    assert cache.stats()["misses"] == misses + 1
+    assert cache.backend.get(key)[0] == version  # reloaded, filed under the current version
+
+
+def _login_as(app, username):
+    client = app.test_client()
+    client.post("/auth/login", data={"username": username, "password": "password123"})
+    return client
+
+
+def test_login_streak_update_is_one_conditional_update():
+    """
+    Yesterday -> +1 in a single UPDATE; a second login the same day
+    issues no UPDATE at all.
+    """
+    from datetime import date, timedelta
+
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username="streaky", email="streaky@example.com")
+        user.set_password("password123")
+        user.streak_days = 4
+        user.last_active_date = date.today() - timedelta(days=1)
+        db.session.add(user)
+        db.session.commit()
+
+    with count_queries(app) as statements:
+        _login_as(app, "streaky")
+    assert sum(s.startswith("UPDATE user") for s in statements) == 1
+
+    with count_queries(app) as statements:
+        _login_as(app, "streaky")
+    assert not any(s.startswith("UPDATE") for s in statements)
+
+    with app.app_context():
+        user = User.query.filter_by(username="streaky").one()
+        assert (user.streak_days, user.last_active_date) == (5, date.today())
+
+
+def test_concurrent_logins_count_the_day_once():
+    """Two devices that both loaded yesterday's user row: only one increments."""
+    from datetime import date, timedelta
+
+    from app.auth.routes import update_streak_for_user
+
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username="twodevices", password_hash="x", streak_days=2,
+                    last_active_date=date.today() - timedelta(days=1))
+        db.session.add(user)
+        db.session.commit()
+
+        stale = User(id=user.id, username="twodevices", password_hash="x", streak_days=2,
+                     last_active_date=date.today() - timedelta(days=1))
+        assert update_streak_for_user(user) is True
+        db.session.commit()
+        assert update_streak_for_user(stale) is False  # other device, stale copy
+        db.session.commit()
+
+        assert db.session.get(User, user.id).streak_days == 3
+
+
+def test_feature_is_keyset_paginated_and_filtered_by_status():
+    app = create_test_app()
+    app.config["DASHBOARD_PAGE_SIZE"] = 5
+    with app.app_context():
+        db.create_all()
+        user = User(username="power")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        for i in range(12):
+            course = Course(user_id=user.id, title=f"Course {i:02d}")
+            db.session.add(course)
+            db.session.flush()
+            db.session.add(ModuleProgress(user_id=user.id, course_id=course.id,
+                                          module_name="Only module",
+                                          percent_complete=100 if i % 3 == 0 else 0))
+        db.session.commit()
+
+    client = _login_as(app, "power")
+
+    first = client.get("/feature").get_data(as_text=True)
+    assert "Course 04" in first and "Course 05" not in first
+    assert "after=5" in first
+    assert "Only module" not in first  # module rows load lazily
+
+    with count_queries(app) as statements:
+        second = client.get("/feature?after=5").get_data(as_text=True)
+    assert "Course 05" in second and "Course 04" not in second
+    assert len(view_queries(statements)) == 1  # one indexed page query
+
+    completed = client.get("/feature?status=completed").get_data(as_text=True)
+    assert [f"Course {i:02d}" in completed for i in (0, 1, 3)] == [True, False, True]
+
+
+def test_course_modules_json_is_scoped_to_the_owner():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        for name in ("owner", "other"):
+            user = User(username=name)
+            user.set_password("password123")
+            db.session.add(user)
+        db.session.flush()
+        course = Course(user_id=1, title="Intro to Python")
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(ModuleProgress(user_id=1, course_id=course.id,
+                                      module_name="Getting Started", percent_complete=80))
+        db.session.commit()
+
+    response = _login_as(app, "owner").get("/courses/1/modules.json")
+    assert response.get_json() == {
+        "course_id": 1,
+        "modules": [{"module_name": "Getting Started", "percent_complete": 80}],
+    }
+    assert _login_as(app, "other").get("/courses/1/modules.json").status_code == 404
+
+
+def test_anonymous_feature_serves_a_cached_demo_snapshot():
+    """
+    Anonymous visitors see the demo student's courses from one shared
+    cached snapshot: other users' courses are never read, and repeat
+    hits (whatever the query string) cost one lookup of the demo
+    user's data_version and no writes.
+    """
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        for name, title in (("student1", "Demo Course"), ("private", "Private Course")):
+            user = User(username=name, password_hash="x")
+            db.session.add(user)
+            db.session.flush()
+            course = Course(user_id=user.id, title=title)
+            db.session.add(course)
+            db.session.flush()
+            db.session.add(ModuleProgress(user_id=user.id, course_id=course.id,
+                                          module_name=f"{title} module", percent_complete=50))
+        db.session.commit()
+
+    client = app.test_client()
+    page = client.get("/feature").get_data(as_text=True)
+    assert "Demo Course module" in page  # modules are part of the snapshot
+    assert "Private Course" not in page
+
+    with count_queries(app) as statements:
+        assert client.get("/feature").status_code == 200
+        assert client.get("/feature?after=1&status=in-progress").status_code == 200
+    assert len(statements) == 2
+    assert all("user.data_version" in s and "module_progress" not in s for s in statements)
+
+    assert client.get("/courses/2/modules.json").status_code == 302  # login first
+
+
+def test_course_detail_loads_in_two_queries():
+    """
+    /courses/<id> reads the course, its first module (by order_index),
+    the user's note and the progress rows in at most two queries, and
+    saving a note reuses the same loader.
+    """
+    from app.models import Module, ModuleNote
+
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username="detail")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        course = Course(user_id=user.id, title="Intro to Python")
+        db.session.add(course)
+        db.session.flush()
+        modules = [
+            Module(course_id=course.id, title=f"Lesson {n}", order_index=n)
+            for n in (2, 1, 3)
+        ]
+        db.session.add_all(modules)
+        db.session.flush()
+        db.session.add(ModuleNote(user_id=user.id, module_id=modules[1].id,
+                                  content="Remember list slicing"))
+        for n, percent in ((1, 100), (2, 50), (3, 0)):
+            db.session.add(ModuleProgress(user_id=user.id, course_id=course.id,
+                                          module_name=f"Lesson {n}", percent_complete=percent))
+        db.session.commit()
+        course_id = course.id
+
+    client = _login_as(app, "detail")
+    client.get(f"/courses/{course_id}")  # user row now in the identity cache
+
+    with count_queries(app) as statements:
+        response = client.get(f"/courses/{course_id}")
+    html = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert len(view_queries(statements)) <= 2
+    assert "Module: Lesson 1" in html  # lowest order_index, not lowest id
+    assert "Remember list slicing" in html
+    assert html.index("Lesson 1") < html.index("Lesson 2") < html.index("Lesson 3")
+
+    response = client.post(f"/courses/{course_id}", data={"content": "Updated"})
+    assert response.status_code == 302
+    with app.app_context():
+        assert ModuleNote.query.one().content == "Updated"
+
+    with count_queries(app) as statements:
+        assert client.get("/courses/999").status_code == 404
+    assert len(view_queries(statements)) == 1
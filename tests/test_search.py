@@ -0,0 +1,190 @@
+# tests/test_search.py
+
+import os
+import sys
+
+from sqlalchemy import text
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.models import Course, Module, ModuleNote, User
+from app.schema import upgrade_schema
+from app.search import FTS_TABLE, _search_like, query_terms, search_notes
+
+NOTES = {
+    "Loops": "Reviewing for loops and while loops before the quiz.",
+    "Functions": "Functions return values; review default arguments.",
+    "Classes": "Classes bundle data with behaviour. <script>alert(1)</script> review",
+    "Files": "Reading files line by line keeps memory flat.",
+}
+
+
+def create_test_app():
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        for username in ("student1", "student2"):
+            user = User(username=username, email=f"{username}@example.com")
+            user.set_password("password123")
+            db.session.add(user)
+            db.session.flush()
+            course = Course(user_id=user.id, title="Intro to Python")
+            db.session.add(course)
+            db.session.flush()
+            for index, (title, content) in enumerate(NOTES.items()):
+                module = Module(course_id=course.id, title=title, order_index=index)
+                db.session.add(module)
+                db.session.flush()
+                db.session.add(ModuleNote(user_id=user.id, module_id=module.id, content=content))
+        db.session.commit()
+    return app
+
+
+def titles(found):
+    return [hit["module_title"] for hit in found["results"]]
+
+
+def test_search_is_scoped_to_the_user_and_stems_words():
+    app = create_test_app()
+    with app.app_context():
+        found = search_notes(1, "reviews")
+        assert sorted(titles(found)) == ["Classes", "Functions", "Loops"]
+        assert all(hit["note_id"] <= 4 for hit in found["results"])  # student1's notes
+
+        assert titles(search_notes(1, "loop quiz")) == ["Loops"]  # every word required
+        assert titles(search_notes(1, "loop recursion")) == []
+        assert titles(search_notes(2, "memory"))[0] == "Files"
+
+
+def test_more_matches_rank_first():
+    app = create_test_app()
+    with app.app_context():
+        assert titles(search_notes(1, "review"))[0] != "Classes"
+        note = db.session.get(ModuleNote, 3)
+        note.content = "review review review"
+        db.session.commit()
+        assert titles(search_notes(1, "review"))[0] == "Classes"
+
+
+def test_every_match_is_ranked_and_reachable():
+    app = create_test_app()
+    with app.app_context():
+        course = Course(user_id=1, title="Many notes")
+        db.session.add(course)
+        db.session.flush()
+        filler = "a long note that mentions a loop once among many other words " * 3
+        contents = [filler] * 1400 + ["loop loop loop"] * 100  # best notes written last
+        modules = [Module(course_id=course.id, title=f"Note {i}") for i in range(len(contents))]
+        db.session.add_all(modules)
+        db.session.flush()
+        db.session.add_all(
+            ModuleNote(user_id=1, module_id=module.id, content=content)
+            for module, content in zip(modules, contents)
+        )
+        db.session.commit()
+
+        first = search_notes(1, "loop", per_page=50)
+        assert {hit["snippet"] for hit in first["results"]} == {
+            "<mark>loop</mark> <mark>loop</mark> <mark>loop</mark>"
+        }
+        seen, page = set(), 1
+        while True:
+            found = search_notes(1, "loop", page=page, per_page=50)
+            seen.update(hit["note_id"] for hit in found["results"])
+            if not found["has_more"]:
+                break
+            page += 1
+        assert len(seen) == 1500 + 1  # + the original "Loops" note
+
+
+def test_like_fallback_ranks_the_same_way():
+    app = create_test_app()
+    with app.app_context():
+        note = db.session.get(ModuleNote, 3)
+        note.content = "review review review"
+        db.session.commit()
+        ranked = [row["module_title"] for row in _search_like(1, query_terms("review"), 10, 0)]
+        assert ranked == titles(search_notes(1, "review"))
+        assert ranked[0] == "Classes"
+
+
+def test_index_follows_inserts_updates_and_deletes():
+    app = create_test_app()
+    with app.app_context():
+        note = db.session.get(ModuleNote, 4)
+        note.content = "Generators yield values lazily."
+        db.session.commit()
+        assert titles(search_notes(1, "generator")) == ["Files"]
+        assert titles(search_notes(1, "memory")) == []
+
+        db.session.delete(note)
+        db.session.commit()
+        assert titles(search_notes(1, "generator")) == []
+
+        # raw SQL writers are covered by the triggers too
+        db.session.execute(text(
+            "INSERT INTO module_note (user_id, module_id, content) VALUES (1, 4, 'decorators wrap')"
+        ))
+        db.session.commit()
+        assert titles(search_notes(1, "decorator")) == ["Files"]
+
+
+def test_snippets_are_escaped_and_highlighted():
+    app = create_test_app()
+    with app.app_context():
+        hit = search_notes(1, "behaviour")["results"][0]
+        assert "<mark>behaviour</mark>" in hit["snippet"]
+        assert "<script>" not in hit["snippet"]
+        assert "&lt;script&gt;" in hit["snippet"]
+
+
+def test_query_syntax_is_not_passed_to_fts():
+    app = create_test_app()
+    with app.app_context():
+        for query in ('"', "loops OR", "NOT", "user_id:2", "content:*", "()", "", "   "):
+            search_notes(1, query)  # no OperationalError
+        assert titles(search_notes(1, 'loops" OR "memory')) == []  # all words, not OR
+        assert all(hit["note_id"] <= 4 for hit in search_notes(1, "user_id 2")["results"])
+
+
+def test_results_are_paginated():
+    app = create_test_app()
+    with app.app_context():
+        first = search_notes(1, "review", page=1, per_page=2)
+        second = search_notes(1, "review", page=2, per_page=2)
+        assert len(first["results"]) == 2 and first["has_more"]
+        assert len(second["results"]) == 1 and not second["has_more"]
+        assert set(titles(first)).isdisjoint(titles(second))
+
+
+def test_search_api():
+    app = create_test_app()
+    client = app.test_client()
+    assert client.get("/api/notes/search?q=loops").status_code == 401
+
+    client.post("/auth/login", data={"username": "student2", "password": "password123"})
+    response = client.get("/api/notes/search?q=loops&per_page=5")
+    assert response.status_code == 200
+    assert "no-store" in response.headers["Cache-Control"]
+    body = response.get_json()
+    assert body["page"] == 1 and body["per_page"] == 5 and not body["has_more"]
+    [hit] = body["results"]
+    assert hit["module_title"] == "Loops" and hit["course_title"] == "Intro to Python"
+    assert hit["note_id"] > 4  # student2's own note
+    assert "<mark>loops</mark>" in hit["snippet"]
+
+
+def test_upgrade_builds_the_index_for_existing_notes():
+    app = create_test_app()
+    with app.app_context():
+        db.session.execute(text(f"DROP TABLE {FTS_TABLE}"))
+        for trigger in ("insert", "update", "delete"):
+            db.session.execute(text(f"DROP TRIGGER module_note_fts_{trigger}"))
+        db.session.commit()
+
+        changes = upgrade_schema(log=lambda message: None)
+        assert f"created full-text index {FTS_TABLE}" in changes
+        assert titles(search_notes(1, "memory")) == ["Files"]
+        assert upgrade_schema(log=lambda message: None) == []
@@ -0,0 +1,132 @@
+# tests/test_templating.py
+
+import os
+import sys
+
+# Make sure Python can find the 'app' package
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.config import TestingConfig
+from app.models import Course, ModuleProgress, User
+from app.progress import rebuild_course_aggregates
+from app.templating import compile_templates
+
+
+def create_test_app(config_name="testing"):
+    app = create_app(config_name)
+    with app.app_context():
+        db.create_all()
+        user = User(username="student1", email="student1@example.com")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        for title in ("Intro to Python", "Effective Note-Taking"):
+            course = Course(user_id=user.id, title=title)
+            db.session.add(course)
+            db.session.flush()
+            for name, percent in (("Module 1", 40), ("Module 2", 100)):
+                db.session.add(ModuleProgress(user_id=user.id, course_id=course.id,
+                                              module_name=name, percent_complete=percent))
+        db.session.commit()
+    return app
+
+
+def test_course_version_changes_with_its_progress():
+    app = create_test_app()
+    with app.app_context():
+        start = db.session.get(Course, 1).version
+
+        row = ModuleProgress.query.filter_by(course_id=1, module_name="Module 1").one()
+        row.percent_complete = 60
+        db.session.commit()
+        assert db.session.get(Course, 1).version == start + 1
+        assert db.session.get(Course, 2).version == start  # other course untouched
+
+        # two modules swap percents: same totals, different module list
+        first, second = ModuleProgress.query.filter_by(course_id=1).order_by(ModuleProgress.id)
+        first.percent_complete, second.percent_complete = second.percent_complete, first.percent_complete
+        db.session.commit()
+        assert db.session.get(Course, 1).version == start + 2
+
+        db.session.get(Course, 1).title = "Intro to Python 2"
+        db.session.commit()
+        assert db.session.get(Course, 1).version == start + 3
+
+        rebuild_course_aggregates([2])
+        db.session.commit()
+        assert db.session.get(Course, 2).version == start + 1
+
+
+def test_only_the_changed_course_card_is_rendered_again():
+    app = create_test_app()
+    fragments = app.extensions["fragment_cache"]
+    client = app.test_client()
+    client.post("/auth/login", data={"username": "student1", "password": "password123"})
+
+    client.get("/feature")
+    assert (fragments.misses, fragments.hits) == (2, 0)
+
+    client.get("/feature")
+    assert (fragments.misses, fragments.hits) == (2, 2)
+
+    with app.app_context():
+        row = ModuleProgress.query.filter_by(course_id=2, module_name="Module 1").one()
+        row.percent_complete = 100
+        db.session.commit()
+
+    html = client.get("/feature").get_data(as_text=True)
+    assert (fragments.misses, fragments.hits) == (3, 3)
+    assert "100%" in html
+
+
+def test_course_detail_module_list_is_cached_per_version():
+    app = create_test_app()
+    fragments = app.extensions["fragment_cache"]
+    client = app.test_client()
+    client.post("/auth/login", data={"username": "student1", "password": "password123"})
+
+    client.get("/courses/1")
+    client.get("/courses/1")
+    assert (fragments.misses, fragments.hits) == (1, 1)
+
+    with app.app_context():
+        row = ModuleProgress.query.filter_by(course_id=1, module_name="Module 1").one()
+        row.percent_complete = 75
+        db.session.commit()
+
+    html = client.get("/courses/1").get_data(as_text=True)
+    assert fragments.misses == 2
+    assert "75%" in html
+
+
+def test_null_fragment_backend_still_renders():
+    class NoFragmentsConfig(TestingConfig):
+        FRAGMENT_CACHE_BACKEND = "null"
+
+    app = create_test_app(NoFragmentsConfig)
+    assert len(app.extensions["fragment_cache"].backend) == 0
+    client = app.test_client()
+    client.post("/auth/login", data={"username": "student1", "password": "password123"})
+    assert "Intro to Python" in client.get("/feature").get_data(as_text=True)
+    assert "Intro to Python" in client.get("/feature").get_data(as_text=True)
+    assert app.extensions["fragment_cache"].hits == 0
+
+
+def test_bytecode_cache_lets_a_new_app_skip_compiling(tmp_path):
+    class BytecodeConfig(TestingConfig):
+        JINJA_BYTECODE_CACHE_DIR = str(tmp_path / "jinja")
+
+    first = create_app(BytecodeConfig)
+    assert compile_templates(first) >= 4
+    assert os.listdir(BytecodeConfig.JINJA_BYTECODE_CACHE_DIR)
+
+    # a new worker: every template comes from the cache, none is compiled
+    second = create_app(BytecodeConfig)
+
+    def no_compiling(*args, **kwargs):
+        raise AssertionError("template was compiled instead of loaded")
+
+    second.jinja_env.compile = no_compiling
+    second.jinja_env.get_template("main/feature.html")
+    second.jinja_env.get_template("base.html")